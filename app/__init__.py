@@ -1,18 +1,43 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
+from functools import wraps
+from flask import Flask, Response, request
 from flask_restx import Api
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import os
 from dotenv import load_dotenv
+from app.utils.db_engine import ProfiledSQLAlchemy
+from app.utils.db_router import ReplicaRouter
+from app.utils.hashing import PasswordHasher, PasswordHasherBusy
+from app.utils import rate_limit  # registers the sqlite:// rate limit storage
+from app.utils.token_cache import TokenCache
+from app.utils.principal import TokenRevocations
+from app.utils.login_guard import LoginGuard
+from app.utils.password_policy import PasswordPolicy
+from app.utils.email_policy import EmailPolicy
+from app.utils.auth_events import AuthEventLog
+from app.utils.security_headers import SecurityHeaders
+from app.utils.json_codec import json_codec, output_json
+from app.utils.request_limits import RequestLimits
+from app.utils.static_pages import StaticPage
+from app.utils.metrics import metrics, hasher_metrics, token_cache_metrics, auth_event_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 # Load environment variables
 load_dotenv()
 
 # Initialize extensions
-db = SQLAlchemy()
+db = ProfiledSQLAlchemy()
+replica_router = ReplicaRouter()
 limiter = Limiter(key_func=get_remote_address)
+password_hasher = PasswordHasher()
+token_cache = TokenCache()
+token_revocations = TokenRevocations()
+login_guard = LoginGuard()
+password_policy = PasswordPolicy()
+email_policy = EmailPolicy()
+auth_events = AuthEventLog()
+security_headers = SecurityHeaders()
+request_limits = RequestLimits()
 
 # Define authorization scheme for Swagger UI
 authorizations = {
@@ -22,6 +47,10 @@ authorizations = {
         'name': 'Authorization',
         'description': 'Type in the *\'Value\'* input box below: **Bearer &lt;JWT&gt;**',
         'prefix': 'Bearer '
+    },
+    'Introspection Client': {
+        'type': 'basic',
+        'description': 'A client_id:secret pair from INTROSPECT_CLIENTS'
     }
 }
 
@@ -35,6 +64,28 @@ api = Api(
     security='Bearer Auth'
 )
 
+# Encode API responses with the configured JSON codec
+api.representation('application/json')(output_json)
+
+def shed_when_hasher_busy(view):
+    """
+    Shed load with a 503 instead of queueing behind a full hashing pool.
+    Answered here rather than by an API error handler, which logs a traceback
+    for every 5xx; shed requests are counted in password_hash_rejected_total.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            return view(*args, **kwargs)
+        except PasswordHasherBusy as error:
+            return api.make_response(
+                {'message': 'Service temporarily overloaded, please retry'}, 503,
+                {'Retry-After': str(error.retry_after)}
+            )
+    return wrapper
+
+api.decorators.append(shed_when_hasher_busy)
+
 def create_app(config_name=None):
     app = Flask(__name__, instance_relative_config=True)
     
@@ -47,21 +98,44 @@ def create_app(config_name=None):
     # Load configuration
     app.config.from_object('app.config.Config')
     
-    # Initialize extensions with app
+    # Initialize extensions with app; metrics first so its hooks time everything else
+    metrics.init_app(app)
+    # Body checks run before any other hook can read the body
+    request_limits.init_app(app)
+    json_codec.init_app(app)
     db.init_app(app)
+    replica_router.init_app(app)
     CORS(app)
     limiter.init_app(app)
+    password_hasher.init_app(app)
+    token_cache.init_app(app)
+    token_revocations.init_app(app)
+    login_guard.init_app(app)
+    password_policy.init_app(app)
+    email_policy.init_app(app)
+    auth_events.init_app(app)
+    security_headers.init_app(app)
+    
+    # Documentation pages, encoded once; registered before the API so '/' isn't shadowed by its root
+    static_pages = {
+        name: StaticPage.from_file(name, app.config['STATIC_PAGE_MAX_AGE'])
+        for name in ('index.html', 'redoc.html')
+    }
+    
+    @app.route('/')
+    def index():
+        return static_pages['index.html'].response(request)
+    
+    @app.route('/api/redoc')
+    def redoc():
+        return static_pages['redoc.html'].response(request)
+    
+    security_headers.use_policy('docs', 'index', 'redoc')
     api.init_app(app)
     
-    # Add security headers
-    @app.after_request
-    def add_security_headers(response):
-        response.headers['X-Content-Type-Options'] = 'nosniff'
-        response.headers['X-Frame-Options'] = 'DENY'
-        response.headers['X-XSS-Protection'] = '1; mode=block'
-        response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-        response.headers['Content-Security-Policy'] = "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.redoc.ly; style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; img-src 'self' data:; font-src 'self' data: https://fonts.gstatic.com; connect-src 'self'"
-        return response
+    # Build the authentication pipeline once per app
+    from app.utils.auth_utils import auth_engine
+    auth_engine.init_app(app)
     
     # Import and register namespaces
     from app.routes.auth import auth_ns
@@ -70,83 +144,36 @@ def create_app(config_name=None):
     api.add_namespace(auth_ns)
     api.add_namespace(profile_ns)
     
-    # Add ReDoc UI route
-    @app.route('/api/redoc')
-    def redoc():
-        return """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Authentication API - ReDoc</title>
-            <meta charset="utf-8"/>
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <link href="https://fonts.googleapis.com/css?family=Montserrat:300,400,700|Roboto:300,400,700" rel="stylesheet">
-            <style>
-                body {
-                    margin: 0;
-                    padding: 0;
-                }
-            </style>
-        </head>
-        <body>
-            <redoc spec-url='/api/swagger.json'></redoc>
-            <script src="https://cdn.redoc.ly/redoc/latest/bundles/redoc.standalone.js"></script>
-        </body>
-        </html>
-        """
+    # Register CLI commands
+    from app.cli import init_db, events_cli, keys_cli, passwords_cli, users_cli
+    app.cli.add_command(init_db)
+    app.cli.add_command(events_cli)
+    app.cli.add_command(keys_cli)
+    app.cli.add_command(passwords_cli)
+    app.cli.add_command(users_cli)
     
-    # Add home page
-    @app.route('/')
-    def index():
-        return """
-        <html>
-        <head>
-            <title>Authentication API</title>
-            <style>
-                body {
-                    font-family: Arial, sans-serif;
-                    margin: 40px;
-                    line-height: 1.6;
-                }
-                .container {
-                    max-width: 800px;
-                    margin: 0 auto;
-                }
-                h1 {
-                    color: #333;
-                }
-                .docs-link {
-                    margin: 20px 0;
-                }
-                .docs-link a {
-                    display: inline-block;
-                    margin-right: 20px;
-                    padding: 10px 15px;
-                    background-color: #4CAF50;
-                    color: white;
-                    text-decoration: none;
-                    border-radius: 4px;
-                }
-                .docs-link a:hover {
-                    background-color: #45a049;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>Authentication API</h1>
-                <p>Welcome to the Authentication API. This API provides endpoints for user registration, login, and profile management.</p>
-                <div class="docs-link">
-                    <a href="/api/docs">Swagger UI Documentation</a>
-                    <a href="/api/redoc">ReDoc Documentation</a>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+    # Expose request metrics for Prometheus; scrapes don't count against rate limits
+    if metrics.enabled:
+        metrics.add_collector(lambda: hasher_metrics(password_hasher.stats()))
+        metrics.add_collector(lambda: token_cache_metrics(token_cache.stats()))
+        metrics.add_collector(lambda: auth_event_metrics(auth_events.stats()))
+        
+        @app.route('/metrics')
+        @limiter.exempt
+        def prometheus_metrics():
+            return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
     
-    # Create database tables within app context
-    with app.app_context():
-        db.create_all()
+    # Publish token verification keys for downstream services
+    @app.route('/.well-known/jwks.json')
+    def jwks():
+        body, etag = auth_engine.jwks()
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': f"public, max-age={app.config['JWKS_MAX_AGE']}"
+        }
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+        return Response(body, mimetype='application/json', headers=headers)
     
+    # Schema is created by `flask init-db`, not on every boot
     return app
\ No newline at end of file
@@ -0,0 +1,167 @@
+# app/asgi.py
+
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from app import auth_events, create_app, password_hasher
+
+
+class AsgiAdapter:
+    """
+    Serve the Flask app to an ASGI server.
+
+    The event loop owns the connections: reading request bodies and writing
+    responses never holds a thread, and requests waiting for a worker are
+    parked as coroutines rather than blocked threads. Only the Flask handler
+    itself runs on the bounded thread pool, where database access stays on
+    the pooled synchronous engine and bcrypt is handed on to the
+    PasswordHasher pool as before.
+
+    Responses are buffered before being sent; every endpoint here returns a
+    small JSON or HTML body. Request bodies are buffered too, up to
+    max_body_size (MAX_CONTENT_LENGTH): a larger body is answered with 413
+    as soon as its declared length or the bytes received pass the limit.
+    """
+
+    def __init__(self, wsgi_app, max_workers=None, max_body_size=None):
+        self.wsgi_app = wsgi_app
+        self.max_body_size = max_body_size
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self._executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']!r}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._get_executor()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        if self._declared_too_large(scope):
+            await self._send_too_large(send)
+            return
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if self.max_body_size is not None and len(body) > self.max_body_size:
+                await self._send_too_large(send)
+                return
+            if not message.get('more_body', False):
+                break
+
+        environ = build_environ(scope, bytes(body))
+        loop = asyncio.get_running_loop()
+        status, headers, content = await loop.run_in_executor(self._get_executor(), self._run, environ)
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+
+    def _declared_too_large(self, scope):
+        if self.max_body_size is None:
+            return False
+        for name, value in scope.get('headers', []):
+            if name == b'content-length':
+                return value.isdigit() and int(value) > self.max_body_size
+        return False
+
+    @staticmethod
+    async def _send_too_large(send):
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [(b'content-type', b'application/json'), (b'connection', b'close')],
+        })
+        await send({'type': 'http.response.body', 'body': b'{"message":"Request body too large"}'})
+
+    def _run(self, environ):
+        response = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response_headers
+            ]
+            return lambda data: None
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers'], content
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='asgi')
+        return self._executor
+
+    def shutdown(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        password_hasher.shutdown()
+        auth_events.shutdown()
+
+
+def build_environ(scope, body):
+    """Translate an ASGI http scope into a WSGI environ"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1')
+        value = value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'content-length':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    if 'CONTENT_LENGTH' not in environ and body:
+        environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+def create_asgi_app(app=None):
+    """Wrap a Flask app (a new one by default) for an ASGI server"""
+    if app is None:
+        app = create_app()
+    return AsgiAdapter(
+        app, max_workers=app.config.get('ASGI_WORKER_THREADS'), max_body_size=app.config.get('MAX_CONTENT_LENGTH')
+    )
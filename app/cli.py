@@ -0,0 +1,299 @@
+# app/cli.py
+
+import csv
+import json
+import os
+import re
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app import db, password_hasher
+from app.models.auth_event import AuthEvent
+from app.models.upgrades import UpgradeError, rebuild_users_autoincrement, upgrade_users
+from app.models.user import User
+from app.utils.auth_events import LOGIN_FAILED
+from app.utils.password_policy import build_breached_file
+from app.utils.validators import normalize_email
+
+keys_cli = AppGroup('keys', help='Manage JWT signing keys')
+users_cli = AppGroup('users', help='Bulk import and export user accounts')
+passwords_cli = AppGroup('passwords', help='Manage the breached password list')
+events_cli = AppGroup('events', help='Query the authentication audit log')
+
+@click.command('init-db')
+@with_appcontext
+def init_db():
+    """Create missing tables and upgrade older ones; run once per deploy before starting workers"""
+    db.create_all()
+    try:
+        with db.engine.begin() as connection:
+            applied = upgrade_users(connection)
+        if rebuild_users_autoincrement(db.engine):
+            applied.append('rebuilt users with AUTOINCREMENT so deleted ids are never reused')
+    except UpgradeError as e:
+        raise click.ClickException(str(e))
+    for step in applied:
+        click.echo(f'Upgraded: {step}')
+    click.echo('Database tables are up to date')
+
+BCRYPT_HASH = re.compile(r'^\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}$')
+EXPORT_COLUMNS = ('email', 'password_hash', 'created_at')
+
+@keys_cli.command('generate')
+@click.option('--kid', help='Key id; defaults to a timestamp so newer keys sort last')
+@click.option('--algorithm', help='RS256 or EdDSA; defaults to JWT_ALGORITHM')
+def generate_key(kid, algorithm):
+    """Write a new private key (and its public half) to JWT_KEYS_DIR"""
+    # cryptography is only needed here and for asymmetric signing; keep it off the startup path
+    from app.utils.keyring import generate_private_key, private_key_pem, public_key_pem
+    
+    algorithm = algorithm or current_app.config['JWT_ALGORITHM']
+    kid = kid or time.strftime('%Y%m%d%H%M%S')
+    keys_dir = current_app.config['JWT_KEYS_DIR']
+    os.makedirs(keys_dir, exist_ok=True)
+    
+    private_key = generate_private_key(algorithm)
+    private_path = os.path.join(keys_dir, f'{kid}.pem')
+    with open(os.open(private_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as f:
+        f.write(private_key_pem(private_key))
+    with open(os.path.join(keys_dir, f'{kid}.pub.pem'), 'wb') as f:
+        f.write(public_key_pem(private_key.public_key()))
+    
+    click.echo(f'Generated {algorithm} key {kid} in {keys_dir}')
+
+@keys_cli.command('retire')
+@click.argument('kid')
+def retire_key(kid):
+    """Drop a key's private half so it only verifies tokens it already signed"""
+    private_path = os.path.join(current_app.config['JWT_KEYS_DIR'], f'{kid}.pem')
+    if not os.path.exists(private_path):
+        raise click.ClickException(f'No private key for {kid}')
+    os.remove(private_path)
+    click.echo(f'Retired key {kid}; delete {kid}.pub.pem once its tokens have expired')
+
+
+def detect_format(stream, fmt):
+    if fmt:
+        return fmt
+    if getattr(stream, 'name', '').endswith('.csv'):
+        return 'csv'
+    return 'jsonl'
+
+def read_records(stream, fmt):
+    """
+    Yield (line number, record) without loading the whole file. CSV records
+    are dicts; JSONL records are the raw line, parsed by user_row so a bad
+    line is rejected like any other invalid row.
+    """
+    if fmt == 'csv':
+        for line_no, record in enumerate(csv.DictReader(stream), start=2):
+            yield line_no, record
+    else:
+        for line_no, line in enumerate(stream, start=1):
+            if line.strip():
+                yield line_no, line
+
+def user_row(record):
+    """Turn an input record into a users row, hashing only when no bcrypt hash is given"""
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except ValueError:
+            raise ValueError('not valid JSON')
+        if not isinstance(record, dict):
+            raise ValueError('not a JSON object')
+    
+    email = record.get('email') or ''
+    if not isinstance(email, str) or not email.strip():
+        raise ValueError('missing email')
+    email = email.strip()
+    
+    password_hash = record.get('password_hash')
+    password = record.get('password')
+    if password_hash:
+        if not isinstance(password_hash, str) or not BCRYPT_HASH.match(password_hash):
+            raise ValueError('password_hash is not a bcrypt hash')
+    elif password:
+        if not isinstance(password, str):
+            raise ValueError('password is not a string')
+        password_hash = password_hasher.hash(password)
+    else:
+        raise ValueError('missing password or password_hash')
+    
+    row = {'email': email, 'email_normalized': normalize_email(email), 'password_hash': password_hash}
+    if record.get('created_at'):
+        if not isinstance(record['created_at'], str):
+            raise ValueError('created_at is not an ISO 8601 string')
+        row['created_at'] = row['updated_at'] = datetime.fromisoformat(record['created_at'])
+    return row
+
+def registered_emails(emails):
+    """The subset of these normalized emails that already have an account"""
+    column = User.__table__.c.email_normalized
+    return set(db.session.execute(select(column).where(column.in_(emails))).scalars())
+
+def insert_statement(skip_existing):
+    if not skip_existing:
+        return insert(User.__table__)
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        return sqlite.insert(User.__table__).on_conflict_do_nothing(index_elements=['email_normalized'])
+    if dialect == 'postgresql':
+        return postgresql.insert(User.__table__).on_conflict_do_nothing(index_elements=['email_normalized'])
+    raise click.ClickException(f'--skip-existing is not supported on {dialect}')
+
+@users_cli.command('import')
+@click.argument('source', type=click.File('r'))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), help='Defaults to csv for .csv files, else jsonl')
+@click.option('--chunk-size', default=1000, show_default=True, help='Rows per transaction')
+@click.option('--skip-existing', is_flag=True, help='Ignore rows whose email is already registered')
+def import_users(source, fmt, chunk_size, skip_existing):
+    """
+    Stream users from JSONL or CSV into the database.
+    
+    Each record needs an email and either a bcrypt password_hash, stored
+    as-is, or a plain password, which is hashed. Rows are inserted in
+    batches of --chunk-size with one transaction per batch.
+    """
+    fmt = detect_format(source, fmt)
+    stmt = insert_statement(skip_existing)
+    imported = skipped = existing = processed = 0
+    chunk = []
+    chunk_lines = []
+    start = time.perf_counter()
+    
+    def flush():
+        nonlocal imported, existing, processed
+        inserted = len(chunk)
+        if skip_existing:
+            # Rows for registered emails, or repeated within the chunk, are ignored by the insert
+            emails = {row['email_normalized'] for row in chunk}
+            inserted = len(emails - registered_emails(emails))
+        try:
+            db.session.execute(stmt, chunk)
+            db.session.commit()
+        except IntegrityError:
+            # The error's parameters hold every password hash in the chunk; never print them
+            db.session.rollback()
+            raise click.ClickException(
+                f'Lines {chunk_lines[0]}-{chunk_lines[-1]}: an email is already registered or appears twice; '
+                f'none of these lines were imported ({imported} users from earlier lines were). '
+                'Use --skip-existing to ignore such rows'
+            ) from None
+        imported += inserted
+        existing += len(chunk) - inserted
+        processed += len(chunk)
+        chunk.clear()
+        chunk_lines.clear()
+        elapsed = time.perf_counter() - start
+        click.echo(f'{processed} rows processed ({processed / elapsed:.0f} rows/sec)', err=True)
+    
+    for line_no, record in read_records(source, fmt):
+        try:
+            chunk.append(user_row(record))
+        except ValueError as e:
+            skipped += 1
+            click.echo(f'Line {line_no}: {e}', err=True)
+            continue
+        chunk_lines.append(line_no)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    
+    summary = f'Imported {imported} users, skipped {skipped} invalid rows'
+    if skip_existing:
+        summary += f' and {existing} already registered'
+    click.echo(summary)
+
+@users_cli.command('export')
+@click.argument('dest', type=click.File('w'))
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), help='Defaults to csv for .csv files, else jsonl')
+@click.option('--chunk-size', default=1000, show_default=True, help='Rows fetched per round trip')
+def export_users(dest, fmt, chunk_size):
+    """Stream every user, including the bcrypt hash, to JSONL or CSV"""
+    fmt = detect_format(dest, fmt)
+    columns = [User.__table__.c[name] for name in EXPORT_COLUMNS]
+    
+    # Server-side cursor: rows are fetched chunk by chunk instead of all at once
+    connection = db.session.connection().execution_options(stream_results=True)
+    result = connection.execute(select(*columns).order_by(User.id))
+    
+    writer = csv.writer(dest) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    
+    exported = 0
+    start = time.perf_counter()
+    while True:
+        rows = result.fetchmany(chunk_size)
+        if not rows:
+            break
+        for email, password_hash, created_at in rows:
+            created_at = created_at.isoformat() if created_at else None
+            if writer:
+                writer.writerow((email, password_hash, created_at or ''))
+            else:
+                dest.write(json.dumps({'email': email, 'password_hash': password_hash, 'created_at': created_at}) + '\n')
+        exported += len(rows)
+        elapsed = time.perf_counter() - start
+        click.echo(f'{exported} rows exported ({exported / elapsed:.0f} rows/sec)', err=True)
+    
+    click.echo(f'Exported {exported} users', err=True)
+
+
+@passwords_cli.command('build-breached')
+@click.argument('source', type=click.File('r', encoding='utf-8', errors='replace'))
+@click.argument('dest', type=click.Path(dir_okay=False))
+@click.option('--chunk-size', default=1000000, show_default=True, help='Digests sorted in memory at a time')
+def build_breached(source, dest, chunk_size):
+    """
+    Convert a breached password list into the sorted digest file read by
+    PASSWORD_BREACHED_FILE. SOURCE holds one plaintext password or SHA-1
+    hex digest (optionally with a ":count" suffix) per line.
+    """
+    started = time.monotonic()
+    written = build_breached_file(source, dest, chunk_size=chunk_size)
+    click.echo(f'Wrote {written} digests to {dest} in {time.monotonic() - started:.1f}s')
+
+
+@events_cli.command('failures')
+@click.option('--email', help='Show failures for this account')
+@click.option('--ip', help='Show failures from this IP address')
+@click.option('--minutes', default=60, show_default=True, help='How far back to look')
+@click.option('--limit', default=20, show_default=True, help='Rows to show')
+def event_failures(email, ip, minutes, limit):
+    """
+    Recent failed logins. With --email or --ip, list that account's or
+    address's failures, newest first; otherwise rank the accounts and IPs
+    with the most failures. Every query is answered from an index on
+    (email or ip, event_type, created_at).
+    """
+    since = datetime.utcnow() - timedelta(minutes=minutes)
+    failed = (AuthEvent.event_type == LOGIN_FAILED, AuthEvent.created_at >= since)
+    
+    if email or ip:
+        query = select(AuthEvent.created_at, AuthEvent.email_normalized, AuthEvent.ip_address).where(*failed)
+        if email:
+            query = query.where(AuthEvent.email_normalized == normalize_email(email))
+        if ip:
+            query = query.where(AuthEvent.ip_address == ip)
+        rows = db.session.execute(query.order_by(AuthEvent.created_at.desc()).limit(limit)).all()
+        for created_at, event_email, event_ip in rows:
+            click.echo(f'{created_at.isoformat()}  {event_email or "-"}  {event_ip or "-"}')
+        click.echo(f'{len(rows)} failed logins in the last {minutes} minutes', err=True)
+        return
+    
+    for label, column in (('account', AuthEvent.email_normalized), ('ip', AuthEvent.ip_address)):
+        count = func.count().label('failures')
+        rows = db.session.execute(
+            select(column, count).where(*failed).group_by(column).order_by(count.desc()).limit(limit)
+        ).all()
+        click.echo(f'Failures by {label} in the last {minutes} minutes:')
+        for key, failures in rows:
+            click.echo(f'{failures:>8}  {key or "-"}')
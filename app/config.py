@@ -7,18 +7,127 @@ import socket
 class Config:
     # Flask configuration
     SECRET_KEY = os.environ.get('SECRET_KEY', 'default_dev_key')
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 512 * 1024))  # bytes, any request body
+    AUTH_MAX_BODY_BYTES = int(os.environ.get('AUTH_MAX_BODY_BYTES', 4096))  # register, login and refresh bodies
+    JSON_CODEC = os.environ.get('JSON_CODEC', 'auto')  # 'orjson', 'json' or 'auto' (orjson when installed)
     
     # SQLAlchemy configuration
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'instance', 'auth.db')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///' + os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'instance', 'auth.db'))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Read replica for login and token lookups; writes and everything else use the primary
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else None
+    DB_READ_YOUR_WRITES_SECONDS = int(os.environ.get('DB_READ_YOUR_WRITES_SECONDS', 5))  # primary reads after a user's write
+    
+    # Database engine profile: 'sqlite', 'server' or 'auto' (picked from the URI)
+    DB_PROFILE = os.environ.get('DB_PROFILE', 'auto')
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    
     # JWT configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'default_jwt_key')
-    JWT_EXPIRATION_DELTA = int(os.environ.get('JWT_EXPIRATION_DELTA', 3600))  # 1 hour
+    JWT_EXPIRATION_DELTA = int(os.environ.get('JWT_EXPIRATION_DELTA', 900))  # 15 minutes
+    REFRESH_TOKEN_EXPIRATION_DELTA = int(os.environ.get('REFRESH_TOKEN_EXPIRATION_DELTA', 30 * 24 * 3600))  # 30 days
+    JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')  # HS256, RS256 or EdDSA
+    JWT_KEYS_DIR = os.environ.get('JWT_KEYS_DIR', os.path.join(os.path.abspath(os.path.dirname(__file__)), '..', 'instance', 'jwt_keys'))
+    JWT_ACTIVE_KID = os.environ.get('JWT_ACTIVE_KID')  # defaults to the oldest private key
+    JWKS_MAX_AGE = int(os.environ.get('JWKS_MAX_AGE', 300))  # seconds downstream services may cache JWKS
+    JWT_LEEWAY = int(os.environ.get('JWT_LEEWAY', 0))  # seconds of clock skew tolerated
+    JWT_AUDIENCE = os.environ.get('JWT_AUDIENCE')  # 'aud' claim, checked when set
+    JWT_ISSUER = os.environ.get('JWT_ISSUER')  # 'iss' claim, checked when set
+    
+    # Verified token cache
+    TOKEN_CACHE_ENABLED = os.environ.get('TOKEN_CACHE_ENABLED', 'true').lower() == 'true'
+    TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 1024))
+    TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL', 300))  # seconds, capped by the token's exp
+    
+    # Password hashing cost
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    BCRYPT_CALIBRATE = os.environ.get('BCRYPT_CALIBRATE', 'false').lower() == 'true'  # pick rounds at startup
+    BCRYPT_TARGET_VERIFY_MS = int(os.environ.get('BCRYPT_TARGET_VERIFY_MS', 250))
+    BCRYPT_MIN_ROUNDS = int(os.environ.get('BCRYPT_MIN_ROUNDS', 10))
+    BCRYPT_MAX_ROUNDS = int(os.environ.get('BCRYPT_MAX_ROUNDS', 16))
+    
+    # Password hashing pool
+    PASSWORD_HASH_EXECUTOR = os.environ.get('PASSWORD_HASH_EXECUTOR', 'thread')  # 'thread' or 'process'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_IN_FLIGHT = int(os.environ.get('PASSWORD_HASH_MAX_IN_FLIGHT', 0))  # 0 = 4x workers
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 1))  # seconds
+    
+    # ASGI mode: threads running Flask handlers (0 = CPU count + 4, at most 32)
+    ASGI_WORKER_THREADS = int(os.environ.get('ASGI_WORKER_THREADS', 0))
+    
+    # Batch token introspection for gateways
+    INTROSPECT_MAX_TOKENS = int(os.environ.get('INTROSPECT_MAX_TOKENS', 500))  # tokens per request
+    INTROSPECT_RATE_LIMIT = os.environ.get('INTROSPECT_RATE_LIMIT', '600 per minute')  # per client IP
+    INTROSPECT_CLIENTS = os.environ.get('INTROSPECT_CLIENTS', '')  # comma-separated client_id:secret pairs; introspection is refused when empty
     
     # Rate limiting
     RATELIMIT_DEFAULT = "200 per day, 50 per hour"
-    RATELIMIT_STRATEGY = "fixed-window"
+    RATELIMIT_STRATEGY = os.environ.get('RATELIMIT_STRATEGY', 'moving-window')  # sliding window
+    # memory:// is per process; use sqlite:////path/ratelimit.db to share counts between workers
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', 'memory://')
+    LOGIN_RATE_LIMIT = os.environ.get('LOGIN_RATE_LIMIT', '5 per minute')  # per client IP
+    LOGIN_ACCOUNT_RATE_LIMIT = os.environ.get('LOGIN_ACCOUNT_RATE_LIMIT', '10 per minute;50 per hour')  # per email, across IPs
+    
+    # Password policy
+    PASSWORD_MIN_LENGTH = int(os.environ.get('PASSWORD_MIN_LENGTH', 8))
+    PASSWORD_MAX_BYTES = int(os.environ.get('PASSWORD_MAX_BYTES', 72))  # bcrypt ignores input past 72 bytes
+    PASSWORD_REQUIRE_DIGIT = os.environ.get('PASSWORD_REQUIRE_DIGIT', 'true').lower() == 'true'
+    PASSWORD_REQUIRE_UPPERCASE = os.environ.get('PASSWORD_REQUIRE_UPPERCASE', 'true').lower() == 'true'
+    PASSWORD_REQUIRE_LOWERCASE = os.environ.get('PASSWORD_REQUIRE_LOWERCASE', 'true').lower() == 'true'
+    PASSWORD_REQUIRE_SPECIAL = os.environ.get('PASSWORD_REQUIRE_SPECIAL', 'true').lower() == 'true'
+    PASSWORD_SPECIAL_CHARACTERS = os.environ.get('PASSWORD_SPECIAL_CHARACTERS', '!@#$%^&*(),.?":{}|<>')
+    PASSWORD_BREACHED_FILE = os.environ.get('PASSWORD_BREACHED_FILE')  # built with `flask passwords build-breached`
+    
+    # Email validation
+    EMAIL_CHECK_DELIVERABILITY = os.environ.get('EMAIL_CHECK_DELIVERABILITY', 'false').lower() == 'true'  # DNS lookups
+    EMAIL_DNS_TIMEOUT = int(os.environ.get('EMAIL_DNS_TIMEOUT', 5))  # seconds
+    EMAIL_DOMAIN_CACHE_SIZE = int(os.environ.get('EMAIL_DOMAIN_CACHE_SIZE', 10000))
+    EMAIL_DOMAIN_CACHE_TTL = int(os.environ.get('EMAIL_DOMAIN_CACHE_TTL', 3600))  # seconds
+    EMAIL_BLOCK_DISPOSABLE = os.environ.get('EMAIL_BLOCK_DISPOSABLE', 'true').lower() == 'true'
+    EMAIL_DISPOSABLE_DOMAINS_FILE = os.environ.get('EMAIL_DISPOSABLE_DOMAINS_FILE')  # defaults to app/data/disposable_domains.txt
+    
+    # Request metrics at /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', 'false').lower() == 'true'  # per-phase timings in responses
+    
+    # Login admission checks that run before bcrypt
+    LOGIN_GUARD_ENABLED = os.environ.get('LOGIN_GUARD_ENABLED', 'true').lower() == 'true'
+    LOGIN_LOCKOUT_THRESHOLD = int(os.environ.get('LOGIN_LOCKOUT_THRESHOLD', 5))  # failures before an account locks
+    LOGIN_LOCKOUT_BASE_SECONDS = int(os.environ.get('LOGIN_LOCKOUT_BASE_SECONDS', 30))  # doubles with each further failure
+    LOGIN_LOCKOUT_MAX_SECONDS = int(os.environ.get('LOGIN_LOCKOUT_MAX_SECONDS', 900))
+    LOGIN_STUFFING_WINDOW_SECONDS = int(os.environ.get('LOGIN_STUFFING_WINDOW_SECONDS', 300))
+    LOGIN_STUFFING_MAX_ACCOUNTS = int(os.environ.get('LOGIN_STUFFING_MAX_ACCOUNTS', 20))  # distinct failed accounts per IP per window
+    LOGIN_GUARD_MAX_TRACKED = int(os.environ.get('LOGIN_GUARD_MAX_TRACKED', 100000))  # accounts/IPs kept in memory
+    LOGIN_BLOOM_CAPACITY = int(os.environ.get('LOGIN_BLOOM_CAPACITY', 1000000))
+    LOGIN_BLOOM_ERROR_RATE = float(os.environ.get('LOGIN_BLOOM_ERROR_RATE', 0.01))
+    LOGIN_BLOOM_REFRESH_SECONDS = int(os.environ.get('LOGIN_BLOOM_REFRESH_SECONDS', 1))
+    LOGIN_BLOOM_OVERLAP_IDS = int(os.environ.get('LOGIN_BLOOM_OVERLAP_IDS', 1000))  # ids below the last seen re-read on each catch-up
+    LOGIN_BLOOM_REBUILD_SECONDS = int(os.environ.get('LOGIN_BLOOM_REBUILD_SECONDS', 3600))  # full reload of the filter
+    
+    # Authentication audit log, written behind requests in batches
+    AUTH_EVENTS_ENABLED = os.environ.get('AUTH_EVENTS_ENABLED', 'true').lower() == 'true'
+    AUTH_EVENTS_QUEUE_SIZE = int(os.environ.get('AUTH_EVENTS_QUEUE_SIZE', 10000))  # events held before new ones are dropped
+    AUTH_EVENTS_BATCH_SIZE = int(os.environ.get('AUTH_EVENTS_BATCH_SIZE', 500))  # rows per insert transaction
+    AUTH_EVENTS_FLUSH_INTERVAL = float(os.environ.get('AUTH_EVENTS_FLUSH_INTERVAL', 1.0))  # seconds an event may wait
+    
+    # Security headers; an empty value drops the header
+    SECURITY_HSTS = os.environ.get('SECURITY_HSTS', 'max-age=31536000; includeSubDomains')
+    SECURITY_CSP_API = os.environ.get('SECURITY_CSP_API', "default-src 'none'; frame-ancestors 'none'")  # JSON routes
+    SECURITY_CSP_DOCS = os.environ.get('SECURITY_CSP_DOCS', (
+        "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.redoc.ly; "
+        "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; img-src 'self' data:; "
+        "font-src 'self' data: https://fonts.gstatic.com; connect-src 'self'"
+    ))  # home page, Swagger UI and ReDoc
+    STATIC_PAGE_MAX_AGE = int(os.environ.get('STATIC_PAGE_MAX_AGE', 300))  # seconds browsers may cache the HTML pages
     
     # CORS configuration
     CORS_ORIGINS = ['*'] 
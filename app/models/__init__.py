@@ -1,2 +1,4 @@
 # app/models/__init__.py
-from app.models.user import User
\ No newline at end of file
+from app.models.user import User
+from app.models.refresh_token import RefreshToken
+from app.models.auth_event import AuthEvent
\ No newline at end of file
@@ -0,0 +1,28 @@
+# app/models/auth_event.py
+
+from app import db
+from app.utils.auth_events import EMAIL_MAX_LENGTH, IP_MAX_LENGTH
+from datetime import datetime
+
+class AuthEvent(db.Model):
+    """
+    Audit record of a login, failed login or registration. Rows are written
+    in batches by AuthEventLog, never through the request's session, and
+    are indexed for "recent events of this type for an account or IP".
+    """
+    __tablename__ = 'auth_events'
+    __table_args__ = (
+        db.Index('ix_auth_events_type_created', 'event_type', 'created_at'),
+        db.Index('ix_auth_events_email_type_created', 'email_normalized', 'event_type', 'created_at'),
+        db.Index('ix_auth_events_ip_type_created', 'ip_address', 'event_type', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(32), nullable=False)
+    email_normalized = db.Column(db.String(EMAIL_MAX_LENGTH))
+    user_id = db.Column(db.Integer)  # no foreign key: the audit trail outlives deleted users
+    ip_address = db.Column(db.String(IP_MAX_LENGTH))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AuthEvent {self.event_type} {self.email_normalized}>'
@@ -0,0 +1,68 @@
+# app/models/lookups.py
+"""
+Column-projected user lookups for the login and token-auth hot paths.
+
+The statements are built once at import, so SQLAlchemy compiles each one a
+single time and reuses it from its compiled cache. They return plain rows
+holding only the columns the caller reads: no ORM instances, no identity
+map entries and no created_at/updated_at datetimes to parse. They run on
+the replica when one is configured (see ReplicaRouter), otherwise on the
+session's connection, so they share its transaction.
+"""
+
+from datetime import datetime
+from sqlalchemy import bindparam, select, update
+from app import db, replica_router
+from app.models.user import User
+
+users = User.__table__
+
+# Login needs the hash to verify plus what goes into the issued tokens
+LOGIN_BY_EMAIL = select(
+    users.c.id, users.c.email, users.c.password_hash, users.c.token_version
+).where(users.c.email_normalized == bindparam('email_normalized'))
+
+AUTH_BY_ID = select(users.c.id, users.c.email, users.c.token_version).where(users.c.id == bindparam('user_id'))
+
+AUTH_BY_IDS = select(users.c.id, users.c.email, users.c.token_version).where(
+    users.c.id.in_(bindparam('user_ids', expanding=True))
+)
+
+SET_PASSWORD_HASH = update(users).where(users.c.id == bindparam('user_id')).values(
+    password_hash=bindparam('new_hash'), updated_at=bindparam('now')
+)
+
+
+def find_login(email_normalized):
+    """(id, email, password_hash, token_version) for a normalized email, or None"""
+    rows = replica_router.read(LOGIN_BY_EMAIL, {'email_normalized': email_normalized}, [('email', email_normalized)])
+    return rows[0] if rows else None
+
+
+def find_auth(user_id):
+    """(id, email, token_version) for a user id, or None"""
+    rows = replica_router.read(AUTH_BY_ID, {'user_id': user_id}, [('user', user_id)])
+    return rows[0] if rows else None
+
+
+def find_auth_many(user_ids):
+    """Map id -> (id, email, token_version) for the given ids in one query"""
+    if not user_ids:
+        return {}
+    # One recently written user sends the whole batch to the primary
+    keys = [('user', user_id) for user_id in user_ids]
+    rows = replica_router.read(AUTH_BY_IDS, {'user_ids': list(user_ids)}, keys)
+    return {row.id: row for row in rows}
+
+
+def set_password_hash(user_id, email_normalized, password_hash):
+    """
+    Replace a stored hash in the session's transaction, on the primary.
+    This skips the User update events on purpose: a rehash changes neither
+    the email nor the token version, so cached tokens stay valid.
+    """
+    db.session.connection().execute(
+        SET_PASSWORD_HASH, {'user_id': user_id, 'new_hash': password_hash, 'now': datetime.utcnow()}
+    )
+    # find_login reads by email; without this it would fetch the old hash and rehash again
+    replica_router.mark_written(('user', user_id), ('email', email_normalized))
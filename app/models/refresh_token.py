@@ -0,0 +1,70 @@
+# app/models/refresh_token.py
+
+from app import db
+from datetime import datetime, timedelta
+import hashlib
+import secrets
+import uuid
+
+class RefreshToken(db.Model):
+    """
+    Opaque, single-use refresh token. Only a SHA-256 digest of the token is
+    stored, so a lookup is one indexed equality match. Every token issued
+    from the same login shares a family_id, which lets us revoke the whole
+    chain when a rotated token is presented again.
+    """
+    __tablename__ = 'refresh_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    family_id = db.Column(db.String(32), nullable=False, index=True)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False)
+    token_version = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    used_at = db.Column(db.DateTime)
+    revoked_at = db.Column(db.DateTime)
+    
+    # Joined so the refresh path loads token and user in one query
+    user = db.relationship('User', lazy='joined')
+    
+    @staticmethod
+    def hash_token(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def issue(cls, user, lifetime, family_id=None):
+        """Add a new refresh token for user to the session and return the raw token"""
+        token = secrets.token_urlsafe(32)
+        db.session.add(cls(
+            user_id=user.id,
+            family_id=family_id or uuid.uuid4().hex,
+            token_hash=cls.hash_token(token),
+            token_version=user.token_version,
+            expires_at=datetime.utcnow() + timedelta(seconds=lifetime)
+        ))
+        return token
+    
+    @classmethod
+    def find(cls, token):
+        return cls.query.filter_by(token_hash=cls.hash_token(token)).first()
+    
+    def mark_used(self):
+        """Atomically claim this token; False if another request already used it"""
+        claimed = RefreshToken.query.filter_by(id=self.id, used_at=None).update(
+            {'used_at': datetime.utcnow()}, synchronize_session=False
+        )
+        return claimed == 1
+    
+    @classmethod
+    def revoke_family(cls, family_id):
+        cls.query.filter_by(family_id=family_id, revoked_at=None).update(
+            {'revoked_at': datetime.utcnow()}, synchronize_session=False
+        )
+    
+    @property
+    def is_expired(self):
+        return self.expires_at <= datetime.utcnow()
+    
+    def __repr__(self):
+        return f'<RefreshToken {self.id} family={self.family_id}>'
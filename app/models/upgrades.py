@@ -0,0 +1,127 @@
+# app/models/upgrades.py
+"""
+In-place upgrades for tables created by earlier releases.
+
+db.create_all() only creates tables that are missing; it never adds columns
+to a table that already exists. `flask init-db` runs these steps after it,
+so a database from before a column was added gets the column, a backfill
+and its index, and an SQLite users table that reuses ids is rebuilt. Each step checks the live schema first, so running them
+again is a no-op.
+"""
+
+from sqlalchemy import MetaData, bindparam, func, inspect, select, text
+from app.models.user import User
+from app.utils.validators import normalize_email
+
+BACKFILL_CHUNK = 1000
+
+users = User.__table__
+
+
+class UpgradeError(Exception):
+    """Raised when existing data prevents an upgrade step"""
+
+
+def upgrade_users(connection):
+    """Add token_version and email_normalized to an older users table; returns the steps applied"""
+    columns = {column['name'] for column in inspect(connection).get_columns('users')}
+    applied = []
+
+    if 'token_version' not in columns:
+        connection.execute(text('ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0'))
+        applied.append('added users.token_version')
+
+    if 'email_normalized' not in columns:
+        # Nullable until backfilled; the unique index below is what lookups rely on
+        connection.execute(text('ALTER TABLE users ADD COLUMN email_normalized VARCHAR(255)'))
+        applied.append('added users.email_normalized')
+
+    backfilled = backfill_email_normalized(connection)
+    if backfilled:
+        applied.append(f'backfilled email_normalized for {backfilled} users')
+
+    if not has_unique_index(connection, 'email_normalized'):
+        duplicates = connection.execute(
+            select(users.c.email_normalized)
+            .group_by(users.c.email_normalized)
+            .having(func.count() > 1)
+            .limit(10)
+        ).scalars().all()
+        if duplicates:
+            raise UpgradeError(
+                'These addresses are registered more than once with different case or spacing; '
+                f'merge or remove the extra accounts and run init-db again: {", ".join(duplicates)}'
+            )
+        connection.execute(text('CREATE UNIQUE INDEX ix_users_email_normalized ON users (email_normalized)'))
+        applied.append('created unique index on users.email_normalized')
+
+    return applied
+
+
+def backfill_email_normalized(connection):
+    """Fill email_normalized with the same normalization the app applies, a chunk at a time"""
+    pending = (
+        select(users.c.id, users.c.email)
+        .where(users.c.email_normalized.is_(None))
+        .order_by(users.c.id)
+        .limit(BACKFILL_CHUNK)
+    )
+    fill = users.update().where(users.c.id == bindparam('user_id')).values(email_normalized=bindparam('normalized'))
+
+    total = 0
+    while True:
+        rows = connection.execute(pending).all()
+        if not rows:
+            return total
+        connection.execute(fill, [{'user_id': row.id, 'normalized': normalize_email(row.email)} for row in rows])
+        total += len(rows)
+
+
+def has_unique_index(connection, column):
+    inspector = inspect(connection)
+    unique_sets = [index['column_names'] for index in inspector.get_indexes('users') if index['unique']]
+    unique_sets += [constraint['column_names'] for constraint in inspector.get_unique_constraints('users')]
+    return [column] in unique_sets
+
+
+def rebuild_users_autoincrement(engine):
+    """
+    SQLite only: recreate a users table created without AUTOINCREMENT, which
+    hands the highest deleted id to the next user. Returns True if rebuilt.
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+
+    with engine.connect() as connection:
+        sql = connection.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'users'").scalar()
+        if sql is None or 'AUTOINCREMENT' in sql.upper():
+            return False
+
+        # With foreign keys enforced, DROP TABLE would cascade into refresh_tokens;
+        # the pragma is ignored inside a transaction, so switch it off first
+        connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+        try:
+            with connection.begin():
+                # pysqlite runs DDL outside any transaction unless one is opened explicitly
+                connection.exec_driver_sql('BEGIN')
+                rebuilt = users.to_metadata(MetaData(), name='users_rebuilt')
+                rebuilt.create(connection)
+                columns = [column.name for column in users.columns]
+                connection.execute(rebuilt.insert().from_select(columns, select(*users.columns)))
+                connection.exec_driver_sql('DROP TABLE users')
+                connection.exec_driver_sql('ALTER TABLE users_rebuilt RENAME TO users')
+                # Ids freed above the current maximum are only known from the audit log
+                if inspect(connection).has_table('auth_events'):
+                    connection.exec_driver_sql(
+                        "INSERT INTO sqlite_sequence (name, seq) SELECT 'users', 0 "
+                        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'users')"
+                    )
+                    connection.exec_driver_sql(
+                        "UPDATE sqlite_sequence SET seq = MAX(seq, (SELECT IFNULL(MAX(user_id), 0) FROM auth_events)) "
+                        "WHERE name = 'users'"
+                    )
+                if connection.exec_driver_sql('PRAGMA foreign_key_check').first() is not None:
+                    raise UpgradeError('Rebuilding the users table would break foreign keys; no changes were made')
+        finally:
+            connection.exec_driver_sql('PRAGMA foreign_keys=ON')
+    return True
@@ -1,29 +1,98 @@
 # app/models/user.py
 
-from app import db
+from app import db, password_hasher, replica_router, token_cache, token_revocations
 from datetime import datetime
-import bcrypt
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session, validates
+from app.utils.validators import normalize_email
 
 class User(db.Model):
     __tablename__ = 'users'
+    # Never hand a deleted user's id to someone else: their unexpired tokens carry it
+    __table_args__ = {'sqlite_autoincrement': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    email_normalized = db.Column(db.String(255), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
+    token_version = db.Column(db.Integer, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @validates('email')
+    def set_email_normalized(self, key, email):
+        # Keep the unique lookup key in step with the address as entered
+        self.email_normalized = normalize_email(email)
+        return email
+    
+    @classmethod
+    def find_by_email(cls, email):
+        if not isinstance(email, str):
+            return None
+        return cls.query.filter_by(email_normalized=normalize_email(email)).first()
+    
     @property
     def password(self):
         raise AttributeError('password is not a readable attribute')
     
     @password.setter
     def password(self, password):
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        self.password_hash = password_hasher.hash(password)
     
     def verify_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return password_hasher.verify(password, self.password_hash)
+    
+    def needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
+    
+    def revoke_tokens(self):
+        """Invalidate every token issued so far; takes effect once committed"""
+        self.token_version = (self.token_version or 0) + 1
+    
+    @classmethod
+    def emails_since(cls, last_id):
+        """Stream (id, email_normalized) for users with an id above last_id"""
+        return db.session.query(cls.id, cls.email_normalized).filter(cls.id > last_id).order_by(cls.id).yield_per(1000)
+    
+    @classmethod
+    def revoked_token_versions(cls):
+        """(id, token_version) for users who have revoked tokens at least once"""
+        return db.session.query(cls.id, cls.token_version).filter(cls.token_version > 0).all()
     
     def __repr__(self):
-        return f'<User {self.email}>'
\ No newline at end of file
+        return f'<User {self.email}>'
+
+@event.listens_for(User, 'after_insert')
+def read_new_user_from_primary(mapper, connection, target):
+    """The replica may not have the row yet"""
+    replica_router.mark_written(('user', target.id), ('email', target.email_normalized))
+
+def changed_users(target):
+    """User id -> token version (None once deleted) of users flushed in the target's session"""
+    return object_session(target).info.setdefault('changed_users', {})
+
+@event.listens_for(User, 'after_update')
+def invalidate_cached_tokens(mapper, connection, target):
+    """Never serve a cached snapshot of a user whose row has changed"""
+    changed_users(target)[target.id] = target.token_version
+    replica_router.mark_written(('user', target.id), ('email', target.email_normalized))
+
+@event.listens_for(User, 'after_delete')
+def revoke_deleted_user_tokens(mapper, connection, target):
+    changed_users(target)[target.id] = None
+    replica_router.mark_written(('user', target.id), ('email', target.email_normalized))
+
+@event.listens_for(Session, 'after_commit')
+def apply_committed_user_changes(session):
+    # Only once committed: before that, a concurrent request could cache the
+    # old row again, and a rollback would leave a revocation that never happened
+    for user_id, token_version in session.info.pop('changed_users', {}).items():
+        token_cache.invalidate_user(user_id)
+        if token_version is None:
+            token_revocations.revoke_all(user_id)
+        else:
+            token_revocations.revoke(user_id, token_version)
+
+@event.listens_for(Session, 'after_rollback')
+def forget_rolled_back_changes(session):
+    session.info.pop('changed_users', None)
@@ -1,12 +1,18 @@
 # app/routes/auth.py
-from flask import request
+import hmac
+from flask import request, current_app
 from flask_restx import Namespace, Resource, fields
-import jwt
-import datetime
-from app import db, limiter
+from sqlalchemy.exc import IntegrityError
+from app import auth_events, db, email_policy, limiter, login_guard, password_hasher, password_policy
+from app.models import lookups
 from app.models.user import User
-from app.config import Config
-from app.utils.validators import validate_email, validate_password_strength
+from app.models.refresh_token import RefreshToken
+from app.utils.auth_events import LOGIN_BLOCKED, LOGIN_FAILED, LOGIN_SUCCEEDED, REGISTERED
+from app.utils.auth_utils import auth_engine
+from app.utils.hashing import PasswordHasherBusy
+from app.utils.metrics import metrics
+from app.utils.rate_limit import login_account_key
+from app.utils.validators import normalize_email
 
 auth_ns = Namespace('auth', description='Authentication operations')
 
@@ -26,11 +32,49 @@ success_model = auth_ns.model('SuccessModel', {
     'message': fields.String(description='Success message')
 })
 
+refresh_model = auth_ns.model('RefreshModel', {
+    'refresh_token': fields.String(required=True, description='Refresh token from login or a previous refresh')
+})
+
+introspect_model = auth_ns.model('IntrospectModel', {
+    'tokens': fields.List(fields.String, required=True, description='Access tokens to check, without the Bearer prefix')
+})
+
+introspection_model = auth_ns.model('IntrospectionModel', {
+    'active': fields.Boolean(description='Whether the token is valid and unrevoked'),
+    'claims': fields.Raw(description='Verified claims of an active token'),
+    'reason': fields.String(description='Why an inactive token was rejected')
+})
+
+introspect_response_model = auth_ns.model('IntrospectResponseModel', {
+    'results': fields.List(fields.Nested(introspection_model), description='One result per token, in request order')
+})
+
 token_model = auth_ns.model('TokenModel', {
     'token': fields.String(description='JWT token'),
-    'expires_at': fields.DateTime(description='Token expiration time')
+    'expires_at': fields.DateTime(description='Token expiration time'),
+    'refresh_token': fields.String(description='Single-use token for /auth/refresh')
 })
 
+def token_response(user, family_id=None):
+    """Issue an access token and a refresh token; the caller commits"""
+    token, exp_time = auth_engine.issue_token(user)
+    refresh_token = RefreshToken.issue(user, current_app.config['REFRESH_TOKEN_EXPIRATION_DELTA'], family_id)
+    
+    return {
+        'token': token,
+        'expires_at': exp_time.isoformat(),
+        'refresh_token': refresh_token
+    }
+
+def credentials_error(data):
+    """Message for a register or login body without string email and password, else None"""
+    if not isinstance(data, dict) or not data.get('email') or not data.get('password'):
+        return 'Email and password are required'
+    if not isinstance(data['email'], str) or not isinstance(data['password'], str):
+        return 'Email and password must be strings'
+    return None
+
 @auth_ns.route('/register')
 class Register(Resource):
     @auth_ns.expect(register_model)
@@ -38,70 +82,179 @@ class Register(Resource):
     @auth_ns.response(400, 'Validation error')
     @auth_ns.response(409, 'Email already registered')
     def post(self):
-        data = request.json
+        with metrics.span('validation'):
+            data = request.json
         
         # Validate required fields
-        if not data or not data.get('email') or not data.get('password'):
-            return {'message': 'Email and password are required'}, 400
+        error = credentials_error(data)
+        if error:
+            return {'message': error}, 400
         
-        # Validate email format
-        if not validate_email(data.get('email')):
-            return {'message': 'Invalid email format'}, 400
+        # Validate email format (offline unless deliverability checks are enabled)
+        email, error = email_policy.check(data.get('email'))
+        if error:
+            return {'message': error}, 400
         
-        # Validate password strength
-        is_valid, message = validate_password_strength(data.get('password'))
-        if not is_valid:
-            return {'message': message}, 400
+        # Validate password strength, reporting every rule that failed
+        violations = password_policy.violations(data.get('password'))
+        if violations:
+            return {'message': violations[0], 'errors': violations}, 400
         
-        # Check if user already exists
-        if User.query.filter_by(email=data.get('email')).first():
-            return {'message': 'Email already registered'}, 409
-        
-        # Create new user
-        user = User(email=data.get('email'))
+        # Create new user; the unique index on email_normalized rejects duplicates
+        user = User(email=email)
         user.password = data.get('password')
         
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            # Tables upgraded from before email_normalized also keep their UNIQUE(email)
+            if 'email' not in str(e.orig):
+                raise
+            return {'message': 'Email already registered'}, 409
+        
+        login_guard.add_known_email(user.email_normalized)
+        auth_events.record(REGISTERED, user.email_normalized, user.id, request.remote_addr)
         
         return {'message': 'User registered successfully'}, 201
 
 @auth_ns.route('/login')
 class Login(Resource):
-    @limiter.limit("5 per minute")
+    # Applied to the registered view function; flask-limiter matches limits by
+    # view name, so decorating post() directly would never be enforced
+    decorators = [
+        limiter.limit(lambda: current_app.config['LOGIN_RATE_LIMIT']),
+        limiter.limit(lambda: current_app.config['LOGIN_ACCOUNT_RATE_LIMIT'], key_func=login_account_key)
+    ]
+    
     @auth_ns.expect(login_model)
     @auth_ns.response(200, 'Login successful', token_model)
     @auth_ns.response(401, 'Invalid credentials')
+    @auth_ns.response(429, 'Too many failed login attempts')
     def post(self):
-        data = request.json
+        with metrics.span('validation'):
+            data = request.json
         
         # Validate required fields
-        if not data or not data.get('email') or not data.get('password'):
-            return {'message': 'Email and password are required'}, 400
+        error = credentials_error(data)
+        if error:
+            return {'message': error}, 400
+        
+        # Turn away locked accounts and stuffing IPs before any bcrypt work
+        email = normalize_email(data.get('email'))
+        retry_after = login_guard.check(request.remote_addr, email)
+        if retry_after:
+            auth_events.record(LOGIN_BLOCKED, email, None, request.remote_addr)
+            return {'message': 'Too many failed login attempts'}, 429, {'Retry-After': str(retry_after)}
         
-        # Find the user
-        user = User.query.filter_by(email=data.get('email')).first()
+        # Find the user, skipping the lookup for emails that can't be registered
+        user = None
+        if login_guard.may_exist(email, User.emails_since):
+            user = lookups.find_login(email)
         
-        # Check if user exists and password is correct
-        if not user or not user.verify_password(data.get('password')):
+        # Check if user exists and password is correct; unknown emails cost the same as wrong passwords
+        if not user:
+            password_hasher.dummy_verify(data.get('password'))
+        if not user or not password_hasher.verify(data.get('password'), user.password_hash):
+            login_guard.record_failure(request.remote_addr, email)
+            auth_events.record(LOGIN_FAILED, email, user.id if user else None, request.remote_addr)
             return {'message': 'Invalid credentials'}, 401
         
-        # Generate expiration time
-        exp_time = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=Config.JWT_EXPIRATION_DELTA)
-        
-        # Generate JWT token
-        token = jwt.encode(
-            {
-                'sub': user.id,
-                'email': user.email,
-                'iat': datetime.datetime.now(datetime.UTC),
-                'exp': exp_time
-            },
-            Config.JWT_SECRET_KEY,
-            algorithm='HS256'
-        )
-        
-        return {
-            'token': token,
-            'expires_at': exp_time.isoformat()
-        }, 200
\ No newline at end of file
+        login_guard.record_success(request.remote_addr, email)
+        
+        # Upgrade the stored hash if the configured cost has changed
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                lookups.set_password_hash(user.id, email, password_hasher.hash(data.get('password')))
+            except PasswordHasherBusy:
+                # The password is correct; the upgrade can wait for a later login
+                pass
+        
+        # Generate JWT and refresh tokens
+        response = token_response(user)
+        db.session.commit()
+        auth_events.record(LOGIN_SUCCEEDED, email, user.id, request.remote_addr)
+        
+        return response, 200
+
+@auth_ns.route('/refresh')
+class Refresh(Resource):
+    @auth_ns.expect(refresh_model)
+    @auth_ns.response(200, 'Token refreshed', token_model)
+    @auth_ns.response(401, 'Invalid refresh token')
+    def post(self):
+        data = request.json
+        
+        refresh_token = data.get('refresh_token') if isinstance(data, dict) else None
+        if not refresh_token or not isinstance(refresh_token, str):
+            return {'message': 'Refresh token is required'}, 400
+        
+        record = RefreshToken.find(refresh_token)
+        if not record or record.revoked_at or not record.user:
+            return {'message': 'Invalid refresh token'}, 401
+        
+        # A rotated token presented again has leaked; revoke its whole family
+        if record.used_at or not record.mark_used():
+            RefreshToken.revoke_family(record.family_id)
+            db.session.commit()
+            return {'message': 'Invalid refresh token'}, 401
+        
+        if record.is_expired or record.token_version < record.user.token_version:
+            db.session.commit()
+            return {'message': 'Invalid refresh token'}, 401
+        
+        response = token_response(record.user, record.family_id)
+        db.session.commit()
+        
+        return response, 200
+
+def introspection_client():
+    """Return the client_id of a caller presenting valid INTROSPECT_CLIENTS credentials, else None"""
+    auth = request.authorization
+    if auth is None or auth.type != 'basic' or not auth.username or auth.password is None:
+        return None
+    
+    presented = f'{auth.username}:{auth.password}'.encode()
+    matched = None
+    # Compare against every entry so the response time doesn't reveal which ids exist
+    for entry in current_app.config['INTROSPECT_CLIENTS'].split(','):
+        client_id, sep, secret = entry.strip().partition(':')
+        if sep and client_id and secret and hmac.compare_digest(presented, f'{client_id}:{secret}'.encode()):
+            matched = client_id
+    return matched
+
+@auth_ns.route('/introspect')
+class Introspect(Resource):
+    # Gateways call this in bulk; give it its own limit instead of the per-client defaults
+    decorators = [limiter.limit(lambda: current_app.config['INTROSPECT_RATE_LIMIT'])]
+    
+    @auth_ns.doc(security='Introspection Client')
+    @auth_ns.expect(introspect_model)
+    @auth_ns.response(200, 'Introspection results', introspect_response_model)
+    @auth_ns.response(400, 'Validation error')
+    @auth_ns.response(401, 'Client authentication required')
+    def post(self):
+        # RFC 7662 section 2.1: only authenticated resource servers may probe tokens
+        if introspection_client() is None:
+            return {'message': 'Client authentication required'}, 401, {'WWW-Authenticate': 'Basic realm="introspect"'}
+        
+        with metrics.span('validation'):
+            data = request.json
+        
+        tokens = data.get('tokens') if isinstance(data, dict) else None
+        if not isinstance(tokens, list) or not all(isinstance(token, str) for token in tokens):
+            return {'message': 'tokens must be a list of strings'}, 400
+        
+        max_tokens = current_app.config['INTROSPECT_MAX_TOKENS']
+        if len(tokens) > max_tokens:
+            return {'message': f'At most {max_tokens} tokens per request'}, 400
+        
+        results = []
+        for result in auth_engine.introspect(tokens):
+            if result.ok:
+                results.append({'active': True, 'claims': result.claims})
+            else:
+                results.append({'active': False, 'reason': result.failure.reason})
+        
+        return {'results': results}, 200
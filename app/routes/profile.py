@@ -16,6 +16,6 @@ class Profile(Resource):
     @profile_ns.doc(security='Bearer Auth')
     @profile_ns.response(200, 'Success', profile_model)
     @profile_ns.response(401, 'Authentication required')
-    @token_required
+    @token_required(load_user=False)
     def get(self, current_user):
         return {'message': f'Welcome, {current_user.email}!'}, 200
\ No newline at end of file
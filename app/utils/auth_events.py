@@ -0,0 +1,209 @@
+# app/utils/auth_events.py
+
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.engine import make_url
+
+LOGIN_SUCCEEDED = 'login_succeeded'
+LOGIN_FAILED = 'login_failed'
+LOGIN_BLOCKED = 'login_blocked'
+REGISTERED = 'registered'
+
+# Column sizes; longer client-supplied values are cut to fit rather than failing the insert
+EMAIL_MAX_LENGTH = 255
+IP_MAX_LENGTH = 45
+
+_STOP = object()
+
+
+class AuthEventLog:
+    """
+    Write-behind audit log of authentication events.
+
+    record() only appends to a bounded in-process queue, so requests never
+    wait on an audit commit. A writer thread inserts queued events into
+    auth_events in multi-row transactions of up to AUTH_EVENTS_BATCH_SIZE,
+    at least every AUTH_EVENTS_FLUSH_INTERVAL seconds while events are
+    waiting. When the queue is full new events are dropped and counted
+    rather than blocking the request. A batch the database rejects is
+    retried one row at a time, so one bad row can't take the others with
+    it; rows that still fail are counted.
+
+    Pending events are written on shutdown() (called at interpreter exit,
+    by the ASGI lifespan and by gunicorn's worker_exit). A crash loses at
+    most the events still queued.
+
+    An in-memory SQLite database lives on one shared connection, so there
+    each event is written immediately on the request thread instead.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.queue_size = 10000
+        self.batch_size = 500
+        self.flush_interval = 1.0
+        self._queue = None
+        self._writer = None
+        self._app = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+        self.reset_stats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.shutdown()
+        self.enabled = app.config.get('AUTH_EVENTS_ENABLED', True)
+        self.queue_size = app.config.get('AUTH_EVENTS_QUEUE_SIZE', 10000)
+        self.batch_size = app.config.get('AUTH_EVENTS_BATCH_SIZE', 500)
+        self.flush_interval = app.config.get('AUTH_EVENTS_FLUSH_INTERVAL', 1.0)
+        self.reset_stats()
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+        app.extensions['auth_events'] = self
+
+    def record(self, event_type, email=None, user_id=None, ip_address=None):
+        """Queue an event; never blocks and never raises for a full queue"""
+        if not self.enabled:
+            return
+        event = {
+            'event_type': event_type,
+            'email_normalized': email[:EMAIL_MAX_LENGTH] if email else email,
+            'user_id': user_id,
+            'ip_address': ip_address[:IP_MAX_LENGTH] if ip_address else ip_address,
+            'created_at': datetime.utcnow(),
+        }
+        events = self._get_queue()
+        if events is None:
+            self._write(self._app, [event])
+            return
+        try:
+            events.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def flush(self, timeout=5):
+        """Block until every event queued so far has been written"""
+        writer, events = self._writer, self._queue
+        if writer is None or not writer.is_alive():
+            return
+        done = threading.Event()
+        try:
+            events.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def shutdown(self, timeout=5):
+        """Write pending events and stop the writer; it restarts on the next event"""
+        with self._lock:
+            writer, events = self._writer, self._queue
+            self._writer = self._queue = self._app = self._pid = None
+        if writer is not None and writer.is_alive():
+            try:
+                events.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            writer.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize() if self._queue is not None else 0,
+                'written': self.written,
+                'batches': self.batches,
+                'dropped': self.dropped,
+                'failed': self.failed,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.written = 0
+            self.batches = 0
+            self.dropped = 0
+            self.failed = 0
+
+    def _get_queue(self):
+        # Threads don't survive fork, so each worker process starts its own writer
+        # bound to the app that handled its first event
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._app = current_app._get_current_object()
+                    url = make_url(self._app.config['SQLALCHEMY_DATABASE_URI'])
+                    self._queue = self._writer = None
+                    if not (url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:')):
+                        self._queue = queue.Queue(self.queue_size)
+                        self._writer = threading.Thread(
+                            target=self._run, args=(self._app, self._queue), name='auth-events', daemon=True
+                        )
+                        self._writer.start()
+                    self._pid = pid
+        return self._queue
+
+    def _run(self, app, events):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = events.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if isinstance(item, dict):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+
+            # Batch full, interval elapsed, flush requested or stopping
+            if batch:
+                self._write(app, batch)
+                batch = []
+            deadline = None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+    def _write(self, app, batch):
+        error = self._insert(app, batch)
+        if error is None:
+            with self._lock:
+                self.written += len(batch)
+                self.batches += 1
+            return
+
+        # Find the rows the database won't take instead of losing the whole batch
+        failed = [event for event in batch if len(batch) == 1 or self._insert(app, [event]) is not None]
+        with self._lock:
+            self.written += len(batch) - len(failed)
+            self.batches += 1
+            self.failed += len(failed)
+        if failed:
+            app.logger.error('Failed to write %d of %d auth events: %s', len(failed), len(batch), error)
+
+    @staticmethod
+    def _insert(app, rows):
+        """Insert rows in one transaction; returns the exception on failure, else None"""
+        from app import db
+        from app.models.auth_event import AuthEvent
+
+        try:
+            with app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(insert(AuthEvent.__table__), rows)
+        except Exception as e:
+            return e
+        return None
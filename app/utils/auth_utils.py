@@ -1,44 +1,254 @@
 # app/utils/auth_utils.py
 
+import datetime
+from collections import namedtuple
 import jwt
-from flask import request, current_app
+from jwt.algorithms import get_default_algorithms
+from flask import request
+from app import token_cache, token_revocations
+from app.models import lookups
 from app.models.user import User
-from functools import wraps
+from app.utils.metrics import metrics
+from app.utils.principal import Principal
+from app.utils.token_cache import UserSnapshot
+
+# Why authentication failed; `reason` is stable for clients, `message` is what we return
+AuthFailure = namedtuple('AuthFailure', ['reason', 'message'])
+
+MISSING_TOKEN = AuthFailure('missing_token', 'Authentication required')
+MALFORMED_HEADER = AuthFailure('malformed_header', 'Authentication required')
+EXPIRED_TOKEN = AuthFailure('expired_token', 'Token has expired')
+INVALID_TOKEN = AuthFailure('invalid_token', 'Invalid token')
+UNKNOWN_USER = AuthFailure('unknown_user', 'Invalid token')
+REVOKED_TOKEN = AuthFailure('revoked_token', 'Token has been revoked')
+
+BEARER_PREFIX = 'Bearer '
+
+# Shared-secret tokens have nothing to publish
+EMPTY_JWKS = b'{"keys":[]}'
+EMPTY_JWKS_ETAG = 'empty'
+
+
+class AuthResult(namedtuple('AuthResult', ['claims', 'user', 'failure'])):
+    """Outcome of authenticating a request: claims and user on success, failure otherwise"""
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.failure is None
+
+
+class AuthEngine:
+    """
+    Single authentication pipeline shared by token_required and the helpers below.
+
+    Everything that doesn't change per request (signing key, algorithm list,
+    decode options) is prepared once in init_app, so a request only pays for
+    header parsing, signature verification and, when needed, the user lookup.
+
+    HS* algorithms sign with JWT_SECRET_KEY. Asymmetric algorithms sign with
+    the active key of a KeyRing, put its ``kid`` in the token header and
+    verify with whichever ring key the header names.
+    """
+
+    def __init__(self, app=None):
+        self._key = None
+        self.keyring = None
+        self.keyring_error = None
+        self._algorithm = 'HS256'
+        self._algorithms = ['HS256']
+        self._decoder = jwt.PyJWT()
+        self._decode_kwargs = {}
+        self._claims = {}
+        self.expiration = 3600
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._algorithm = app.config.get('JWT_ALGORITHM', 'HS256')
+        self._algorithms = [self._algorithm]
+        self.keyring = self.keyring_error = None
+        if self._algorithm.startswith('HS'):
+            self._key = get_default_algorithms()[self._algorithm].prepare_key(app.config['JWT_SECRET_KEY'])
+        else:
+            # A missing keyring is reported on first use rather than here so
+            # `flask keys generate` can still load the app to create one.
+            # cryptography is only imported when asymmetric signing is in use.
+            from app.utils.keyring import KeyRing, KeyRingError
+            try:
+                self.keyring = KeyRing.from_directory(
+                    app.config['JWT_KEYS_DIR'], self._algorithm, app.config.get('JWT_ACTIVE_KID')
+                )
+                self._key = self.keyring.active.private_key
+            except (KeyRingError, OSError) as e:
+                self.keyring_error = KeyRingError(str(e))
+                app.logger.error('JWT keyring unavailable: %s', e)
+        self._decoder = jwt.PyJWT(options={'require': ['exp', 'sub']})
+        self._decode_kwargs = {'algorithms': self._algorithms, 'leeway': app.config.get('JWT_LEEWAY', 0)}
+        self._claims = {}
+        if app.config.get('JWT_AUDIENCE'):
+            self._decode_kwargs['audience'] = self._claims['aud'] = app.config['JWT_AUDIENCE']
+        if app.config.get('JWT_ISSUER'):
+            self._decode_kwargs['issuer'] = self._claims['iss'] = app.config['JWT_ISSUER']
+        self.expiration = app.config.get('JWT_EXPIRATION_DELTA', 3600)
+        app.extensions['auth_engine'] = self
+
+    def issue_token(self, user):
+        """Sign an access token for a user, returning (token, expiration time)"""
+        if self.keyring_error:
+            raise self.keyring_error
+        now = datetime.datetime.now(datetime.UTC)
+        exp_time = now + datetime.timedelta(seconds=self.expiration)
+        claims = {
+            'sub': user.id,
+            'email': user.email,
+            'ver': user.token_version,
+            'iat': now,
+            'exp': exp_time
+        }
+        claims.update(self._claims)
+        headers = {'kid': self.keyring.active.kid} if self.keyring else None
+        with metrics.span('jwt'):
+            token = self._decoder.encode(claims, self._key, algorithm=self._algorithm, headers=headers)
+        return token, exp_time
+
+    @staticmethod
+    def parse_header(auth_header):
+        """Return (token, failure) from an Authorization header value"""
+        if not auth_header:
+            return None, MISSING_TOKEN
+        if not auth_header.startswith(BEARER_PREFIX):
+            return None, MALFORMED_HEADER
+        end = auth_header.find(' ', 7)
+        token = auth_header[7:] if end == -1 else auth_header[7:end]
+        if not token:
+            return None, MISSING_TOKEN
+        return token, None
+
+    def decode(self, token):
+        """Verify a token's signature and registered claims"""
+        if self.keyring_error:
+            raise self.keyring_error
+        with metrics.span('jwt'):
+            return self._decode(token)
+
+    def _decode(self, token):
+        try:
+            key = self._key
+            if self.keyring:
+                signing_key = self.keyring.get(jwt.get_unverified_header(token).get('kid'))
+                if signing_key is None:
+                    return AuthResult(None, None, INVALID_TOKEN)
+                key = signing_key.public_key
+            return AuthResult(self._decoder.decode(token, key, **self._decode_kwargs), None, None)
+        except jwt.ExpiredSignatureError:
+            return AuthResult(None, None, EXPIRED_TOKEN)
+        except jwt.InvalidTokenError:
+            return AuthResult(None, None, INVALID_TOKEN)
+
+    def authenticate(self, auth_header, load_user=True, fresh=False):
+        """
+        Run the full pipeline for an Authorization header.
+
+        With load_user the result's user is a UserSnapshot backed by the
+        database (through the token cache, unless fresh); otherwise it is a
+        Principal built from the claims and checked against the in-memory
+        revocations.
+        """
+        token, failure = self.parse_header(auth_header)
+        if failure:
+            return AuthResult(None, None, failure)
+
+        if load_user and not fresh:
+            cached = token_cache.get(token)
+            if cached:
+                return AuthResult(cached[0], cached[1], None)
+
+        result = self.decode(token)
+        if not result.ok:
+            return result
+        claims = result.claims
+
+        if not load_user:
+            if not token_revocations.loaded:
+                token_revocations.load(User.revoked_token_versions())
+            if token_revocations.is_revoked(claims['sub'], claims.get('ver', 0)):
+                return AuthResult(claims, None, REVOKED_TOKEN)
+            return AuthResult(claims, Principal.from_claims(claims), None)
+
+        generation = token_cache.generation
+        user = lookups.find_auth(claims['sub'])
+        if not user:
+            return AuthResult(claims, None, UNKNOWN_USER)
+
+        if claims.get('ver', 0) < user.token_version:
+            token_revocations.revoke(user.id, user.token_version)
+            return AuthResult(claims, None, REVOKED_TOKEN)
+
+        current_user = UserSnapshot(user.id, user.email)
+        token_cache.put(token, claims, current_user, generation)
+        return AuthResult(claims, current_user, None)
+
+    def introspect(self, tokens):
+        """
+        Authenticate a batch of raw tokens, returning an AuthResult per token
+        in the same order.
+
+        Repeated tokens are verified once, tokens in the cache skip decoding,
+        and the users behind every other valid token are loaded with a single
+        IN query, so a batch costs one round trip to the database at most.
+        """
+        results = {}
+        decoded = {}
+        for token in dict.fromkeys(tokens):
+            if not token:
+                results[token] = AuthResult(None, None, INVALID_TOKEN)
+                continue
+            cached = token_cache.get(token)
+            if cached:
+                results[token] = AuthResult(cached[0], cached[1], None)
+                continue
+            result = self.decode(token)
+            if result.ok:
+                decoded[token] = result.claims
+            else:
+                results[token] = result
+
+        generation = token_cache.generation
+        users = lookups.find_auth_many({claims['sub'] for claims in decoded.values()})
+        for token, claims in decoded.items():
+            user = users.get(claims['sub'])
+            if user is None:
+                results[token] = AuthResult(claims, None, UNKNOWN_USER)
+                continue
+            if claims.get('ver', 0) < user.token_version:
+                token_revocations.revoke(user.id, user.token_version)
+                results[token] = AuthResult(claims, None, REVOKED_TOKEN)
+                continue
+            current_user = UserSnapshot(user.id, user.email)
+            token_cache.put(token, claims, current_user, generation)
+            results[token] = AuthResult(claims, current_user, None)
+
+        return [results[token] for token in tokens]
+
+    def jwks(self):
+        """Return the public JWKS document as (bytes, etag)"""
+        if self.keyring is None:
+            return EMPTY_JWKS, EMPTY_JWKS_ETAG
+        return self.keyring.jwks, self.keyring.jwks_etag
+
+
+auth_engine = AuthEngine()
 
 def get_token_from_header():
     """Extract JWT token from the Authorization header"""
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None
-    
-    return auth_header.split(' ')[1]
+    return auth_engine.parse_header(request.headers.get('Authorization'))[0]
 
 def decode_token(token):
     """Decode and validate JWT token"""
-    try:
-        payload = jwt.decode(
-            token,
-            current_app.config['JWT_SECRET_KEY'],
-            algorithms=['HS256']
-        )
-        return payload
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
-        return None
+    return auth_engine.decode(token).claims
 
 def get_user_from_token():
     """Get user from token in Authorization header"""
-    token = get_token_from_header()
-    if not token:
-        return None
-    
-    payload = decode_token(token)
-    if not payload:
-        return None
-    
-    user_id = payload.get('sub')
-    if not user_id:
-        return None
-    
-    return User.query.get(user_id)
\ No newline at end of file
+    return auth_engine.authenticate(request.headers.get('Authorization')).user
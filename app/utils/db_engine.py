@@ -0,0 +1,84 @@
+# app/utils/db_engine.py
+
+from functools import partial
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+PROFILES = ('auto', 'sqlite', 'server')
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def select_profile(config, sa_url):
+    """Resolve DB_PROFILE, inferring it from the database URL when set to auto"""
+    profile = config.get('DB_PROFILE', 'auto')
+    if profile not in PROFILES:
+        raise ValueError(f'Unknown DB_PROFILE: {profile}')
+    if profile == 'auto':
+        return 'sqlite' if sa_url.drivername.startswith('sqlite') else 'server'
+    return profile
+
+
+def sqlite_pragmas(config, in_memory):
+    """PRAGMA statements run on every new SQLite connection"""
+    synchronous = config.get('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f'Unknown SQLITE_SYNCHRONOUS: {synchronous}')
+    pragmas = [
+        f'PRAGMA synchronous={synchronous}',
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        'PRAGMA foreign_keys=ON',
+    ]
+    if not in_memory:
+        # WAL lets readers run alongside the single writer; it has no meaning in memory
+        pragmas.insert(0, 'PRAGMA journal_mode=WAL')
+        pragmas.append(f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 0))}")
+    return pragmas
+
+
+def apply_pragmas(pragmas, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in pragmas:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+class ProfiledSQLAlchemy(SQLAlchemy):
+    """
+    SQLAlchemy extension that tunes the engine for the selected DB_PROFILE.
+
+    Options are worked out when the engine is created rather than in
+    create_app, so they always match the URI actually in use (tests swap in
+    an in-memory database after the app is built).
+
+    - sqlite: pooled connections shared across threads, WAL journaling,
+      synchronous=NORMAL, a busy timeout and memory-mapped reads.
+    - server: a bounded QueuePool with overflow, pre-ping and recycling.
+    """
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        profile = select_profile(app.config, sa_url)
+        if profile == 'sqlite':
+            if sa_url.database not in (None, '', ':memory:'):
+                options.setdefault('connect_args', {})['check_same_thread'] = False
+                options.setdefault('poolclass', QueuePool)
+                options.setdefault('pool_size', app.config.get('DB_POOL_SIZE', 5))
+                options.setdefault('max_overflow', app.config.get('DB_MAX_OVERFLOW', 10))
+        else:
+            options.setdefault('poolclass', QueuePool)
+            options.setdefault('pool_size', app.config.get('DB_POOL_SIZE', 5))
+            options.setdefault('max_overflow', app.config.get('DB_MAX_OVERFLOW', 10))
+            options.setdefault('pool_timeout', app.config.get('DB_POOL_TIMEOUT', 30))
+            options.setdefault('pool_recycle', app.config.get('DB_POOL_RECYCLE', 1800))
+            options.setdefault('pool_pre_ping', app.config.get('DB_POOL_PRE_PING', True))
+        return super().apply_driver_hacks(app, sa_url, options)
+
+    def create_engine(self, sa_url, engine_opts):
+        engine = super().create_engine(sa_url, engine_opts)
+        app = self.get_app()
+        if engine.dialect.name == 'sqlite' and select_profile(app.config, sa_url) == 'sqlite':
+            pragmas = sqlite_pragmas(app.config, sa_url.database in (None, '', ':memory:'))
+            event.listen(engine, 'connect', partial(apply_pragmas, pragmas))
+        return engine
@@ -0,0 +1,102 @@
+# app/utils/db_router.py
+
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy.exc import DBAPIError
+
+REPLICA_BIND = 'replica'
+
+
+class ReplicaRouter:
+    """
+    Sends read-only lookups to a replica and everything else to the primary.
+
+    The replica is the 'replica' entry of SQLALCHEMY_BINDS (set from
+    DATABASE_REPLICA_URL); without one every read uses the session's primary
+    connection as before. Writes always go through the session, so they
+    reach the primary.
+
+    A replica lags behind its primary, so a user who has just been written
+    (registered, revoked, rehashed) is read from the primary for
+    DB_READ_YOUR_WRITES_SECONDS afterwards. Writes are tracked by key in
+    this process only; a request landing on another worker during the
+    window may still see the replica's older row. A replica that fails a
+    query is skipped in favour of the primary for that read.
+    """
+
+    def __init__(self, app=None):
+        self.window = 5
+        self.max_tracked = 100000
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallbacks = 0
+        self._recent = OrderedDict()  # key -> monotonic time the window closes
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.window = app.config.get('DB_READ_YOUR_WRITES_SECONDS', 5)
+        self.max_tracked = app.config.get('DB_READ_YOUR_WRITES_MAX_TRACKED', 100000)
+        self.reset()
+        app.extensions['replica_router'] = self
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self.replica_reads = self.primary_reads = self.fallbacks = 0
+
+    def mark_written(self, *keys):
+        """Read these keys from the primary until the window closes"""
+        if not self.window:
+            return
+        closes_at = time.monotonic() + self.window
+        with self._lock:
+            for key in keys:
+                self._recent[key] = closes_at
+                self._recent.move_to_end(key)
+            while len(self._recent) > self.max_tracked:
+                self._recent.popitem(last=False)
+
+    def recently_written(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                closes_at = self._recent.get(key)
+                if closes_at is not None:
+                    if closes_at > now:
+                        return True
+                    del self._recent[key]
+        return False
+
+    def read(self, statement, params, keys=()):
+        """All rows of a read-only statement, from the replica when that is safe"""
+        from app import db
+
+        binds = current_app.config.get('SQLALCHEMY_BINDS') or {}
+        if REPLICA_BIND in binds and not self.recently_written(keys):
+            try:
+                with db.get_engine(bind=REPLICA_BIND).connect() as connection:
+                    rows = connection.execute(statement, params).all()
+                with self._lock:
+                    self.replica_reads += 1
+                return rows
+            except DBAPIError as e:
+                with self._lock:
+                    self.fallbacks += 1
+                current_app.logger.warning('Replica read failed, using the primary: %s', e)
+
+        with self._lock:
+            self.primary_reads += 1
+        return db.session.connection().execute(statement, params).all()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'replica_reads': self.replica_reads,
+                'primary_reads': self.primary_reads,
+                'fallbacks': self.fallbacks,
+                'tracked_writes': len(self._recent),
+            }
@@ -1,35 +1,30 @@
 # app/utils/decorators.py
-from functools import wraps
-from flask import request, current_app
-import jwt
-from app.models.user import User
+from functools import wraps, partial
+from flask import request
+from app.utils.auth_utils import auth_engine
 
-def token_required(f):
-    """Decorator to require JWT token for route access"""
+def token_required(f=None, load_user=True, fresh=False):
+    """
+    Decorator to require JWT token for route access.
+    
+    With load_user=False the view gets a Principal built from the verified
+    claims and no database lookup is made; use it for routes that only need
+    what the token already carries.
+    
+    With fresh=True the token cache is bypassed and the user's token version
+    is checked against the database on every request, so a revocation made
+    by another worker applies at once; use it for sensitive routes.
+    """
+    if f is None:
+        return partial(token_required, load_user=load_user, fresh=fresh)
+    
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
+        result = auth_engine.authenticate(request.headers.get('Authorization'), load_user, fresh)
         
-        if not token:
-            return {'message': 'Authentication required'}, 401
+        if not result.ok:
+            return {'message': result.failure.message}, 401
         
-        try:
-            payload = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
-            current_user = User.query.get(payload['sub'])
-            
-            if not current_user:
-                return {'message': 'Invalid token'}, 401
-                
-        except jwt.ExpiredSignatureError:
-            return {'message': 'Token has expired'}, 401
-        except jwt.InvalidTokenError:
-            return {'message': 'Invalid token'}, 401
-            
-        return f(current_user=current_user, *args, **kwargs)
+        return f(current_user=result.user, *args, **kwargs)
     
     return decorated
\ No newline at end of file
@@ -0,0 +1,139 @@
+# app/utils/email_policy.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from app.utils.metrics import metrics
+
+DEFAULT_DISPOSABLE_DOMAINS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'disposable_domains.txt'
+)
+
+INVALID_EMAIL = 'Invalid email format'
+DISPOSABLE_EMAIL = 'Disposable email addresses are not allowed'
+UNDELIVERABLE_EMAIL = 'Email domain does not accept mail'
+
+
+def load_domains(path):
+    """Read a one-domain-per-line list, skipping blanks and # comments"""
+    with open(path, encoding='utf-8') as f:
+        return frozenset(
+            line.strip().lower() for line in f if line.strip() and not line.lstrip().startswith('#')
+        )
+
+
+class DomainCache:
+    """Bounded LRU of per-domain deliverability results with a TTL"""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, domain):
+        """Cached result for domain, or None when unknown or expired"""
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[domain]
+                return None
+            self._entries.move_to_end(domain)
+            return entry[0]
+
+    def put(self, domain, result):
+        with self._lock:
+            self._entries[domain] = (result, time.monotonic() + self.ttl)
+            self._entries.move_to_end(domain)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class EmailPolicy:
+    """
+    Email checks for registration.
+
+    Syntax is always checked, offline. Disposable domains are rejected with
+    a frozenset lookup on the domain and each parent domain, so the cost
+    depends on the number of labels, not the size of the list. DNS
+    deliverability checks are opt-in (EMAIL_CHECK_DELIVERABILITY) and their
+    results are cached per domain, so only the first address at a domain
+    pays for the lookup.
+    """
+
+    def __init__(self, app=None):
+        self.check_deliverability = False
+        self.dns_timeout = 5
+        self.block_disposable = True
+        self.disposable_domains = frozenset()
+        self.domain_cache = DomainCache(10000, 3600)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.check_deliverability = app.config.get('EMAIL_CHECK_DELIVERABILITY', False)
+        self.dns_timeout = app.config.get('EMAIL_DNS_TIMEOUT', 5)
+        self.block_disposable = app.config.get('EMAIL_BLOCK_DISPOSABLE', True)
+        self.disposable_domains = frozenset()
+        if self.block_disposable:
+            self.disposable_domains = load_domains(
+                app.config.get('EMAIL_DISPOSABLE_DOMAINS_FILE') or DEFAULT_DISPOSABLE_DOMAINS_FILE
+            )
+        self.domain_cache = DomainCache(
+            app.config.get('EMAIL_DOMAIN_CACHE_SIZE', 10000), app.config.get('EMAIL_DOMAIN_CACHE_TTL', 3600)
+        )
+        app.extensions['email_policy'] = self
+
+    def check(self, email):
+        """Return (normalized address, None) when acceptable, else (None, message)"""
+        with metrics.span('validation'):
+            return self._check(email)
+
+    def _check(self, email):
+        # email_validator pulls in dnspython; import it on first use, not at startup
+        from email_validator import validate_email as validate_email_lib, EmailNotValidError
+
+        try:
+            validated = validate_email_lib(email.strip(), check_deliverability=False)
+        except EmailNotValidError:
+            return None, INVALID_EMAIL
+
+        if self.is_disposable(validated.ascii_domain):
+            return None, DISPOSABLE_EMAIL
+        if self.check_deliverability and not self.is_deliverable(validated.ascii_domain, validated.domain):
+            return None, UNDELIVERABLE_EMAIL
+        return validated.email, None
+
+    def is_disposable(self, domain):
+        if not self.disposable_domains:
+            return False
+        domain = domain.lower()
+        while True:
+            if domain in self.disposable_domains:
+                return True
+            _, dot, domain = domain.partition('.')
+            if not dot:
+                return False
+
+    def is_deliverable(self, ascii_domain, domain_i18n):
+        result = self.domain_cache.get(ascii_domain)
+        if result is None:
+            from email_validator import validate_email_deliverability, EmailUndeliverableError
+
+            try:
+                answer = validate_email_deliverability(ascii_domain, domain_i18n, timeout=self.dns_timeout)
+            except EmailUndeliverableError:
+                answer = None
+            # A DNS timeout says nothing about the domain: accept, but ask again next time
+            if answer and 'unknown-deliverability' in answer:
+                return True
+            result = answer is not None
+            self.domain_cache.put(ascii_domain, result)
+        return result
@@ -0,0 +1,210 @@
+# app/utils/hashing.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import bcrypt
+from app.utils.metrics import metrics
+
+EXECUTORS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full and the request should be retried later"""
+
+    def __init__(self, retry_after):
+        super().__init__('Password hashing queue is full')
+        self.retry_after = retry_after
+
+
+def hash_rounds(password_hash):
+    """Return the cost factor encoded in a bcrypt hash such as ``$2b$12$...``"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrate_rounds(target_seconds, min_rounds=4, max_rounds=16):
+    """
+    Pick the highest bcrypt cost whose verify time stays within target_seconds
+    on this machine. Each extra round doubles the work, so we stop as soon as
+    the next step would overshoot the target.
+    """
+    password = b'calibration-password'
+    rounds = min_rounds
+    password_hash = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+    elapsed = _checkpw(password, password_hash)[1]
+    while rounds < max_rounds and elapsed * 2 <= target_seconds:
+        rounds += 1
+        password_hash = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+        elapsed = _checkpw(password, password_hash)[1]
+    return rounds
+
+
+def _hashpw(password, salt):
+    """Hash a password in a worker, returning the hash and the time spent hashing"""
+    start = time.perf_counter()
+    password_hash = bcrypt.hashpw(password, salt)
+    return password_hash, time.perf_counter() - start
+
+
+def _checkpw(password, password_hash):
+    """Verify a password in a worker, returning the result and the time spent verifying"""
+    start = time.perf_counter()
+    result = bcrypt.checkpw(password, password_hash)
+    return result, time.perf_counter() - start
+
+
+class OperationStats:
+    """Running timing totals for a single hashing operation"""
+
+    __slots__ = ('count', 'run_seconds', 'wait_seconds', 'max_run_seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.run_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def record(self, run_seconds, wait_seconds):
+        self.count += 1
+        self.run_seconds += run_seconds
+        self.wait_seconds += wait_seconds
+        if run_seconds > self.max_run_seconds:
+            self.max_run_seconds = run_seconds
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'run_seconds': self.run_seconds,
+            'wait_seconds': self.wait_seconds,
+            'max_run_seconds': self.max_run_seconds,
+            'avg_run_seconds': self.run_seconds / self.count if self.count else 0.0,
+        }
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a fixed-size worker pool.
+
+    At most ``max_in_flight`` operations are admitted at once (running plus
+    queued); anything beyond that raises PasswordHasherBusy immediately so the
+    request thread is never parked behind a login burst.
+    """
+
+    def __init__(self, app=None):
+        self.executor_type = 'thread'
+        self.rounds = 12
+        self.max_workers = os.cpu_count() or 1
+        self.max_in_flight = self.max_workers * 4
+        self.retry_after = 1
+        self.rejected = 0
+        self._executor = None
+        self._executor_pid = None
+        self._dummy_hash = None
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self._stats = {'hash': OperationStats(), 'verify': OperationStats()}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure the pool from the app config"""
+        self.shutdown()
+        self.executor_type = app.config.get('PASSWORD_HASH_EXECUTOR', 'thread')
+        if self.executor_type not in EXECUTORS:
+            raise ValueError(f'Unknown PASSWORD_HASH_EXECUTOR: {self.executor_type}')
+        self.max_workers = app.config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 1
+        self.max_in_flight = app.config.get('PASSWORD_HASH_MAX_IN_FLIGHT') or self.max_workers * 4
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', 1)
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self.rounds = app.config.get('BCRYPT_ROUNDS', 12)
+        if app.config.get('BCRYPT_CALIBRATE'):
+            self.rounds = calibrate_rounds(
+                app.config.get('BCRYPT_TARGET_VERIFY_MS', 250) / 1000.0,
+                min_rounds=app.config.get('BCRYPT_MIN_ROUNDS', 10),
+                max_rounds=app.config.get('BCRYPT_MAX_ROUNDS', 16)
+            )
+            app.logger.info('Calibrated bcrypt cost to %d rounds', self.rounds)
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password):
+        """Hash a password and return the bcrypt hash as a string"""
+        password_hash = self._run('hash', _hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return password_hash.decode('utf-8')
+
+    def needs_rehash(self, password_hash):
+        """Check whether a stored hash was made with a cost other than the configured one"""
+        return hash_rounds(password_hash) != self.rounds
+
+    def verify(self, password, password_hash):
+        """Check a password against a stored bcrypt hash"""
+        return self._run('verify', _checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def dummy_verify(self, password):
+        """
+        Spend the same effort as a real verify against a hash that can never
+        match, so unknown accounts can't be told apart by response time
+        """
+        if self._dummy_hash is None or hash_rounds(self._dummy_hash) != self.rounds:
+            self._dummy_hash = self.hash(os.urandom(16).hex())
+        self.verify(password, self._dummy_hash)
+        return False
+
+    def stats(self):
+        """Return per-operation timing metrics and pool occupancy"""
+        with self._lock:
+            return {
+                'executor': self.executor_type,
+                'rounds': self.rounds,
+                'max_workers': self.max_workers,
+                'max_in_flight': self.max_in_flight,
+                'rejected': self.rejected,
+                'operations': {name: op.as_dict() for name, op in self._stats.items()},
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.rejected = 0
+            self._stats = {'hash': OperationStats(), 'verify': OperationStats()}
+
+    def shutdown(self, wait=True):
+        """Stop the worker pool; it is recreated on next use"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _get_executor(self):
+        # Pools don't survive fork, so a worker process forked from a preloaded
+        # master builds its own on first use.
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = EXECUTORS[self.executor_type](max_workers=self.max_workers)
+                    self._executor_pid = pid
+        return self._executor
+
+    def _run(self, name, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy(self.retry_after)
+
+        try:
+            submitted = time.perf_counter()
+            with metrics.span('hash'):
+                result, run_seconds = self._get_executor().submit(func, *args).result()
+            wait_seconds = max(time.perf_counter() - submitted - run_seconds, 0.0)
+        finally:
+            self._slots.release()
+
+        with self._lock:
+            self._stats[name].record(run_seconds, wait_seconds)
+        return result
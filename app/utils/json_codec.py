@@ -0,0 +1,73 @@
+# app/utils/json_codec.py
+
+import json
+from flask import Request, current_app, make_response
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library codec is used instead
+    orjson = None
+
+CODECS = ('auto', 'orjson', 'json')
+
+
+class JsonCodec:
+    """
+    JSON codec for request bodies and API responses.
+
+    JSON_CODEC picks the backend: 'orjson' (several times faster at both
+    parsing and encoding), 'json' (the standard library) or 'auto', which
+    uses orjson when it is installed. The instance has the loads/dumps
+    interface Flask expects of Request.json_module, so request.json parses
+    with it, and output_json encodes flask-restx responses with it.
+    """
+
+    def __init__(self, app=None):
+        self.name = 'json'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        name = app.config.get('JSON_CODEC', 'auto')
+        if name not in CODECS:
+            raise ValueError(f'Unknown JSON_CODEC: {name}')
+        if name == 'auto':
+            name = 'json' if orjson is None else 'orjson'
+        if name == 'orjson' and orjson is None:
+            raise ValueError('JSON_CODEC is orjson but orjson is not installed')
+        self.name = name
+        app.request_class = JsonRequest
+        app.extensions['json_codec'] = self
+
+    def loads(self, data, **kwargs):
+        """Parse str or bytes; malformed input raises a ValueError"""
+        if self.name == 'orjson':
+            return orjson.loads(data)
+        return json.loads(data)
+
+    def encode(self, obj, indent=False):
+        """Serialize to UTF-8 bytes"""
+        if self.name == 'orjson':
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        if indent:
+            return json.dumps(obj, indent=2).encode('utf-8')
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        return self.encode(obj).decode('utf-8')
+
+
+json_codec = JsonCodec()
+
+
+class JsonRequest(Request):
+    """Flask request whose get_json() parses with the configured codec"""
+
+    json_module = json_codec
+
+
+def output_json(data, code, headers=None):
+    """flask-restx representation for application/json using the configured codec"""
+    response = make_response(json_codec.encode(data, indent=current_app.debug), code)
+    response.headers.extend(headers or {})
+    return response
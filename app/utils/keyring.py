@@ -0,0 +1,130 @@
+# app/utils/keyring.py
+
+import hashlib
+import json
+import os
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import get_default_algorithms
+
+# Key types accepted for each asymmetric algorithm we sign with
+KEY_TYPES = {
+    'RS256': (rsa.RSAPrivateKey, rsa.RSAPublicKey),
+    'EdDSA': (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey),
+}
+
+PRIVATE_SUFFIX = '.pem'
+PUBLIC_SUFFIX = '.pub.pem'
+
+
+class KeyRingError(Exception):
+    """Raised when the signing keys on disk can't be used"""
+
+
+class SigningKey:
+    """One key in the ring; private_key is None for verify-only keys"""
+
+    __slots__ = ('kid', 'algorithm', 'private_key', 'public_key')
+
+    def __init__(self, kid, algorithm, private_key, public_key):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.private_key = private_key
+        self.public_key = public_key
+
+    def to_jwk(self):
+        jwk = json.loads(get_default_algorithms()[self.algorithm].to_jwk(self.public_key))
+        jwk.update({'kid': self.kid, 'alg': self.algorithm, 'use': 'sig'})
+        return jwk
+
+
+class KeyRing:
+    """
+    Asymmetric signing keys loaded from a directory.
+
+    Each ``<kid>.pem`` holds a private key and ``<kid>.pub.pem`` a public-only
+    key. The active kid signs new tokens; every key verifies. Unless one is
+    named, the active kid is the oldest key that can still sign, so adding a
+    key only publishes it. Rotation is done with overlapping windows: publish
+    the next key and let downstream JWKS caches pick it up before retiring
+    the current signing key, which hands signing to the next one; keep the
+    retired key's public half until the last token it signed has expired.
+    """
+
+    def __init__(self, algorithm, keys, active_kid):
+        if active_kid not in keys or keys[active_kid].private_key is None:
+            raise KeyRingError(f'No private key for active kid {active_kid!r}')
+        self.algorithm = algorithm
+        self.keys = keys
+        self.active = keys[active_kid]
+        self.jwks = json.dumps(
+            {'keys': [key.to_jwk() for key in keys.values()]},
+            sort_keys=True, separators=(',', ':')
+        ).encode('utf-8')
+        self.jwks_etag = hashlib.sha256(self.jwks).hexdigest()[:32]
+
+    @classmethod
+    def from_directory(cls, path, algorithm, active_kid=None):
+        if algorithm not in KEY_TYPES:
+            raise KeyRingError(f'Unsupported signing algorithm {algorithm!r}')
+        private_type, public_type = KEY_TYPES[algorithm]
+
+        keys = {}
+        for name in sorted(os.listdir(path)):
+            with open(os.path.join(path, name), 'rb') as f:
+                data = f.read()
+            if name.endswith(PUBLIC_SUFFIX):
+                kid = name[:-len(PUBLIC_SUFFIX)]
+                if kid in keys:
+                    continue
+                public_key = serialization.load_pem_public_key(data)
+                private_key = None
+            elif name.endswith(PRIVATE_SUFFIX):
+                kid = name[:-len(PRIVATE_SUFFIX)]
+                private_key = serialization.load_pem_private_key(data, password=None)
+                public_key = private_key.public_key()
+                if not isinstance(private_key, private_type):
+                    raise KeyRingError(f'Key {kid!r} is not usable with {algorithm}')
+            else:
+                continue
+            if not isinstance(public_key, public_type):
+                raise KeyRingError(f'Key {kid!r} is not usable with {algorithm}')
+            keys[kid] = SigningKey(kid, algorithm, private_key, public_key)
+
+        if not keys:
+            raise KeyRingError(f'No signing keys found in {path}')
+        if active_kid is None:
+            # Kids sort by creation time when generated with `flask keys generate`;
+            # a newer key only signs once the older ones are retired
+            signing_kids = [kid for kid, key in keys.items() if key.private_key is not None]
+            if not signing_kids:
+                raise KeyRingError(f'No private keys found in {path}')
+            active_kid = min(signing_kids)
+        return cls(algorithm, keys, active_kid)
+
+    def get(self, kid):
+        return self.keys.get(kid)
+
+
+def generate_private_key(algorithm):
+    """Create a new private key suitable for algorithm"""
+    if algorithm == 'RS256':
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == 'EdDSA':
+        return ed25519.Ed25519PrivateKey.generate()
+    raise KeyRingError(f'Unsupported signing algorithm {algorithm!r}')
+
+
+def private_key_pem(private_key):
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+
+
+def public_key_pem(public_key):
+    return public_key.public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    )
@@ -0,0 +1,221 @@
+# app/utils/login_guard.py
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class BloomFilter:
+    """Fixed-size bloom filter; answers "definitely absent" or "possibly present" """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class LoginGuard:
+    """
+    Admission checks that run before any bcrypt work on /auth/login.
+
+    - Per-account failure counters with exponential lockout.
+    - A bloom filter of registered emails: logins for addresses that surely
+      don't exist skip the user lookup and verify against a dummy hash, so
+      they cost the same as a wrong password and don't reveal which
+      accounts exist.
+    - A credential-stuffing detector that blocks an IP once it has failed
+      logins for too many distinct accounts within a window.
+
+    State is per process. The bloom filter is seeded from the database on
+    first use and catches up on newer users (by id) at most every
+    LOGIN_BLOOM_REFRESH_SECONDS, so a user registered through another worker
+    may be refused for up to that long. Ids don't always commit in order, so
+    each catch-up re-reads the last LOGIN_BLOOM_OVERLAP_IDS ids as well, and
+    the filter is rebuilt from scratch every LOGIN_BLOOM_REBUILD_SECONDS to
+    pick up anything else it missed. Those queries run outside the lock
+    that check() and record_failure() take, one at a time; while one is
+    running, other logins treat every email as possibly registered.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.lockout_threshold = 5
+        self.lockout_base = 30
+        self.lockout_max = 900
+        self.stuffing_window = 300
+        self.stuffing_max_accounts = 20
+        self.max_tracked = 100000
+        self.bloom_capacity = 1000000
+        self.bloom_error_rate = 0.01
+        self.bloom_refresh = 1
+        self.bloom_overlap = 1000
+        self.bloom_rebuild = 3600
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('LOGIN_GUARD_ENABLED', True)
+        self.lockout_threshold = app.config.get('LOGIN_LOCKOUT_THRESHOLD', 5)
+        self.lockout_base = app.config.get('LOGIN_LOCKOUT_BASE_SECONDS', 30)
+        self.lockout_max = app.config.get('LOGIN_LOCKOUT_MAX_SECONDS', 900)
+        self.stuffing_window = app.config.get('LOGIN_STUFFING_WINDOW_SECONDS', 300)
+        self.stuffing_max_accounts = app.config.get('LOGIN_STUFFING_MAX_ACCOUNTS', 20)
+        self.max_tracked = app.config.get('LOGIN_GUARD_MAX_TRACKED', 100000)
+        self.bloom_capacity = app.config.get('LOGIN_BLOOM_CAPACITY', 1000000)
+        self.bloom_error_rate = app.config.get('LOGIN_BLOOM_ERROR_RATE', 0.01)
+        self.bloom_refresh = app.config.get('LOGIN_BLOOM_REFRESH_SECONDS', 1)
+        self.bloom_overlap = app.config.get('LOGIN_BLOOM_OVERLAP_IDS', 1000)
+        self.bloom_rebuild = app.config.get('LOGIN_BLOOM_REBUILD_SECONDS', 3600)
+        self.reset()
+        app.extensions['login_guard'] = self
+
+    def reset(self):
+        with self._lock:
+            self._accounts = OrderedDict()  # email -> [failures, locked_until]
+            self._ips = OrderedDict()  # ip -> OrderedDict(email -> last failure time)
+            self._blocked_ips = {}  # ip -> blocked_until
+            self._bloom = None
+            self._bloom_last_id = 0
+            self._bloom_checked_at = 0.0
+            self._bloom_built_at = 0.0
+            self._bloom_pending = None  # emails registered here while a rebuild runs
+
+    def check(self, ip, email):
+        """Seconds the caller must wait before trying again, or None if the attempt may proceed"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            blocked_until = self._blocked_ips.get(ip)
+            if blocked_until:
+                if blocked_until > now:
+                    return math.ceil(blocked_until - now)
+                del self._blocked_ips[ip]
+
+            account = self._accounts.get(email)
+            if account and account[1] > now:
+                return math.ceil(account[1] - now)
+        return None
+
+    def record_failure(self, ip, email):
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            account = self._accounts.pop(email, None) or [0, 0.0]
+            account[0] += 1
+            if account[0] >= self.lockout_threshold:
+                delay = self.lockout_base * 2 ** (account[0] - self.lockout_threshold)
+                account[1] = now + min(delay, self.lockout_max)
+            self._accounts[email] = account
+            self._trim(self._accounts)
+
+            attempts = self._ips.pop(ip, None) or OrderedDict()
+            attempts.pop(email, None)
+            attempts[email] = now
+            while attempts and next(iter(attempts.values())) <= now - self.stuffing_window:
+                attempts.popitem(last=False)
+            self._ips[ip] = attempts
+            self._trim(self._ips)
+            if len(attempts) > self.stuffing_max_accounts:
+                self._blocked_ips[ip] = now + self.stuffing_window
+                del self._ips[ip]
+
+    def record_success(self, ip, email):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._accounts.pop(email, None)
+
+    def may_exist(self, email, load_since):
+        """
+        False only when email is certainly not registered. load_since(last_id)
+        returns (id, email_normalized) rows for users newer than last_id.
+        """
+        if not self.enabled:
+            return True
+        bloom = self._bloom
+        if bloom is not None:
+            if email in bloom:
+                return True
+            if time.time() - self._bloom_checked_at < self.bloom_refresh:
+                return False
+        if not self._catch_up(load_since):
+            # Another thread is loading; look the user up rather than wait
+            return True
+        return email in self._bloom
+
+    def add_known_email(self, email):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(email)
+            if self._bloom_pending is not None:
+                self._bloom_pending.append(email)
+
+    def _catch_up(self, load_since):
+        """
+        Add recently registered users to the filter, building a new one on the
+        first call and every bloom_rebuild seconds. Returns False without
+        waiting if another thread is loading.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            now = time.time()
+            if self._bloom is None or now - self._bloom_built_at >= self.bloom_rebuild:
+                self._rebuild(load_since, now)
+                return True
+
+            # A lower id can commit after a higher one, so look back past the last id seen
+            rows = list(load_since(max(0, self._bloom_last_id - self.bloom_overlap)))
+            with self._lock:
+                last_id = self._bloom_last_id
+                for user_id, email in rows:
+                    self._bloom.add(email)
+                    last_id = max(last_id, user_id)
+                self._bloom_last_id, self._bloom_checked_at = last_id, now
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def _rebuild(self, load_since, now):
+        """Fill a new filter from every user and swap it in; the old one keeps serving meanwhile"""
+        with self._lock:
+            self._bloom_pending = []
+        try:
+            bloom, last_id = BloomFilter(self.bloom_capacity, self.bloom_error_rate), 0
+            for user_id, email in load_since(0):
+                bloom.add(email)
+                last_id = max(last_id, user_id)
+        except BaseException:
+            with self._lock:
+                self._bloom_pending = None
+            raise
+        with self._lock:
+            for email in self._bloom_pending:
+                bloom.add(email)
+            self._bloom, self._bloom_last_id, self._bloom_pending = bloom, last_id, None
+            self._bloom_checked_at = self._bloom_built_at = now
+
+    def _trim(self, entries):
+        while len(entries) > self.max_tracked:
+            entries.popitem(last=False)
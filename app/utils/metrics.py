@@ -0,0 +1,245 @@
+# app/utils/metrics.py
+
+import bisect
+import threading
+import time
+from contextlib import nullcontext
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ('validation', 'db', 'hash', 'jwt')
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_NULL_SPAN = nullcontext()
+
+
+def format_labels(names, values):
+    return ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            label_text = format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {values[-2]}')
+            lines.append(f'{self.name}_count{{{label_text}}} {values[-1]}')
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values"""
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            series = sorted(self._series.items())
+        for labels, value in series:
+            lines.append(f'{self.name}{{{format_labels(self.label_names, labels)}}} {value}')
+        return lines
+
+
+class Metrics:
+    """
+    Request latency and per-phase timings, exposed in Prometheus text format.
+
+    Each request is timed as a whole and broken into phases (validation,
+    db, hash, jwt) by spans around the code that does the work; database
+    time is collected from SQLAlchemy cursor events. Phase times accumulate
+    in a thread-local while the request runs and are recorded once when it
+    ends, optionally echoed in a Server-Timing header.
+
+    When METRICS_ENABLED is off no request hooks are installed and span()
+    returns a shared no-op context manager.
+
+    Values are per process: with several gunicorn workers each scrape of
+    /metrics sees the worker that answered it.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.server_timing = False
+        self._local = threading.local()
+        self._collectors = []
+        self._engine_hooked = False
+        self.reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.server_timing = app.config.get('METRICS_SERVER_TIMING', False)
+        self.reset(app.config.get('METRICS_BUCKETS') or DEFAULT_BUCKETS)
+        self._collectors = []
+        if self.enabled:
+            app.before_request(self._start_request)
+            app.after_request(self._finish_request)
+            if not self._engine_hooked:
+                event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+                self._engine_hooked = True
+        app.extensions['metrics'] = self
+
+    def reset(self, buckets=DEFAULT_BUCKETS):
+        self.requests = Counter(
+            'http_requests_total', 'Requests by endpoint, method and status', ('endpoint', 'method', 'status')
+        )
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Request latency by endpoint', ('endpoint', 'method'), buckets
+        )
+        self.phases = Histogram(
+            'http_request_phase_duration_seconds', 'Time per request spent in each phase', ('endpoint', 'phase'), buckets
+        )
+
+    def add_collector(self, collector):
+        """Register a callable returning extra exposition lines for /metrics"""
+        self._collectors.append(collector)
+
+    def span(self, phase):
+        """Context manager adding the time spent inside it to the current request's phase"""
+        if not self.enabled or getattr(self._local, 'phases', None) is None:
+            return _NULL_SPAN
+        return _Span(self._local.phases, phase)
+
+    def render(self):
+        lines = self.requests.render() + self.latency.render() + self.phases.render()
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+    def _start_request(self):
+        self._local.phases = dict.fromkeys(PHASES, 0.0)
+        self._local.started = time.perf_counter()
+
+    def _finish_request(self, response):
+        phases = getattr(self._local, 'phases', None)
+        if phases is None:
+            return response
+        elapsed = time.perf_counter() - self._local.started
+        self._local.phases = None
+
+        # The URL rule, not the view name: flask-restx suffixes view names per app
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        self.requests.inc((endpoint, request.method, str(response.status_code)))
+        self.latency.observe((endpoint, request.method), elapsed)
+        for phase, seconds in phases.items():
+            if seconds:
+                self.phases.observe((endpoint, phase), seconds)
+
+        if self.server_timing:
+            entries = [f'{phase};dur={seconds * 1000:.2f}' for phase, seconds in phases.items() if seconds]
+            entries.append(f'total;dur={elapsed * 1000:.2f}')
+            response.headers['Server-Timing'] = ', '.join(entries)
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'phases', None) is not None:
+            conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('metrics_query_start')
+        phases = getattr(self._local, 'phases', None)
+        if starts and phases is not None:
+            phases['db'] += time.perf_counter() - starts.pop()
+
+
+def hasher_metrics(stats):
+    """Exposition lines for PasswordHasher.stats()"""
+    lines = [
+        '# HELP password_hash_rounds Current bcrypt cost',
+        '# TYPE password_hash_rounds gauge',
+        f"password_hash_rounds {stats['rounds']}",
+        '# HELP password_hash_rejected_total Hash requests shed because the pool was full',
+        '# TYPE password_hash_rejected_total counter',
+        f"password_hash_rejected_total {stats['rejected']}",
+        '# HELP password_hash_run_seconds_total Time spent running bcrypt',
+        '# TYPE password_hash_run_seconds_total counter',
+    ]
+    for operation, values in sorted(stats['operations'].items()):
+        lines.append(f'password_hash_run_seconds_total{{operation="{operation}"}} {values["run_seconds"]}')
+    return lines
+
+
+def token_cache_metrics(stats):
+    """Exposition lines for TokenCache.stats()"""
+    return [
+        '# HELP token_cache_entries Tokens currently cached',
+        '# TYPE token_cache_entries gauge',
+        f"token_cache_entries {stats['size']}",
+        '# HELP token_cache_requests_total Token cache lookups by result',
+        '# TYPE token_cache_requests_total counter',
+        f'token_cache_requests_total{{result="hit"}} {stats["hits"]}',
+        f'token_cache_requests_total{{result="miss"}} {stats["misses"]}',
+    ]
+
+
+def auth_event_metrics(stats):
+    """Exposition lines for AuthEventLog.stats()"""
+    return [
+        '# HELP auth_events_queued Audit events waiting to be written',
+        '# TYPE auth_events_queued gauge',
+        f"auth_events_queued {stats['queued']}",
+        '# HELP auth_events_total Audit events by outcome',
+        '# TYPE auth_events_total counter',
+        f'auth_events_total{{result="written"}} {stats["written"]}',
+        f'auth_events_total{{result="dropped"}} {stats["dropped"]}',
+        f'auth_events_total{{result="failed"}} {stats["failed"]}',
+    ]
+
+
+class _Span:
+    __slots__ = ('phases', 'phase', 'started')
+
+    def __init__(self, phases, phase):
+        self.phases = phases
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.phases[self.phase] += time.perf_counter() - self.started
+        return False
+
+
+metrics = Metrics()
@@ -0,0 +1,200 @@
+# app/utils/password_policy.py
+
+import hashlib
+import heapq
+import mmap
+import os
+import string
+import tempfile
+from app.utils.metrics import metrics
+
+DIGEST_SIZE = hashlib.sha1().digest_size
+DEFAULT_SPECIAL_CHARACTERS = '!@#$%^&*(),.?":{}|<>'
+
+
+class BreachedPasswords:
+    """
+    Lookup in a file of sorted, fixed-width SHA-1 digests.
+
+    The file is memory-mapped, so a lookup is a binary search that touches
+    O(log n) pages and the list is never read into memory; the kernel
+    shares the mapped pages between worker processes. Build the file with
+    ``flask passwords build-breached``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mmap = None
+        self.count = 0
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size % DIGEST_SIZE:
+                raise ValueError(f'{self.path} is not a file of {DIGEST_SIZE}-byte digests')
+            self.count = size // DIGEST_SIZE
+            # An empty file can't be mapped; it simply contains nothing
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __contains__(self, password):
+        if self._mmap is None:
+            self._open()
+        digest = hashlib.sha1(password.encode('utf-8')).digest()
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = middle * DIGEST_SIZE
+            probe = self._mmap[offset:offset + DIGEST_SIZE]
+            if probe == digest:
+                return True
+            if probe < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def close(self):
+        if self._mmap:
+            self._mmap.close()
+        self._mmap = None
+
+
+def parse_breached_line(line):
+    """
+    Digest for one input line: a 40-character SHA-1 hex digest, optionally
+    followed by ``:count`` as in the Pwned Passwords dumps, or a plaintext
+    password
+    """
+    line = line.rstrip('\r\n')
+    candidate = line.split(':', 1)[0]
+    if len(candidate) == 2 * DIGEST_SIZE and all(c in string.hexdigits for c in candidate):
+        return bytes.fromhex(candidate)
+    return hashlib.sha1(line.encode('utf-8')).digest()
+
+
+def _read_digests(path):
+    with open(path, 'rb') as f:
+        while True:
+            digest = f.read(DIGEST_SIZE)
+            if not digest:
+                return
+            yield digest
+
+
+def build_breached_file(lines, dest, chunk_size=1000000):
+    """
+    Write the sorted, de-duplicated digests of lines to dest and return how
+    many were written. Input is sorted in chunks of chunk_size and merged
+    from temporary files, so lists larger than memory can be converted.
+    """
+    runs = []
+    try:
+        chunk = []
+        for line in lines:
+            if line.strip():
+                chunk.append(parse_breached_line(line))
+            if len(chunk) >= chunk_size:
+                runs.append(_write_run(chunk))
+                chunk = []
+        if chunk or not runs:
+            runs.append(_write_run(chunk))
+
+        written = 0
+        previous = None
+        with open(dest, 'wb') as out:
+            for digest in heapq.merge(*(_read_digests(run) for run in runs)):
+                if digest != previous:
+                    out.write(digest)
+                    written += 1
+                    previous = digest
+        return written
+    finally:
+        for run in runs:
+            os.remove(run)
+
+
+def _write_run(chunk):
+    chunk.sort()
+    fd, path = tempfile.mkstemp(suffix='.sha1')
+    with os.fdopen(fd, 'wb') as f:
+        f.writelines(chunk)
+    return path
+
+
+class PasswordPolicy:
+    """
+    Password rules from config, checked in one pass over the password.
+
+    Every violated rule is reported, not just the first, so a client can
+    show them all at once. The rules are:
+
+    - PASSWORD_MIN_LENGTH characters at least.
+    - PASSWORD_MAX_BYTES of UTF-8 at most, since bcrypt silently ignores
+      anything past 72 bytes.
+    - A digit, an uppercase letter, a lowercase letter and one of
+      PASSWORD_SPECIAL_CHARACTERS, each switchable with PASSWORD_REQUIRE_*.
+    - Absent from PASSWORD_BREACHED_FILE, when one is configured.
+    """
+
+    def __init__(self, app=None):
+        self.min_length = 8
+        self.max_bytes = 72
+        self.require_digit = True
+        self.require_uppercase = True
+        self.require_lowercase = True
+        self.require_special = True
+        self.special_characters = frozenset(DEFAULT_SPECIAL_CHARACTERS)
+        self.breached = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.min_length = app.config.get('PASSWORD_MIN_LENGTH', 8)
+        self.max_bytes = app.config.get('PASSWORD_MAX_BYTES', 72)
+        self.require_digit = app.config.get('PASSWORD_REQUIRE_DIGIT', True)
+        self.require_uppercase = app.config.get('PASSWORD_REQUIRE_UPPERCASE', True)
+        self.require_lowercase = app.config.get('PASSWORD_REQUIRE_LOWERCASE', True)
+        self.require_special = app.config.get('PASSWORD_REQUIRE_SPECIAL', True)
+        self.special_characters = frozenset(
+            app.config.get('PASSWORD_SPECIAL_CHARACTERS', DEFAULT_SPECIAL_CHARACTERS)
+        )
+        if self.breached is not None:
+            self.breached.close()
+        breached_file = app.config.get('PASSWORD_BREACHED_FILE')
+        self.breached = BreachedPasswords(breached_file) if breached_file else None
+        app.extensions['password_policy'] = self
+
+    def violations(self, password):
+        """Return a message for every rule the password breaks; empty when it passes"""
+        with metrics.span('validation'):
+            return self._violations(password)
+
+    def _violations(self, password):
+        has_digit = has_upper = has_lower = has_special = False
+        # One pass over the distinct characters covers every character class
+        for char in set(password):
+            if 'a' <= char <= 'z':
+                has_lower = True
+            elif 'A' <= char <= 'Z':
+                has_upper = True
+            elif char.isdecimal():
+                has_digit = True
+            elif char in self.special_characters:
+                has_special = True
+
+        violations = []
+        if len(password) < self.min_length:
+            violations.append(f'Password must be at least {self.min_length} characters long')
+        if self.max_bytes and len(password.encode('utf-8')) > self.max_bytes:
+            violations.append(f'Password must be at most {self.max_bytes} bytes long')
+        if self.require_digit and not has_digit:
+            violations.append('Password must contain at least one digit')
+        if self.require_uppercase and not has_upper:
+            violations.append('Password must contain at least one uppercase letter')
+        if self.require_lowercase and not has_lower:
+            violations.append('Password must contain at least one lowercase letter')
+        if self.require_special and not has_special:
+            violations.append('Password must contain at least one special character')
+        if self.breached is not None and password in self.breached:
+            violations.append('Password has appeared in a data breach; choose another')
+        return violations
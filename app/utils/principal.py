@@ -0,0 +1,99 @@
+# app/utils/principal.py
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class Principal:
+    """Authenticated caller built from verified token claims, without a DB lookup"""
+
+    __slots__ = ('id', 'email', 'token_version', 'claims')
+
+    def __init__(self, id, email, token_version, claims):
+        self.id = id
+        self.email = email
+        self.token_version = token_version
+        self.claims = claims
+
+    @classmethod
+    def from_claims(cls, claims):
+        return cls(claims['sub'], claims.get('email'), claims.get('ver', 0), claims)
+
+    def __repr__(self):
+        return f'<Principal {self.email}>'
+
+
+class TokenRevocations:
+    """
+    Compact in-memory map of user id -> which of that user's tokens are revoked.
+
+    An entry holds the lowest token version still accepted, or None once the
+    user is deleted (user ids are never reused, so every token for that id is
+    then stale). Every token an entry rejects has expired one token lifetime
+    after it was recorded, so entries are dropped then and the map stays small.
+
+    It is seeded from the database once per process and kept current by User
+    changes committed in this process; other workers pick up a revocation the
+    next time they load that user or restart.
+    """
+
+    def __init__(self, app=None):
+        self.loaded = False
+        self.lifetime = 900
+        self._entries = OrderedDict()  # user_id -> (min_version, expires_at), oldest first
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.lifetime = app.config.get('JWT_EXPIRATION_DELTA', 900) + app.config.get('JWT_LEEWAY', 0)
+        self.clear()
+        app.extensions['token_revocations'] = self
+
+    def load(self, rows):
+        """Seed from (user_id, token_version) rows"""
+        with self._lock:
+            for user_id, version in rows:
+                self._record(user_id, version)
+            self.loaded = True
+
+    def revoke(self, user_id, version):
+        """Reject every token for user_id with a version below the given one"""
+        with self._lock:
+            self._record(user_id, version)
+
+    def revoke_all(self, user_id):
+        """Reject every token issued to a deleted user"""
+        with self._lock:
+            self._record(user_id, None)
+
+    def is_revoked(self, user_id, version):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return False
+        min_version, expires_at = entry
+        if expires_at <= time.time():
+            return False
+        return min_version is None or version < min_version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.loaded = False
+
+    def _record(self, user_id, version):
+        now = time.time()
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest[1] > now:
+                break
+            self._entries.popitem(last=False)
+
+        entry = self._entries.pop(user_id, None)
+        if entry is not None and version is not None:
+            version = None if entry[0] is None else max(entry[0], version)
+        self._entries[user_id] = (version, now + self.lifetime)
+
+    def __len__(self):
+        return len(self._entries)
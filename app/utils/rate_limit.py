@@ -0,0 +1,158 @@
+# app/utils/rate_limit.py
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from flask import request
+from flask_limiter.util import get_remote_address
+from limits.storage import Storage, MovingWindowSupport
+from app.utils.validators import normalize_email
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS window_entries (key TEXT NOT NULL, ts REAL NOT NULL, expires_at REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS ix_window_entries_key_ts ON window_entries (key, ts)',
+)
+
+# Entries in files written before each entry stored its expiry are kept this
+# long: the longest window in the default limits
+LEGACY_ENTRY_LIFETIME = 86400
+
+# Expired counters and window entries of every key are swept on roughly one write in this many
+PURGE_EVERY = 500
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """
+    Rate limit storage in a local SQLite file, shared by every worker process
+    on the host without running an external service.
+
+    Use ``sqlite:///relative/path.db`` or ``sqlite:////absolute/path.db``.
+    Each operation runs in a ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers see one consistent count. Supports both the fixed-window and the
+    moving-window (sliding log) strategies.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri, **options):
+        super().__init__(uri, **options)
+        self.path = uri.split('://', 1)[1][1:] or ':memory:'
+        self.busy_timeout = float(options.get('busy_timeout', 5.0))
+        self._local = threading.local()
+        with self._transaction() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(window_entries)')}
+            if 'expires_at' not in columns:
+                conn.execute('ALTER TABLE window_entries ADD COLUMN expires_at REAL NOT NULL DEFAULT 0')
+                conn.execute('UPDATE window_entries SET expires_at = ts + ?', (LEGACY_ENTRY_LIFETIME,))
+                conn.execute('DROP INDEX IF EXISTS ix_window_entries_ts')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_window_entries_expires_at ON window_entries (expires_at)')
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        # sqlite3 connections can't be shared across threads or a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute('SELECT value, expires_at FROM counters WHERE key = ?', (key,)).fetchone()
+            if row is None or row[1] <= now:
+                value, expires_at = amount, now + expiry
+            else:
+                value = row[0] + amount
+                expires_at = now + expiry if elastic_expiry else row[1]
+            conn.execute('INSERT OR REPLACE INTO counters (key, value, expires_at) VALUES (?, ?, ?)', (key, value, expires_at))
+            if random.randrange(PURGE_EVERY) == 0:
+                conn.execute('DELETE FROM counters WHERE expires_at <= ?', (now,))
+        return value
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM counters WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connection().execute('SELECT expires_at FROM counters WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        with self._transaction() as conn:
+            cleared = conn.execute('DELETE FROM counters').rowcount
+            cleared += conn.execute('DELETE FROM window_entries').rowcount
+        return cleared
+
+    def clear(self, key):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM counters WHERE key = ?', (key,))
+            conn.execute('DELETE FROM window_entries WHERE key = ?', (key,))
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM window_entries WHERE key = ? AND ts <= ?', (key, now - expiry))
+            count = conn.execute('SELECT COUNT(*) FROM window_entries WHERE key = ?', (key,)).fetchone()[0]
+            if count + amount > limit:
+                return False
+            conn.executemany(
+                'INSERT INTO window_entries (key, ts, expires_at) VALUES (?, ?, ?)', [(key, now, now + expiry)] * amount
+            )
+            if random.randrange(PURGE_EVERY) == 0:
+                # Keys that are never hit again (one per attempted email) would otherwise stay forever.
+                # Each entry carries its own window, since other workers may enforce longer ones
+                conn.execute('DELETE FROM window_entries WHERE expires_at <= ?', (now,))
+        return True
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        oldest, count = self._connection().execute(
+            'SELECT MIN(ts), COUNT(*) FROM window_entries WHERE key = ? AND ts > ?', (key, now - expiry)
+        ).fetchone()
+        return (oldest, count) if count else (now, 0)
+
+
+def login_account_key():
+    """Rate limit key for the account named in a login body, so limits hold across IPs"""
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    if not isinstance(email, str) or not email:
+        return get_remote_address()
+    return f'account:{normalize_email(email)}'
@@ -0,0 +1,67 @@
+# app/utils/static_pages.py
+
+import gzip
+import hashlib
+import os
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # optional: pages are still served gzipped or plain
+    brotli = None
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'pages')
+
+
+class StaticPage:
+    """
+    An HTML page encoded once and served from memory.
+
+    The body is UTF-8 encoded, hashed for its ETag and compressed with gzip
+    (and brotli when the module is installed) when the page is built. A
+    request picks a variant from Accept-Encoding and gets it with
+    Cache-Control and a strong ETag per variant; a matching If-None-Match
+    gets a bodiless 304.
+    """
+
+    def __init__(self, html, max_age=300):
+        body = html.encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        cache_control = f'public, max-age={max_age}'
+
+        # Best compression first; identity is always the fallback
+        candidates = []
+        if brotli is not None:
+            candidates.append(('br', brotli.compress(body)))
+        candidates.append(('gzip', gzip.compress(body, mtime=0)))
+        self.variants = []
+        for encoding, compressed in candidates:
+            if len(compressed) < len(body):
+                etag = f'{digest}-{encoding}'
+                self.variants.append((encoding, etag, compressed, self._headers(etag, cache_control, encoding)))
+        self.identity = (None, digest, body, self._headers(digest, cache_control))
+
+    @classmethod
+    def from_file(cls, name, max_age=300):
+        with open(os.path.join(PAGES_DIR, name), encoding='utf-8') as f:
+            return cls(f.read(), max_age)
+
+    @staticmethod
+    def _headers(etag, cache_control, encoding=None):
+        headers = (('ETag', f'"{etag}"'), ('Cache-Control', cache_control), ('Vary', 'Accept-Encoding'))
+        if encoding:
+            headers += (('Content-Encoding', encoding),)
+        return headers
+
+    def select(self, accept_encodings):
+        """The (encoding, etag, body, headers) variant to send for an Accept-Encoding header"""
+        for variant in self.variants:
+            if accept_encodings[variant[0]]:
+                return variant
+        return self.identity
+
+    def response(self, request):
+        encoding, etag, body, headers = self.select(request.accept_encodings)
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers=headers)
+        return Response(body, mimetype='text/html', headers=headers)
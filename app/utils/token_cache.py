@@ -0,0 +1,129 @@
+# app/utils/token_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# What protected views receive instead of a full User row
+UserSnapshot = namedtuple('UserSnapshot', ['id', 'email'])
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified tokens.
+
+    Entries are keyed by a digest of the raw token and hold the decoded claims
+    plus a UserSnapshot. An entry never outlives the token's ``exp`` claim or
+    the configured TTL, whichever comes first, and every entry for a user is
+    dropped once a change to that user's row commits.
+
+    The cache is per process: a change committed by another worker is only
+    seen here when the entry expires, so TOKEN_CACHE_TTL bounds how long a
+    revoked token can still be accepted. Routes that can't allow that use
+    token_required(fresh=True), which always checks the database.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.max_size = 1024
+        self.ttl = 300
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0  # bumped by every invalidation
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('TOKEN_CACHE_ENABLED', True)
+        self.max_size = app.config.get('TOKEN_CACHE_SIZE', 1024)
+        self.ttl = app.config.get('TOKEN_CACHE_TTL', 300)
+        self.clear()
+        app.extensions['token_cache'] = self
+
+    @staticmethod
+    def _key(token):
+        return hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+
+    def get(self, token):
+        """Return (claims, user) for a cached token, or None"""
+        if not self.enabled:
+            return None
+
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, claims, user = entry
+            if expires_at <= time.time():
+                self._remove(key, user.id)
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims, user
+
+    def put(self, token, claims, user, generation=None):
+        """
+        Cache a verified token until its exp or the TTL, whichever is sooner.
+        Pass the generation read before loading the user: if an invalidation
+        happened since, the row may be stale and nothing is cached.
+        """
+        if not self.enabled:
+            return
+
+        expires_at = min(claims.get('exp', 0), time.time() + self.ttl)
+        key = self._key(token)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (expires_at, claims, user)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                old_key, (_, _, old_user) = self._entries.popitem(last=False)
+                self._discard_user_key(old_user.id, old_key)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        """Drop every cached token belonging to a user"""
+        with self._lock:
+            self.generation += 1
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _remove(self, key, user_id):
+        self._entries.pop(key, None)
+        self._discard_user_key(user_id, key)
+
+    def _discard_user_key(self, user_id, key):
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
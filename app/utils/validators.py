@@ -1,44 +1,41 @@
 # app/utils/validators.py
 
-import re
-from email_validator import validate_email as validate_email_lib, EmailNotValidError
+import unicodedata
+
 
 def validate_email(email):
-    """Validate email format"""
+    """
+    Validate an email address against the configured EmailPolicy.
+    Returns the normalized address, or None when it is rejected.
+    """
+    from app import email_policy
+    
+    return email_policy.check(email)[0]
+
+def normalize_email(email):
+    """
+    Canonical form used for uniqueness and lookups: NFC-composed (as the
+    email validator stores it), trimmed, lowercased, with the domain
+    IDNA-encoded so Unicode and punycode spellings match
+    """
+    local, sep, domain = unicodedata.normalize('NFC', email).strip().rpartition('@')
+    if not sep:
+        return domain.lower()
     try:
-        validate_email_lib(email)
-        return True
-    except EmailNotValidError:
-        return False
+        domain = domain.encode('idna').decode('ascii')
+    except UnicodeError:
+        pass
+    return f'{local.lower()}@{domain.lower()}'
 
 def validate_password_strength(password):
     """
-    Validate password strength
-    - At least 8 characters
-    - Contains at least one digit
-    - Contains at least one uppercase letter
-    - Contains at least one lowercase letter
-    - Contains at least one special character
+    Check a password against the configured PasswordPolicy.
+    Returns (is_valid, message) with the first violation as the message;
+    use password_policy.violations() to get all of them.
     """
-    import re
-    
-    if len(password) < 8:
-        return False, "Password must be at least 8 characters long"
-    
-    # Check for at least one digit
-    if not re.search(r'\d', password):
-        return False, "Password must contain at least one digit"
-    
-    # Check for at least one uppercase letter
-    if not re.search(r'[A-Z]', password):
-        return False, "Password must contain at least one uppercase letter"
-    
-    # Check for at least one lowercase letter
-    if not re.search(r'[a-z]', password):
-        return False, "Password must contain at least one lowercase letter"
-    
-    # Check for at least one special character
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-        return False, "Password must contain at least one special character"
+    from app import password_policy
     
-    return True, "Password is strong"
\ No newline at end of file
+    violations = password_policy.violations(password)
+    if violations:
+        return False, violations[0]
+    return True, "Password is strong"
@@ -0,0 +1,6 @@
+# asgi.py
+"""ASGI entry point, e.g. ``uvicorn asgi:application``"""
+
+from app.asgi import create_asgi_app
+
+application = create_asgi_app()
@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Offline performance benchmarks; run individual modules with `python -m benchmarks.<name>`
@@ -0,0 +1,46 @@
+# benchmarks/bench_json.py
+"""
+Encode and decode time of the auth payloads (login request, token response,
+a 500-token introspection batch and its results) with each available JSON
+codec: the standard library and, when installed, orjson.
+
+    python -m benchmarks.bench_json [iterations]
+"""
+
+import sys
+from app import create_app
+from app.utils.json_codec import JsonCodec, orjson
+from benchmarks.suite import time_calls
+
+TOKEN = 'eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.' + 'x' * 180 + '.' + 'y' * 43
+CLAIMS = {'sub': 1, 'email': 'bench@example.com', 'ver': 0, 'iat': 1752852000, 'exp': 1752852900}
+
+PAYLOADS = {
+    'login request': {'email': 'bench@example.com', 'password': 'Password123!'},
+    'token response': {'token': TOKEN, 'expires_at': '2025-07-18T15:30:00+00:00', 'refresh_token': 'q' * 43},
+    'introspect x500': {'tokens': [TOKEN] * 500},
+    'results x500': {'results': [{'active': True, 'claims': CLAIMS}] * 500},
+}
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = create_app()
+    names = ['json'] + (['orjson'] if orjson is not None else [])
+
+    print(f'{"payload":<16} {"bytes":>7} {"codec":<7} {"encode us":>10} {"decode us":>10}')
+    for payload_name, payload in PAYLOADS.items():
+        for name in names:
+            app.config['JSON_CODEC'] = name
+            codec = JsonCodec(app)
+            encoded = codec.encode(payload)
+            encode = time_calls(lambda: codec.encode(payload), iterations)
+            decode = time_calls(lambda: codec.loads(encoded), iterations)
+            print(
+                f'{payload_name:<16} {len(encoded):>7} {name:<7} '
+                f'{encode["p50_ms"] * 1000:>10.2f} {decode["p50_ms"] * 1000:>10.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_lookups.py
+"""
+User lookups on the login and token-auth paths: the ORM queries they used
+to make (User.query, full User instances) against the precompiled,
+column-projected Core statements in app.models.lookups.
+
+Each call runs in a fresh session, as it would per request, so the ORM
+can't answer from its identity map. Latency is p50/p99 over many calls;
+memory is the peak traced allocation during one call, which counts the
+short-lived objects a lookup creates and throws away.
+
+    python -m benchmarks.bench_lookups [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+from app import create_app, db
+from app.models import lookups
+from app.models.user import User
+from benchmarks.suite import time_calls
+
+EMAIL = 'bench@example.com'
+
+
+def peak_allocation(func, iterations):
+    """Mean peak of traced memory above the starting point, per call, in bytes"""
+    func()  # warm up caches before measuring
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(iterations):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            func()
+            total += tracemalloc.get_traced_memory()[1] - current
+        return total / iterations
+    finally:
+        tracemalloc.stop()
+
+
+def per_request(lookup):
+    def call():
+        try:
+            return lookup()
+        finally:
+            db.session.remove()
+    return call
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app()
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        app.config['BCRYPT_ROUNDS'] = 4
+        with app.app_context():
+            db.create_all()
+            user = User(email=EMAIL)
+            user.password = 'Password123!'
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+
+            paths = {
+                'by email (ORM)': lambda: User.query.filter_by(email_normalized=EMAIL).first(),
+                'by email (Core)': lambda: lookups.find_login(EMAIL),
+                'by id (ORM)': lambda: User.query.get(user_id),
+                'by id (Core)': lambda: lookups.find_auth(user_id),
+            }
+
+            print(f'{"lookup":<18} {"p50 us":>9} {"p99 us":>9} {"ops/s":>10} {"peak KiB":>9}')
+            for name, lookup in paths.items():
+                call = per_request(lookup)
+                timing = time_calls(call, iterations)
+                peak = peak_allocation(call, max(1, iterations // 10))
+                print(
+                    f'{name:<18} {timing["p50_ms"] * 1000:>9.1f} {timing["p99_ms"] * 1000:>9.1f} '
+                    f'{timing["ops_per_sec"]:>10.0f} {peak / 1024:>9.1f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
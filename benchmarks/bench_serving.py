@@ -0,0 +1,121 @@
+# benchmarks/bench_serving.py
+"""
+Concurrent throughput of /profile/profile and /auth/login in WSGI mode
+(a thread per in-flight request, as a threaded server runs it) versus ASGI
+mode (requests parked on the event loop, handlers on a bounded pool).
+
+Both modes drive the app in-process against a temporary SQLite file, so the
+numbers compare the serving models without network noise. Logins run at no
+more concurrency than the hashing pool admits (PASSWORD_HASH_MAX_IN_FLIGHT),
+so they measure bcrypt throughput rather than how fast excess requests are
+shed; any 503s are reported separately and left out of req/s and latency.
+
+    python -m benchmarks.bench_serving [concurrency]
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.test import EnvironBuilder
+from app import create_app, db, limiter, password_hasher
+from app.asgi import create_asgi_app
+from app.models.user import User
+
+REQUESTS = {'/profile/profile': 2000, '/auth/login': 100}
+LOGIN_BODY = json.dumps({'email': 'bench@example.com', 'password': 'Password123!'}).encode()
+
+
+def request_for(path, token):
+    if path == '/auth/login':
+        return 'POST', [(b'content-type', b'application/json')], LOGIN_BODY
+    return 'GET', [(b'authorization', f'Bearer {token}'.encode())], b''
+
+
+def run_wsgi(app, path, token, total, concurrency):
+    method, headers, body = request_for(path, token)
+    builder_headers = {name.decode(): value.decode() for name, value in headers}
+
+    def one(_):
+        environ = EnvironBuilder(path=path, method=method, headers=builder_headers, data=body).get_environ()
+        statuses = []
+        start = time.perf_counter()
+        result = app(environ, lambda status, response_headers, exc_info=None: statuses.append(status))
+        b''.join(result)
+        return int(statuses[0].split()[0]), time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(one, range(total)))
+
+
+def run_asgi(asgi_app, path, token, total, concurrency):
+    method, headers, body = request_for(path, token)
+
+    async def one():
+        scope = {'type': 'http', 'method': method, 'path': path, 'headers': headers, 'client': ('127.0.0.1', 0)}
+        sent = []
+        messages = [{'type': 'http.request', 'body': body}]
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        start = time.perf_counter()
+        await asgi_app(scope, receive, send)
+        return sent[0]['status'], time.perf_counter() - start
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded():
+            async with semaphore:
+                return await one()
+
+        return await asyncio.gather(*(bounded() for _ in range(total)))
+
+    return asyncio.run(main())
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app()
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        limiter.enabled = False
+        with app.app_context():
+            db.create_all()
+            user = User(email='bench@example.com')
+            user.password = 'Password123!'
+            db.session.add(user)
+            db.session.commit()
+            token = json.loads(app.test_client().post('/auth/login', data=LOGIN_BODY,
+                                                      content_type='application/json').data)['token']
+
+        asgi_app = create_asgi_app(app)
+        print(f'bcrypt_rounds={app.config["BCRYPT_ROUNDS"]} hash_workers={password_hasher.max_workers}')
+        print(f'{"endpoint":<20} {"mode":<6} {"conc":>5} {"req/s":>10} {"p50 ms":>9} {"shed (503)":>11}')
+        for path, total in REQUESTS.items():
+            path_concurrency = concurrency
+            if path == '/auth/login':
+                path_concurrency = min(concurrency, password_hasher.max_in_flight)
+            for mode, runner, target in (('wsgi', run_wsgi, app), ('asgi', run_asgi, asgi_app)):
+                start = time.perf_counter()
+                results = runner(target, path, token, total, path_concurrency)
+                elapsed = time.perf_counter() - start
+                # A full hashing pool sheds logins with 503 rather than queueing them
+                admitted = [seconds for status, seconds in results if status == 200]
+                shed = sum(status == 503 for status, _ in results)
+                assert len(admitted) + shed == total, {status for status, _ in results}
+                p50 = statistics.median(admitted) * 1000 if admitted else float('nan')
+                print(f'{path:<20} {mode:<6} {path_concurrency:>5} {len(admitted) / elapsed:>10.1f} {p50:>9.1f} {shed:>11}')
+        asgi_app.shutdown()
+
+
+if __name__ == '__main__':
+    main()
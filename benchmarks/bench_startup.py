@@ -0,0 +1,61 @@
+# benchmarks/bench_startup.py
+"""
+Cold start: import time, create_app time and first-request latency, each
+measured in a fresh interpreter so nothing is already imported or cached.
+
+    python -m benchmarks.bench_startup [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay off the startup path
+DEFERRED_MODULES = ('email_validator', 'dns', 'app.utils.keyring')
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+from app import api, create_app
+imported = time.perf_counter()
+app = create_app()
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+created = time.perf_counter()
+app.test_client().get('/profile/profile')
+served = time.perf_counter()
+print(json.dumps({{
+    'import_s': imported - start,
+    'create_app_s': created - imported,
+    'first_request_s': served - created,
+    'deferred_loaded': [name for name in {DEFERRED_MODULES!r} if name in sys.modules],
+    'swagger_built': api._schema is not None,
+}}))
+"""
+
+
+def measure_startup():
+    """Run one cold start in a subprocess and return its timings"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = [measure_startup() for _ in range(runs)]
+    print(f'{"phase":<16} {"median ms":>10} {"max ms":>10}')
+    for phase in ('import_s', 'create_app_s', 'first_request_s'):
+        values = [result[phase] * 1000 for result in results]
+        print(f'{phase[:-2]:<16} {statistics.median(values):>10.1f} {max(values):>10.1f}')
+    loaded = sorted({name for result in results for name in result['deferred_loaded']})
+    if loaded:
+        print(f'deferred modules imported at startup: {", ".join(loaded)}')
+
+
+if __name__ == '__main__':
+    main()
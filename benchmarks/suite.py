@@ -0,0 +1,272 @@
+# benchmarks/suite.py
+"""
+Offline benchmark suite for the auth endpoints.
+
+Microbenchmarks time the building blocks (bcrypt hash and verify, JWT
+encode and decode, header parsing, email and password validation, the
+user lookups behind login and token auth).
+Load scenarios drive the app in-process from a pool of client threads
+against a temporary SQLite database: a login storm, a token-authenticated
+read flood and a registration burst. Every result reports p50/p99 latency
+and operations per second.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline results.json   # fail on regressions
+
+Iteration counts, the bcrypt cost and the concurrency are fixed by the
+command line, so two runs on the same machine are comparable.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+PASSWORD = 'Password123!'
+
+# Stands in for a User row when signing tokens outside a request
+BenchUser = namedtuple('BenchUser', ['id', 'email', 'token_version'])
+
+# (name, iterations) at full size; --quick divides these by QUICK_FACTOR
+MICRO = {
+    'hash': 20,
+    'verify': 20,
+    'jwt_encode': 5000,
+    'jwt_decode': 5000,
+    'parse_header': 50000,
+    'email_check': 5000,
+    'password_policy': 20000,
+    'lookup_email': 5000,
+    'lookup_id': 5000,
+}
+LOAD = {
+    'login_storm': 200,
+    'read_flood': 5000,
+    'register_burst': 200,
+}
+QUICK_FACTOR = 50
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies, elapsed, errors=0):
+    latencies = sorted(latencies)
+    return {
+        'n': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+        'ops_per_sec': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'errors': errors,
+    }
+
+
+def time_calls(func, iterations):
+    """Time func() iterations times, sequentially"""
+    func()  # warm up
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def run_load(app, make_request, total, concurrency):
+    """Issue total requests from concurrency client threads; make_request(client, i) returns a response"""
+    local = threading.local()
+
+    def one(i):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        started = time.perf_counter()
+        response = make_request(client, i)
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+    errors = sum(1 for _, status in results if status >= 300)
+    return summarize([latency for latency, _ in results], elapsed, errors)
+
+
+def micro_benchmarks(counts):
+    from app import email_policy, password_hasher, password_policy
+    from app.models import lookups
+    from app.utils.auth_utils import auth_engine
+
+    user = BenchUser(1, 'bench@example.com', 0)
+    password_hash = password_hasher.hash(PASSWORD)
+    token, _ = auth_engine.issue_token(user)
+    header = f'Bearer {token}'
+
+    calls = {
+        'hash': lambda: password_hasher.hash(PASSWORD),
+        'verify': lambda: password_hasher.verify(PASSWORD, password_hash),
+        'jwt_encode': lambda: auth_engine.issue_token(user),
+        'jwt_decode': lambda: auth_engine.decode(token),
+        'parse_header': lambda: auth_engine.parse_header(header),
+        'email_check': lambda: email_policy.check('Bench.User@Example.com'),
+        'password_policy': lambda: password_policy.violations(PASSWORD),
+        'lookup_email': lambda: lookups.find_login(user.email),
+        'lookup_id': lambda: lookups.find_auth(user.id),
+    }
+    return {f'micro.{name}': time_calls(calls[name], counts[name]) for name in calls}
+
+
+def load_scenarios(app, counts, concurrency):
+    def login(client, i):
+        return client.post('/auth/login', json={'email': 'bench@example.com', 'password': PASSWORD})
+
+    token = login(app.test_client(), 0).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def read(client, i):
+        return client.get('/profile/profile', headers=headers)
+
+    def register(client, i):
+        return client.post('/auth/register', json={'email': f'burst{i}@example.com', 'password': PASSWORD})
+
+    scenarios = {'login_storm': login, 'read_flood': read, 'register_burst': register}
+    return {
+        f'load.{name}': run_load(app, scenarios[name], counts[name], concurrency)
+        for name in scenarios
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(rounds=10, concurrency=8, quick=False):
+    """Run every benchmark and return the results document"""
+    from app import auth_events, create_app, db, limiter, password_hasher
+    from app.models.user import User
+
+    factor = QUICK_FACTOR if quick else 1
+    micro_counts = {name: max(2, count // factor) for name, count in MICRO.items()}
+    load_counts = {name: max(4, count // factor) for name, count in LOAD.items()}
+
+    limiter_enabled = limiter.enabled
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app()
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        # Measure the endpoints, not the rate limiter or the hashing queue's load shedding
+        limiter.enabled = False
+        app.config['BCRYPT_ROUNDS'] = rounds
+        app.config['BCRYPT_CALIBRATE'] = False
+        app.config['PASSWORD_HASH_MAX_IN_FLIGHT'] = max(app.config['PASSWORD_HASH_MAX_IN_FLIGHT'], concurrency * 2)
+        password_hasher.init_app(app)
+
+        try:
+            with app.app_context():
+                db.create_all()
+                user = User(email='bench@example.com')
+                user.password = PASSWORD
+                db.session.add(user)
+                db.session.commit()
+
+                results = micro_benchmarks(micro_counts)
+                results.update(load_scenarios(app, load_counts, concurrency))
+                db.session.remove()
+        finally:
+            # Write queued audit events before the database goes away
+            auth_events.shutdown()
+            limiter.enabled = limiter_enabled
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'bcrypt_rounds': rounds,
+            'concurrency': concurrency,
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return (name, metric, baseline, current, change) for every slowdown beyond threshold"""
+    regressions = []
+    for name, current in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                change = current[metric] / previous[metric] - 1
+                regressions.append((name, metric, previous[metric], current[metric], change))
+    return regressions
+
+
+def print_table(results, baseline=None):
+    print(f'{"benchmark":<26} {"n":>6} {"p50 ms":>10} {"p99 ms":>10} {"ops/s":>11} {"errors":>7} {"p50 vs base":>12}')
+    for name, result in results['results'].items():
+        previous = (baseline or {}).get('results', {}).get(name)
+        delta = ''
+        if previous and previous['p50_ms']:
+            delta = f'{(result["p50_ms"] / previous["p50_ms"] - 1) * 100:+.1f}%'
+        print(
+            f'{name:<26} {result["n"]:>6} {result["p50_ms"]:>10.3f} {result["p99_ms"]:>10.3f} '
+            f'{result["ops_per_sec"]:>11.1f} {result["errors"]:>7} {delta:>12}'
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against a previous --output file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown before failing (0.2 = 20%%)')
+    parser.add_argument('--rounds', type=int, default=10, help='bcrypt cost used for the run')
+    parser.add_argument('--concurrency', type=int, default=8, help='Client threads in load scenarios')
+    parser.add_argument('--quick', action='store_true', help=f'Run 1/{QUICK_FACTOR} of the iterations')
+    args = parser.parse_args(argv)
+
+    results = run_suite(rounds=args.rounds, concurrency=args.concurrency, quick=args.quick)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, previous, current, change in regressions:
+            print(f'REGRESSION {name} {metric}: {previous:.3f} -> {current:.3f} ms ({change:+.0%})')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
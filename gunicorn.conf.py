@@ -0,0 +1,58 @@
+# gunicorn.conf.py
+"""
+Production server settings: ``gunicorn -c gunicorn.conf.py wsgi:app``
+
+The app is loaded once in the master and forked, so imports, key loading and
+bcrypt calibration are shared copy-on-write. Run ``flask init-db`` before
+starting the server; workers never run schema DDL. Per-process resources (database
+connections, hashing pools, rate limit connections) are opened lazily in
+each worker.
+
+Signals:
+- HUP: start fresh workers with the new settings, then stop the old ones
+  gracefully. With preload the app code itself is not re-imported.
+- USR2 then WINCH/QUIT to the old master: zero-downtime code upgrade.
+"""
+
+import multiprocessing
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Recycle workers after a jittered number of requests so they don't all restart together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+
+# App defaults that only make sense with several worker processes. These
+# must be set before the app (and so app.config) is imported.
+os.environ.setdefault(
+    'RATELIMIT_STORAGE_URI', f"sqlite:///{os.path.join(BASE_DIR, 'instance', 'ratelimit.db')}"
+)
+# Split the cores between workers rather than giving each a pool per core
+os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(1, multiprocessing.cpu_count() // workers)))
+
+
+def when_ready(server):
+    # Connections opened while preloading must not be inherited
+    # by workers: two processes on one socket corrupt the stream.
+    if preload_app:
+        from app import db
+        with server.app.wsgi().app_context():
+            db.engine.dispose()
+
+
+def worker_exit(server, worker):
+    # Write audit events still queued in this worker before it goes away
+    from app import auth_events
+    auth_events.shutdown()
@@ -1,15 +1,8 @@
-from app import create_app, db
+from app import create_app
 
 app = create_app()
 
-# Initialize the database
-with app.app_context():
-    db.create_all()
-    
-    # Print all registered routes
-    print("Registered Routes:")
-    for rule in app.url_map.iter_rules():
-        print(f"{rule} ({rule.endpoint})")
-
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    # Development server only; production uses `gunicorn -c gunicorn.conf.py wsgi:app`
+    # (`flask routes` lists the registered routes)
+    app.run(debug=True)
@@ -0,0 +1,112 @@
+import pytest
+import asyncio
+import json
+from app import create_app, db
+from app.asgi import create_asgi_app
+from app.models.user import User
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app()
+    app.config['TESTING'] = True
+    # Handlers run on pool threads, so they need a database every connection can see
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'asgi.db'}"
+    
+    with app.app_context():
+        db.create_all()
+        
+        # Create test user
+        user = User(email='test@example.com')
+        user.password = 'Password123!'
+        db.session.add(user)
+        db.session.commit()
+        
+        yield app
+        
+        db.session.remove()
+        db.drop_all()
+
+async def call(asgi_app, method, path, body=b'', headers=()):
+    """Send one request through the ASGI app and collect the response"""
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'content-type', b'application/json'), *headers],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    chunks = [{'type': 'http.request', 'body': body[:5], 'more_body': True},
+              {'type': 'http.request', 'body': body[5:], 'more_body': False}]
+    messages = []
+    
+    async def receive():
+        return chunks.pop(0)
+    
+    async def send(message):
+        messages.append(message)
+    
+    await asgi_app(scope, receive, send)
+    return messages[0]['status'], dict(messages[0]['headers']), messages[1]['body']
+
+def test_asgi_login_and_profile(app):
+    """Test that the routes behave the same over ASGI"""
+    asgi_app = create_asgi_app(app)
+    body = json.dumps({'email': 'test@example.com', 'password': 'Password123!'}).encode()
+    
+    status, headers, content = asyncio.run(call(asgi_app, 'POST', '/auth/login', body))
+    assert status == 200
+    assert headers[b'x-content-type-options'] == b'nosniff'
+    token = json.loads(content)['token']
+    
+    auth = [(b'authorization', f'Bearer {token}'.encode())]
+    status, _, content = asyncio.run(call(asgi_app, 'GET', '/profile/profile', headers=auth))
+    assert status == 200
+    assert json.loads(content)['message'] == 'Welcome, test@example.com!'
+    
+    status, _, _ = asyncio.run(call(asgi_app, 'GET', '/profile/profile'))
+    assert status == 401
+    asgi_app.shutdown()
+
+def test_asgi_concurrent_requests(app):
+    """Test that more requests than worker threads are all served"""
+    app.config['ASGI_WORKER_THREADS'] = 2
+    asgi_app = create_asgi_app(app)
+    
+    async def run():
+        return await asyncio.gather(*(call(asgi_app, 'GET', '/profile/profile') for _ in range(20)))
+    
+    assert [status for status, _, _ in asyncio.run(run())] == [401] * 20
+    asgi_app.shutdown()
+
+def test_asgi_lifespan(app):
+    """Test startup and shutdown events"""
+    asgi_app = create_asgi_app(app)
+    events = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+    
+    async def receive():
+        return events.pop(0)
+    
+    async def send(message):
+        sent.append(message['type'])
+    
+    asyncio.run(asgi_app({'type': 'lifespan'}, receive, send))
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+def test_asgi_body_limit(app):
+    """Test oversized bodies are refused while they are still arriving"""
+    app.config['MAX_CONTENT_LENGTH'] = 8
+    asgi_app = create_asgi_app(app)
+    
+    # Chunked: rejected after the second chunk, before the request reaches Flask
+    status, _, content = asyncio.run(call(asgi_app, 'POST', '/auth/login', b'{"email": "x"}'))
+    assert status == 413
+    assert json.loads(content) == {'message': 'Request body too large'}
+    
+    # Declared length: rejected without reading the body
+    headers = [(b'content-length', b'1000000')]
+    status, _, _ = asyncio.run(call(asgi_app, 'POST', '/auth/login', b'{}', headers=headers))
+    assert status == 413
+    asgi_app.shutdown()
@@ -1,6 +1,8 @@
 import pytest
 import json
 from app import create_app, db
+from app.models.user import User
+from app.utils.validators import normalize_email
 
 @pytest.fixture
 def client():
@@ -77,6 +79,7 @@ def test_login(client):
     data = json.loads(response.data)
     assert 'token' in data
     assert 'expires_at' in data
+    assert 'refresh_token' in data
 
 def test_login_invalid_credentials(client):
     """Test login with invalid credentials"""
@@ -100,4 +103,85 @@ def test_login_invalid_credentials(client):
         content_type='application/json'
     )
     assert response.status_code == 401
-    assert b'Invalid credentials' in response.data
\ No newline at end of file
+    assert b'Invalid credentials' in response.data
+
+def test_register_duplicate_email_different_case(client):
+    """Test that duplicates are detected on the normalized email"""
+    client.post(
+        '/auth/register',
+        data=json.dumps({
+            'email': 'test@example.com',
+            'password': 'Password123!'
+        }),
+        content_type='application/json'
+    )
+    
+    response = client.post(
+        '/auth/register',
+        data=json.dumps({
+            'email': ' Test@EXAMPLE.com',
+            'password': 'DifferentPass456!'
+        }),
+        content_type='application/json'
+    )
+    assert response.status_code == 409
+    assert b'Email already registered' in response.data
+
+def test_login_email_case_insensitive(client):
+    """Test that login matches the normalized email"""
+    user = User(email='Test@Example.com')
+    user.password = 'Password123!'
+    db.session.add(user)
+    db.session.commit()
+    
+    response = client.post(
+        '/auth/login',
+        data=json.dumps({
+            'email': 'test@EXAMPLE.com',
+            'password': 'Password123!'
+        }),
+        content_type='application/json'
+    )
+    assert response.status_code == 200
+
+def test_normalize_email():
+    """Test email normalization for the unique index"""
+    assert normalize_email(' Test@Example.COM ') == 'test@example.com'
+    assert normalize_email('user@bücher.example') == 'user@xn--bcher-kva.example'
+    assert normalize_email('Jose\u0301@example.com') == normalize_email('Jos\u00e9@example.com')
+
+def test_login_decomposed_unicode_email(client):
+    """Test that an address sent in decomposed (NFD) form can register and then log in"""
+    body = json.dumps({'email': 'Jose\u0301@example.com', 'password': 'Password123!'})
+    
+    response = client.post('/auth/register', data=body, content_type='application/json')
+    assert response.status_code == 201
+    
+    response = client.post('/auth/login', data=body, content_type='application/json')
+    assert response.status_code == 200
+
+def test_login_non_string_email(client):
+    """Test that emails that aren't strings are a validation error, not a server error"""
+    for email in (1, ['test@example.com'], {'a': 1}):
+        response = client.post(
+            '/auth/login',
+            data=json.dumps({
+                'email': email,
+                'password': 'Password123!'
+            }),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+        assert b'Email and password must be strings' in response.data
+
+def test_register_non_string_password(client):
+    """Test that registration rejects a password that isn't a string"""
+    response = client.post(
+        '/auth/register',
+        data=json.dumps({
+            'email': 'test@example.com',
+            'password': 12345678
+        }),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
@@ -0,0 +1,61 @@
+import pytest
+import datetime
+import jwt
+from app import create_app
+from app.utils.auth_utils import (
+    AuthEngine, MISSING_TOKEN, MALFORMED_HEADER, EXPIRED_TOKEN, INVALID_TOKEN
+)
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['JWT_AUDIENCE'] = 'auth-api'
+    return app
+
+@pytest.fixture
+def engine(app):
+    return AuthEngine(app)
+
+def make_token(app, **claims):
+    payload = {
+        'sub': 1,
+        'email': 'test@example.com',
+        'exp': datetime.datetime.now(datetime.UTC) + datetime.timedelta(hours=1)
+    }
+    payload.update(claims)
+    return jwt.encode(payload, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+
+def test_parse_header(engine):
+    """Test Authorization header parsing and failure reasons"""
+    assert engine.parse_header(None) == (None, MISSING_TOKEN)
+    assert engine.parse_header('Basic abc') == (None, MALFORMED_HEADER)
+    assert engine.parse_header('Bearer ') == (None, MISSING_TOKEN)
+    assert engine.parse_header('Bearer abc') == ('abc', None)
+    assert engine.parse_header('Bearer abc extra') == ('abc', None)
+
+def test_decode_checks_audience(app, engine):
+    """Test that configured audience is enforced"""
+    assert engine.decode(make_token(app, aud='auth-api')).ok
+    assert engine.decode(make_token(app)).failure == INVALID_TOKEN
+    assert engine.decode(make_token(app, aud='other')).failure == INVALID_TOKEN
+
+def test_decode_expired(app, engine):
+    """Test that expired tokens report the expired reason"""
+    token = make_token(app, aud='auth-api', exp=datetime.datetime.now(datetime.UTC) - datetime.timedelta(minutes=1))
+    assert engine.decode(token).failure == EXPIRED_TOKEN
+
+def test_issued_tokens_round_trip(engine):
+    """Test that tokens issued by the engine decode with the same engine"""
+    class StubUser:
+        id = 7
+        email = 'test@example.com'
+        token_version = 2
+    
+    token, exp_time = engine.issue_token(StubUser())
+    claims = engine.decode(token).claims
+    
+    assert claims['sub'] == 7
+    assert claims['ver'] == 2
+    assert claims['aud'] == 'auth-api'
+    assert claims['exp'] == int(exp_time.timestamp())
@@ -0,0 +1,129 @@
+import pytest
+import json
+from app import create_app, db, auth_events, limiter
+from app.models.auth_event import AuthEvent
+from app.models.user import User
+from app.utils.auth_events import LOGIN_FAILED, LOGIN_SUCCEEDED, REGISTERED
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app()
+    app.config['TESTING'] = True
+    # The writer thread needs a database its own connection can see
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'events.db'}"
+    app.config['AUTH_EVENTS_FLUSH_INTERVAL'] = 60
+    auth_events.init_app(app)
+    
+    with app.app_context():
+        db.create_all()
+        
+        # Create test user
+        user = User(email='test@example.com')
+        user.password = 'Password123!'
+        db.session.add(user)
+        db.session.commit()
+        
+        yield app
+        
+        auth_events.shutdown()
+        db.session.remove()
+        db.drop_all()
+
+def login(client, password, email='test@example.com'):
+    return client.post(
+        '/auth/login',
+        data=json.dumps({'email': email, 'password': password}),
+        content_type='application/json'
+    )
+
+def test_events_written_behind(app):
+    """Test auth events are queued during requests and written in one batch"""
+    client = app.test_client()
+    
+    assert login(client, 'Password123!').status_code == 200
+    assert login(client, 'WrongPassword1!').status_code == 401
+    client.post('/auth/register', json={'email': 'new@example.com', 'password': 'Password123!'})
+    
+    # Nothing is written until the batch fills or the interval passes
+    assert AuthEvent.query.count() == 0
+    
+    auth_events.flush()
+    events = AuthEvent.query.order_by(AuthEvent.id).all()
+    assert [event.event_type for event in events] == [LOGIN_SUCCEEDED, LOGIN_FAILED, REGISTERED]
+    assert events[0].email_normalized == 'test@example.com'
+    assert events[0].user_id is not None
+    assert events[2].email_normalized == 'new@example.com'
+    assert auth_events.stats()['batches'] == 1
+
+def test_batch_size(app):
+    """Test a full batch is written without waiting for the interval"""
+    app.config['AUTH_EVENTS_BATCH_SIZE'] = 2
+    auth_events.init_app(app)
+    
+    with app.test_request_context():
+        for i in range(5):
+            auth_events.record(LOGIN_FAILED, f'user{i}@example.com')
+    auth_events.shutdown()
+    
+    assert AuthEvent.query.count() == 5
+    assert auth_events.stats()['batches'] == 3
+
+def test_queue_overflow(app):
+    """Test a full queue drops events instead of blocking the request"""
+    app.config['AUTH_EVENTS_QUEUE_SIZE'] = 1
+    auth_events.init_app(app)
+    
+    with app.test_request_context():
+        for _ in range(1000):
+            auth_events.record(LOGIN_FAILED, 'test@example.com')
+    auth_events.shutdown()
+    
+    stats = auth_events.stats()
+    assert stats['dropped'] > 0
+    assert stats['written'] + stats['dropped'] == 1000
+    assert AuthEvent.query.count() == stats['written']
+
+def test_bad_row_does_not_lose_batch(app):
+    """Test that a row the database rejects is retried alone and the rest are kept"""
+    with app.test_request_context():
+        auth_events.record(LOGIN_FAILED, 'first@example.com')
+        auth_events.record(None, 'broken@example.com')  # event_type is NOT NULL
+        auth_events.record(LOGIN_FAILED, 'last@example.com')
+    auth_events.shutdown()
+    
+    stats = auth_events.stats()
+    assert stats['written'] == 2
+    assert stats['failed'] == 1
+    assert {event.email_normalized for event in AuthEvent.query} == {'first@example.com', 'last@example.com'}
+
+def test_long_email_fits_column(app):
+    """Test that a client-supplied email longer than the column is cut to fit"""
+    with app.test_request_context():
+        auth_events.record(LOGIN_FAILED, 'a' * 4000 + '@example.com')
+    auth_events.shutdown()
+    
+    assert len(AuthEvent.query.one().email_normalized) == AuthEvent.email_normalized.type.length
+
+def test_failures_cli(app):
+    """Test listing and ranking recent failed logins"""
+    limiter_enabled = limiter.enabled
+    limiter.enabled = False
+    try:
+        client = app.test_client()
+        for _ in range(3):
+            login(client, 'WrongPassword1!')
+        login(client, 'WrongPassword1!', email='other@example.com')
+        auth_events.flush()
+    finally:
+        limiter.enabled = limiter_enabled
+    
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['events', 'failures', '--email', 'Test@Example.com'])
+    assert result.exit_code == 0, result.output
+    assert result.output.count('test@example.com') == 3
+    assert '3 failed logins in the last 60 minutes' in result.output
+    
+    result = runner.invoke(args=['events', 'failures'])
+    assert result.exit_code == 0, result.output
+    assert '       3  test@example.com' in result.output
+    assert '       4  127.0.0.1' in result.output
@@ -0,0 +1,37 @@
+import json
+from benchmarks import suite
+
+def test_percentile():
+    """Test nearest-rank percentiles"""
+    values = [i / 100 for i in range(1, 101)]
+    
+    assert suite.percentile(values, 0.50) == 0.50
+    assert suite.percentile(values, 0.99) == 0.99
+    assert suite.percentile([0.3], 0.99) == 0.3
+    assert suite.percentile([], 0.5) == 0.0
+
+def test_compare_flags_regressions():
+    """Test that only slowdowns beyond the threshold are reported"""
+    baseline = {'results': {'load.read_flood': {'p50_ms': 1.0, 'p99_ms': 10.0}}}
+    results = {'results': {
+        'load.read_flood': {'p50_ms': 1.1, 'p99_ms': 15.0},
+        'load.new_scenario': {'p50_ms': 5.0, 'p99_ms': 9.0},
+    }}
+    
+    regressions = suite.compare(results, baseline, threshold=0.2)
+    assert [(name, metric) for name, metric, *_ in regressions] == [('load.read_flood', 'p99_ms')]
+
+def test_quick_suite_writes_json(tmp_path):
+    """Test a reduced run end to end, including the baseline comparison"""
+    output = tmp_path / 'results.json'
+    
+    assert suite.main(['--quick', '--rounds', '4', '--output', str(output)]) == 0
+    results = json.loads(output.read_text())
+    
+    assert results['meta']['bcrypt_rounds'] == 4
+    for name in ('micro.verify', 'micro.jwt_decode', 'load.login_storm', 'load.read_flood', 'load.register_burst'):
+        assert results['results'][name]['errors'] == 0
+        assert results['results'][name]['ops_per_sec'] > 0
+    
+    # Against itself with a huge threshold nothing can regress
+    assert suite.main(['--quick', '--rounds', '4', '--baseline', str(output), '--threshold', '1000']) == 0
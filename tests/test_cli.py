@@ -0,0 +1,200 @@
+import pytest
+import csv
+import json
+from app import create_app, db, password_hasher
+from app.models.auth_event import AuthEvent
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.utils.auth_events import REGISTERED
+from sqlalchemy.exc import IntegrityError
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def runner(app):
+    return app.test_cli_runner()
+
+def test_import_jsonl(app, runner, tmp_path):
+    """Test importing pre-hashed and plain-password users in chunks"""
+    password_hash = password_hasher.hash('Password123!')
+    source = tmp_path / 'users.jsonl'
+    source.write_text('\n'.join(json.dumps(record) for record in [
+        {'email': 'hashed@example.com', 'password_hash': password_hash},
+        {'email': 'Plain@Example.com', 'password': 'Password123!'},
+        {'email': 'broken@example.com', 'password_hash': 'not-a-hash'},
+    ]))
+    
+    result = runner.invoke(args=['users', 'import', str(source), '--chunk-size', '1'])
+    
+    assert result.exit_code == 0, result.output
+    assert 'Imported 2 users, skipped 1 invalid rows' in result.output
+    assert User.find_by_email('hashed@example.com').password_hash == password_hash
+    assert User.find_by_email('plain@example.com').verify_password('Password123!')
+
+def test_import_skip_existing(app, runner, tmp_path):
+    """Test that --skip-existing ignores emails that are already registered"""
+    source = tmp_path / 'users.csv'
+    source.write_text('email,password_hash\nTest@Example.com,{0}\ntest@example.com,{0}\n'.format(
+        password_hasher.hash('Password123!')
+    ))
+    
+    result = runner.invoke(args=['users', 'import', str(source), '--skip-existing'])
+    
+    assert result.exit_code == 0, result.output
+    assert 'Imported 1 users, skipped 0 invalid rows and 1 already registered' in result.output
+    assert User.query.count() == 1
+
+def test_import_duplicate_without_skip_existing(app, runner, tmp_path):
+    """Test that a conflicting email stops the import with a short error that leaks no hashes"""
+    password_hash = password_hasher.hash('Password123!')
+    source = tmp_path / 'users.jsonl'
+    source.write_text('\n'.join(json.dumps({'email': email, 'password_hash': password_hash}) for email in [
+        'a@example.com', 'b@example.com', 'c@example.com', 'A@example.com',
+    ]))
+    
+    result = runner.invoke(args=['users', 'import', str(source), '--chunk-size', '2'])
+    
+    assert result.exit_code == 1
+    assert 'Lines 3-4: an email is already registered or appears twice' in result.output
+    assert '2 users from earlier lines were' in result.output
+    assert '--skip-existing' in result.output
+    assert password_hash not in result.output
+    assert User.query.count() == 2
+    
+    # Importing the same file again fails on the first batch
+    result = runner.invoke(args=['users', 'import', str(source), '--chunk-size', '2'])
+    assert 'Lines 1-2:' in result.output
+    assert password_hash not in result.output
+
+def test_import_rejects_malformed_lines(app, runner, tmp_path):
+    """Test that bad JSONL lines are reported and skipped without losing the rows around them"""
+    source = tmp_path / 'users.jsonl'
+    source.write_text('\n'.join([
+        json.dumps({'email': 'first@example.com', 'password': 'Password123!'}),
+        '{"email": "truncated@example.com", ',
+        '["not", "an", "object"]',
+        json.dumps({'email': 1, 'password': 'Password123!'}),
+        json.dumps({'email': 'last@example.com', 'password': 'Password123!'}),
+    ]))
+    
+    result = runner.invoke(args=['users', 'import', str(source)])
+    
+    assert result.exit_code == 0, result.output
+    assert 'Imported 2 users, skipped 3 invalid rows' in result.output
+    assert 'Line 2: not valid JSON' in result.output
+    assert 'Line 3: not a JSON object' in result.output
+    assert User.query.count() == 2
+
+def test_export_round_trip(app, runner, tmp_path):
+    """Test that an export can be imported into an empty database"""
+    user = User(email='test@example.com')
+    user.password = 'Password123!'
+    db.session.add(user)
+    db.session.commit()
+    password_hash = user.password_hash
+    
+    dest = tmp_path / 'users.csv'
+    result = runner.invoke(args=['users', 'export', str(dest)])
+    assert result.exit_code == 0, result.output
+    
+    with open(dest) as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]['email'] == 'test@example.com'
+    assert rows[0]['password_hash'] == password_hash
+    
+    db.session.delete(User.find_by_email('test@example.com'))
+    db.session.commit()
+    result = runner.invoke(args=['users', 'import', str(dest)])
+    
+    assert result.exit_code == 0, result.output
+    assert User.find_by_email('test@example.com').verify_password('Password123!')
+
+def test_init_db_upgrades_older_users_table(tmp_path):
+    """Test that init-db adds and backfills the columns an older users table lacks"""
+    legacy = create_app()
+    legacy.config['TESTING'] = True
+    legacy.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'legacy.db'}"
+    
+    with legacy.app_context():
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql(
+                'CREATE TABLE users (id INTEGER NOT NULL PRIMARY KEY, email VARCHAR(120) NOT NULL UNIQUE, '
+                'password_hash VARCHAR(128) NOT NULL, created_at DATETIME, updated_at DATETIME)'
+            )
+            connection.exec_driver_sql(
+                'INSERT INTO users (email, password_hash) VALUES (?, ?)',
+                ('Old@Example.com', password_hasher.hash('Password123!'))
+            )
+        
+        result = legacy.test_cli_runner().invoke(args=['init-db'])
+        assert result.exit_code == 0, result.output
+        assert 'backfilled email_normalized for 1 users' in result.output
+        assert 'rebuilt users with AUTOINCREMENT' in result.output
+        
+        user = User.find_by_email('old@example.com')
+        assert user.token_version == 0
+        assert user.verify_password('Password123!')
+        
+        # Running it again changes nothing
+        result = legacy.test_cli_runner().invoke(args=['init-db'])
+        assert result.output == 'Database tables are up to date\n'
+        
+        duplicate = User(email='OLD@example.com')
+        duplicate.password = 'Password123!'
+        db.session.add(duplicate)
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+        db.session.remove()
+
+def test_init_db_stops_users_table_reusing_ids(tmp_path):
+    """Test that init-db rebuilds an SQLite users table that reuses ids, keeping rows that reference it"""
+    legacy = create_app()
+    legacy.config['TESTING'] = True
+    legacy.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'legacy.db'}"
+    
+    with legacy.app_context():
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql(
+                'CREATE TABLE users (id INTEGER NOT NULL PRIMARY KEY, email VARCHAR(120) NOT NULL, '
+                'email_normalized VARCHAR(255) NOT NULL UNIQUE, password_hash VARCHAR(128) NOT NULL, '
+                'token_version INTEGER NOT NULL, created_at DATETIME, updated_at DATETIME)'
+            )
+        db.create_all()
+        
+        users = []
+        for email in ('a@example.com', 'b@example.com'):
+            user = User(email=email)
+            user.password = 'Password123!'
+            db.session.add(user)
+            users.append(user)
+        db.session.flush()
+        RefreshToken.issue(users[0], 3600)
+        db.session.delete(users[1])
+        db.session.add(AuthEvent(event_type=REGISTERED, email_normalized='b@example.com', user_id=users[1].id))
+        db.session.commit()
+        
+        result = legacy.test_cli_runner().invoke(args=['init-db'])
+        assert result.exit_code == 0, result.output
+        assert 'rebuilt users with AUTOINCREMENT' in result.output
+        
+        assert RefreshToken.query.count() == 1
+        assert User.find_by_email('a@example.com').verify_password('Password123!')
+        
+        user = User(email='c@example.com')
+        user.password = 'Password123!'
+        db.session.add(user)
+        db.session.commit()
+        # The deleted user's id is known from the audit log and not handed out again
+        assert user.id == 3
+        db.session.remove()
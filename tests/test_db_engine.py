@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+import pytest
+from sqlalchemy import text
+from app import create_app, db
+from app.models.user import User
+
+# Placeholder bcrypt-format hash; these tests measure writes, not hashing
+PASSWORD_HASH = '$2b$04$O2S5uV4zWQe0n0cQ3XH5UOZq7pE8mW3Xf8m0i0T7uQe1b7yQ0m0bK'
+THREADS = 8
+WRITES_PER_THREAD = 25
+
+def make_app(uri, profile):
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['DB_PROFILE'] = profile
+    with app.app_context():
+        db.create_all()
+    return app
+
+def concurrent_registrations(app):
+    """Insert users from several threads, one commit each; return (rows/sec, errors)"""
+    errors = []
+    
+    def worker(n):
+        with app.app_context():
+            for i in range(WRITES_PER_THREAD):
+                try:
+                    db.session.add(User(email=f'user{n}-{i}@example.com', password_hash=PASSWORD_HASH))
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(e)
+            db.session.remove()
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    return (THREADS * WRITES_PER_THREAD - len(errors)) / elapsed, errors
+
+def test_sqlite_profile_pragmas(tmp_path):
+    """Test that the sqlite profile applies its pragmas on connect"""
+    app = make_app(f"sqlite:///{tmp_path / 'auth.db'}", 'sqlite')
+    
+    with app.app_context():
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert db.session.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+        assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == app.config['SQLITE_BUSY_TIMEOUT_MS']
+        assert db.engine.pool.size() == app.config['DB_POOL_SIZE']
+
+def test_server_profile_pool_options(tmp_path):
+    """Test that the server profile builds a bounded, pre-pinged pool"""
+    app = make_app(f"sqlite:///{tmp_path / 'auth.db'}", 'server')
+    
+    with app.app_context():
+        assert db.engine.pool.size() == app.config['DB_POOL_SIZE']
+        assert db.engine.pool._pre_ping
+        assert db.engine.pool._recycle == app.config['DB_POOL_RECYCLE']
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'delete'
+
+@pytest.mark.parametrize('profile, uri_env', [
+    ('sqlite', None),
+    ('server', 'TEST_SERVER_DATABASE_URL'),
+])
+def test_concurrent_write_throughput(tmp_path, profile, uri_env):
+    """Test concurrent registrations under each profile and report rows/sec"""
+    uri = f"sqlite:///{tmp_path / 'auth.db'}"
+    if uri_env:
+        if not os.environ.get(uri_env):
+            pytest.skip(f'set {uri_env} to measure the {profile} profile')
+        uri = os.environ[uri_env]
+    app = make_app(uri, profile)
+    
+    throughput, errors = concurrent_registrations(app)
+    print(f'\n{profile} profile: {throughput:.0f} rows/sec')
+    
+    assert not errors
+    with app.app_context():
+        assert User.query.count() == THREADS * WRITES_PER_THREAD
+        db.drop_all()
@@ -0,0 +1,89 @@
+import pytest
+import json
+import email_validator
+from app import create_app, db
+from app.models.user import User
+from app.utils.email_policy import DomainCache, EmailPolicy
+from app.utils.validators import validate_email
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+            db.drop_all()
+
+def test_validate_email_offline(client):
+    """Test syntax-only validation returning the normalized address"""
+    assert validate_email(' Jane.Doe@EXAMPLE.com ') == 'Jane.Doe@example.com'
+    assert validate_email('not-an-email') is None
+    assert validate_email('user@mailinator.com') is None
+
+def test_disposable_domains_include_subdomains(tmp_path):
+    """Test blocklist matching on the domain and its parents only"""
+    policy = EmailPolicy()
+    policy.disposable_domains = frozenset({'throwaway.test'})
+    
+    assert policy.is_disposable('throwaway.test')
+    assert policy.is_disposable('inbox.Throwaway.test')
+    assert not policy.is_disposable('notthrowaway.test')
+    assert not policy.is_disposable('test')
+
+def test_deliverability_cached_per_domain(monkeypatch):
+    """Test that one DNS check covers every address at a domain"""
+    lookups = []
+    
+    def fake_deliverability(domain, domain_i18n, timeout=None):
+        lookups.append(domain)
+        if domain == 'nomail.example':
+            raise email_validator.EmailUndeliverableError('no MX')
+        return {'mx': [(10, 'mx.' + domain)]}
+    
+    monkeypatch.setattr(email_validator, 'validate_email_deliverability', fake_deliverability)
+    policy = EmailPolicy()
+    policy.check_deliverability = True
+    
+    assert policy.check('a@example.org')[0] == 'a@example.org'
+    assert policy.check('b@example.org')[0] == 'b@example.org'
+    assert policy.check('a@nomail.example') == (None, 'Email domain does not accept mail')
+    assert policy.check('b@nomail.example')[0] is None
+    assert lookups == ['example.org', 'nomail.example']
+
+def test_domain_cache_bounds():
+    """Test LRU eviction and TTL expiry"""
+    cache = DomainCache(size=2, ttl=60)
+    cache.put('a.example', True)
+    cache.put('b.example', False)
+    cache.get('a.example')
+    cache.put('c.example', True)
+    
+    assert cache.get('b.example') is None
+    assert cache.get('a.example') is True
+    
+    expired = DomainCache(size=2, ttl=0)
+    expired.put('a.example', True)
+    assert expired.get('a.example') is None
+
+def test_register_stores_normalized_email(client):
+    """Test that registration stores the validator's canonical address"""
+    response = client.post(
+        '/auth/register',
+        data=json.dumps({'email': '  Jane@Example.COM', 'password': 'Password123!'}),
+        content_type='application/json'
+    )
+    assert response.status_code == 201
+    assert User.query.one().email == 'Jane@example.com'
+    
+    response = client.post(
+        '/auth/register',
+        data=json.dumps({'email': 'jane@yopmail.com', 'password': 'Password123!'}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+    assert b'Disposable email addresses are not allowed' in response.data
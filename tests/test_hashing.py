@@ -0,0 +1,132 @@
+import pytest
+import json
+import logging
+from app import create_app, db, password_hasher
+from app.models.user import User
+from app.utils.hashing import PasswordHasherBusy, calibrate_rounds, hash_rounds
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            
+            # Create test user
+            user = User(email='test@example.com')
+            user.password = 'Password123!'
+            db.session.add(user)
+            db.session.commit()
+            
+            yield client
+            
+            db.session.remove()
+            db.drop_all()
+
+def test_hash_and_verify():
+    """Test hashing round trip through the worker pool"""
+    password_hasher.reset_stats()
+    password_hash = password_hasher.hash('Password123!')
+    
+    assert password_hash.startswith('$2b$')
+    assert password_hasher.verify('Password123!', password_hash)
+    assert not password_hasher.verify('WrongPassword!', password_hash)
+    
+    stats = password_hasher.stats()
+    assert stats['operations']['hash']['count'] == 1
+    assert stats['operations']['verify']['count'] == 2
+    assert stats['operations']['verify']['run_seconds'] > 0
+
+def test_hasher_rejects_when_full():
+    """Test that a full hashing queue fails fast instead of blocking"""
+    slots = [password_hasher._slots.acquire(blocking=False) for _ in range(password_hasher.max_in_flight)]
+    try:
+        assert all(slots)
+        with pytest.raises(PasswordHasherBusy):
+            password_hasher.hash('Password123!')
+    finally:
+        for _ in slots:
+            password_hasher._slots.release()
+    
+    assert password_hasher.stats()['rejected'] >= 1
+
+def test_login_returns_503_when_hasher_busy(client, caplog):
+    """Test that login sheds load with 503 and Retry-After, without logging an error"""
+    slots = [password_hasher._slots.acquire(blocking=False) for _ in range(password_hasher.max_in_flight)]
+    try:
+        response = client.post(
+            '/auth/login',
+            data=json.dumps({
+                'email': 'test@example.com',
+                'password': 'Password123!'
+            }),
+            content_type='application/json'
+        )
+    finally:
+        for _ in slots:
+            password_hasher._slots.release()
+    
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert response.json['message'] == 'Service temporarily overloaded, please retry'
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+def test_needs_rehash():
+    """Test cost detection on stored hashes"""
+    password_hash = password_hasher.hash('Password123!')
+    
+    assert hash_rounds(password_hash) == password_hasher.rounds
+    assert not password_hasher.needs_rehash(password_hash)
+    assert password_hasher.needs_rehash(password_hash.replace(f'${password_hasher.rounds:02d}$', '$04$', 1))
+
+def test_calibrate_rounds_respects_bounds():
+    """Test that calibration stays within the configured cost range"""
+    assert calibrate_rounds(0, min_rounds=4, max_rounds=6) == 4
+    assert calibrate_rounds(60, min_rounds=4, max_rounds=5) == 5
+
+def test_login_rehashes_on_cost_change(client):
+    """Test that a successful login upgrades a hash made with a stale cost"""
+    password_hasher.rounds = 4
+    try:
+        response = client.post(
+            '/auth/login',
+            data=json.dumps({
+                'email': 'test@example.com',
+                'password': 'Password123!'
+            }),
+            content_type='application/json'
+        )
+        assert response.status_code == 200
+        
+        user = User.query.filter_by(email='test@example.com').first()
+        assert hash_rounds(user.password_hash) == 4
+        assert user.verify_password('Password123!')
+    finally:
+        password_hasher.rounds = client.application.config['BCRYPT_ROUNDS']
+
+def test_login_succeeds_when_rehash_is_shed(client, monkeypatch):
+    """Test that a correct password still logs in when the pool has no room for the rehash"""
+    original_hash = User.query.filter_by(email='test@example.com').first().password_hash
+    
+    def busy_hash(password):
+        raise PasswordHasherBusy(1)
+    
+    password_hasher.rounds = 4
+    monkeypatch.setattr(password_hasher, 'hash', busy_hash)
+    try:
+        response = client.post(
+            '/auth/login',
+            data=json.dumps({
+                'email': 'test@example.com',
+                'password': 'Password123!'
+            }),
+            content_type='application/json'
+        )
+    finally:
+        password_hasher.rounds = client.application.config['BCRYPT_ROUNDS']
+    
+    assert response.status_code == 200
+    assert User.query.filter_by(email='test@example.com').first().password_hash == original_hash
@@ -0,0 +1,134 @@
+import pytest
+import json
+from base64 import b64encode
+from sqlalchemy import event
+from app import create_app, db, token_cache
+from app.models.user import User
+from app.utils.auth_utils import auth_engine
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['INTROSPECT_CLIENTS'] = 'gateway:gateway-secret'
+    
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            
+            # Create test users
+            for email in ('test@example.com', 'other@example.com', 'revoked@example.com'):
+                user = User(email=email)
+                user.password = 'Password123!'
+                db.session.add(user)
+            db.session.commit()
+            
+            yield client
+            
+            db.session.remove()
+            db.drop_all()
+
+def basic_auth(credentials):
+    return {'Authorization': 'Basic ' + b64encode(credentials.encode()).decode()}
+
+def introspect(client, tokens, credentials='gateway:gateway-secret'):
+    return client.post(
+        '/auth/introspect',
+        data=json.dumps({'tokens': tokens}),
+        content_type='application/json',
+        headers=basic_auth(credentials) if credentials else {}
+    )
+
+def count_user_queries():
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM users' in statement:
+            statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return statements, lambda: event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+def test_introspect_batch(client):
+    """Test a mixed batch is answered in order with one user query"""
+    users = {user.email: user for user in User.query.all()}
+    test_token, _ = auth_engine.issue_token(users['test@example.com'])
+    other_token, _ = auth_engine.issue_token(users['other@example.com'])
+    revoked_token, _ = auth_engine.issue_token(users['revoked@example.com'])
+    users['revoked@example.com'].revoke_tokens()
+    db.session.commit()
+    token_cache.clear()
+    
+    statements, stop = count_user_queries()
+    try:
+        response = introspect(client, [test_token, 'garbage', other_token, test_token, revoked_token, ''])
+    finally:
+        stop()
+    
+    assert response.status_code == 200
+    results = json.loads(response.data)['results']
+    assert len(results) == 6
+    assert results[0]['active'] is True
+    assert results[0]['claims']['email'] == 'test@example.com'
+    assert results[1] == {'active': False, 'reason': 'invalid_token'}
+    assert results[2]['claims']['email'] == 'other@example.com'
+    assert results[3] == results[0]
+    assert results[4] == {'active': False, 'reason': 'revoked_token'}
+    assert results[5] == {'active': False, 'reason': 'invalid_token'}
+    assert len(statements) == 1
+    assert ' IN ' in statements[0]
+
+def test_introspect_cached_tokens(client):
+    """Test tokens already verified skip decoding and the database"""
+    user = User.find_by_email('test@example.com')
+    token, _ = auth_engine.issue_token(user)
+    introspect(client, [token])
+    
+    statements, stop = count_user_queries()
+    try:
+        response = introspect(client, [token])
+    finally:
+        stop()
+    
+    assert json.loads(response.data)['results'][0]['active'] is True
+    assert statements == []
+
+def test_introspect_deleted_user(client):
+    """Test a token whose user no longer exists is inactive"""
+    user = User.find_by_email('other@example.com')
+    token, _ = auth_engine.issue_token(user)
+    db.session.delete(user)
+    db.session.commit()
+    
+    response = introspect(client, [token])
+    assert json.loads(response.data)['results'] == [{'active': False, 'reason': 'unknown_user'}]
+
+def test_introspect_validation(client):
+    """Test malformed bodies and oversized batches are rejected"""
+    assert introspect(client, 'not-a-list').status_code == 400
+    assert introspect(client, [1, 2]).status_code == 400
+    assert introspect(client, []).status_code == 200
+    
+    client.application.config['INTROSPECT_MAX_TOKENS'] = 2
+    response = introspect(client, ['a', 'b', 'c'])
+    assert response.status_code == 400
+    assert json.loads(response.data)['message'] == 'At most 2 tokens per request'
+
+def test_introspect_requires_client_auth(client):
+    """Test callers without valid INTROSPECT_CLIENTS credentials are refused before the body is read"""
+    for credentials in (None, 'gateway:wrong', 'other:gateway-secret', 'gateway:'):
+        response = introspect(client, ['a'], credentials)
+        assert response.status_code == 401
+        assert response.headers['WWW-Authenticate'] == 'Basic realm="introspect"'
+        assert json.loads(response.data)['message'] == 'Client authentication required'
+    
+    bearer = {'Authorization': 'Bearer gateway-secret'}
+    assert client.post('/auth/introspect', json={'tokens': []}, headers=bearer).status_code == 401
+    
+    # With no clients configured nobody may introspect
+    client.application.config['INTROSPECT_CLIENTS'] = ''
+    assert introspect(client, []).status_code == 401
+    
+    client.application.config['INTROSPECT_CLIENTS'] = 'edge:one, gateway:gateway-secret'
+    assert introspect(client, []).status_code == 200
@@ -0,0 +1,66 @@
+import pytest
+import json
+import jwt
+from app import create_app
+from app.utils.auth_utils import auth_engine
+
+class StubUser:
+    id = 1
+    email = 'test@example.com'
+    token_version = 0
+
+@pytest.fixture(params=['RS256', 'EdDSA'])
+def app(request, tmp_path):
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['JWT_ALGORITHM'] = request.param
+    app.config['JWT_KEYS_DIR'] = str(tmp_path)
+    
+    runner = app.test_cli_runner()
+    for kid in ('2024a', '2024b'):
+        result = runner.invoke(args=['keys', 'generate', '--kid', kid])
+        assert result.exit_code == 0, result.output
+    
+    auth_engine.init_app(app)
+    yield app
+    
+    # Restore the shared-secret engine for other tests
+    app.config['JWT_ALGORITHM'] = 'HS256'
+    auth_engine.init_app(app)
+
+def test_tokens_carry_active_kid(app):
+    """Test that tokens are signed by the oldest signing key and name it in the header"""
+    token, _ = auth_engine.issue_token(StubUser())
+    
+    assert jwt.get_unverified_header(token)['kid'] == '2024a'
+    assert auth_engine.decode(token).claims['sub'] == 1
+
+def test_rotation_keeps_old_tokens_valid(app):
+    """Test that a new key only signs once the old one is retired, and old tokens still verify"""
+    old_token, _ = auth_engine.issue_token(StubUser())
+    assert jwt.get_unverified_header(old_token)['kid'] == '2024a'
+    
+    app.test_cli_runner().invoke(args=['keys', 'retire', '2024a'])
+    auth_engine.init_app(app)
+    
+    assert auth_engine.keyring.active.kid == '2024b'
+    assert auth_engine.decode(old_token).ok
+
+def test_jwks_endpoint(app):
+    """Test that JWKS publishes every key and honours If-None-Match"""
+    client = app.test_client()
+    response = client.get('/.well-known/jwks.json')
+    
+    assert response.status_code == 200
+    assert 'max-age' in response.headers['Cache-Control']
+    keys = json.loads(response.data)['keys']
+    assert sorted(key['kid'] for key in keys) == ['2024a', '2024b']
+    
+    token, _ = auth_engine.issue_token(StubUser())
+    kid = jwt.get_unverified_header(token)['kid']
+    public_key = jwt.PyJWK(next(key for key in keys if key['kid'] == kid)).key
+    assert jwt.decode(token, public_key, algorithms=[app.config['JWT_ALGORITHM']])['sub'] == 1
+    
+    cached = client.get('/.well-known/jwks.json', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.data == b''
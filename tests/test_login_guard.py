@@ -0,0 +1,198 @@
+import pytest
+import json
+import threading
+from app import create_app, db, login_guard, password_hasher
+from app.models.user import User
+from app.utils.login_guard import BloomFilter, LoginGuard
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['LOGIN_LOCKOUT_THRESHOLD'] = 3
+    login_guard.init_app(app)
+
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+
+            # Create test user
+            user = User(email='test@example.com')
+            user.password = 'Password123!'
+            db.session.add(user)
+            db.session.commit()
+
+            yield client
+
+            db.session.remove()
+            db.drop_all()
+
+def login(client, email, password):
+    return client.post(
+        '/auth/login',
+        data=json.dumps({'email': email, 'password': password}),
+        content_type='application/json'
+    )
+
+def test_bloom_filter():
+    """Test that added items are always found and absent ones mostly aren't"""
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f'user{i}@example.com')
+
+    assert all(f'user{i}@example.com' in bloom for i in range(1000))
+    false_positives = sum(f'other{i}@example.com' in bloom for i in range(1000))
+    assert false_positives < 50
+
+def test_account_lockout(client):
+    """Test that repeated failures lock the account with a Retry-After"""
+    for _ in range(3):
+        assert login(client, 'test@example.com', 'wrong').status_code == 401
+
+    # Even the right password is refused while locked
+    response = login(client, 'test@example.com', 'Password123!')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+
+def test_lockout_backoff_grows():
+    """Test that each failure past the threshold doubles the lockout"""
+    guard = LoginGuard()
+    guard.lockout_threshold = 2
+    guard.lockout_base = 10
+
+    for _ in range(2):
+        guard.record_failure('10.0.0.1', 'a@example.com')
+    first = guard.check('10.0.0.1', 'a@example.com')
+    guard.record_failure('10.0.0.1', 'a@example.com')
+    second = guard.check('10.0.0.1', 'a@example.com')
+
+    assert first == 10
+    assert second == 20
+
+def test_success_clears_failures(client):
+    """Test that a successful login resets the failure count"""
+    for _ in range(2):
+        login(client, 'test@example.com', 'wrong')
+    assert login(client, 'test@example.com', 'Password123!').status_code == 200
+
+    for _ in range(2):
+        assert login(client, 'test@example.com', 'wrong').status_code == 401
+
+def test_credential_stuffing_blocks_ip():
+    """Test that failing across many accounts blocks the IP, not the accounts"""
+    guard = LoginGuard()
+    guard.stuffing_max_accounts = 3
+
+    for i in range(4):
+        guard.record_failure('10.0.0.1', f'user{i}@example.com')
+
+    assert guard.check('10.0.0.1', 'fresh@example.com') > 0
+    assert guard.check('10.0.0.2', 'user0@example.com') is None
+
+def test_unknown_email_costs_a_verify(client):
+    """Test that logins for unknown emails still run bcrypt"""
+    password_hasher.reset_stats()
+
+    response = login(client, 'nobody@example.com', 'Password123!')
+
+    assert response.status_code == 401
+    assert password_hasher.stats()['operations']['verify']['count'] == 1
+
+def test_bloom_catches_up_with_new_users(client):
+    """Test that users added behind the guard's back can log in"""
+    assert login(client, 'late@example.com', 'Password123!').status_code == 401
+
+    user = User(email='late@example.com')
+    user.password = 'Password123!'
+    db.session.add(user)
+    db.session.commit()
+    login_guard.bloom_refresh = 0
+
+    assert login(client, 'late@example.com', 'Password123!').status_code == 200
+
+def test_bloom_load_does_not_block_logins():
+    """Test that the user load runs outside the guard lock and nobody waits for it"""
+    guard = LoginGuard()
+    loading = threading.Event()
+    release = threading.Event()
+
+    def slow_load(last_id):
+        loading.set()
+        release.wait(5)
+        return [(1, 'known@example.com')]
+
+    loader = threading.Thread(target=guard.may_exist, args=('known@example.com', slow_load))
+    loader.start()
+    try:
+        assert loading.wait(5)
+        # Lockout bookkeeping and other logins go ahead while the load runs
+        guard.record_failure('10.0.0.1', 'a@example.com')
+        assert guard.check('10.0.0.1', 'a@example.com') is None
+        assert guard.may_exist('other@example.com', slow_load)
+    finally:
+        release.set()
+        loader.join()
+
+    guard.bloom_refresh = 60
+    assert guard.may_exist('known@example.com', slow_load)
+    assert not guard.may_exist('other@example.com', slow_load)
+
+def test_bloom_sees_user_given_a_freed_id(tmp_path):
+    """Test that a user registered by another process after a deletion can log in"""
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'auth.db'}"
+    login_guard.init_app(app)
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        for email in ('a@example.com', 'b@example.com'):
+            user = User(email=email)
+            user.password = 'Password123!'
+            db.session.add(user)
+        db.session.commit()
+        assert login(client, 'a@example.com', 'Password123!').status_code == 200
+
+        # Another worker deletes the newest user and registers someone else
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql("DELETE FROM users WHERE email = 'b@example.com'")
+        other = User(email='c@example.com')
+        other.password = 'Password123!'
+        with db.engine.begin() as connection:
+            connection.execute(User.__table__.insert().values(
+                email=other.email, email_normalized=other.email_normalized, password_hash=other.password_hash
+            ))
+        login_guard.bloom_refresh = 0
+
+        assert login(client, 'c@example.com', 'Password123!').status_code == 200
+        db.session.remove()
+
+def test_bloom_rereads_ids_committed_out_of_order():
+    """Test that a lower id committed after a higher one is still picked up"""
+    guard = LoginGuard()
+    guard.bloom_refresh = 0
+    rows = [(1, 'a@example.com'), (3, 'c@example.com')]
+
+    def load_since(last_id):
+        return [row for row in rows if row[0] > last_id]
+
+    assert guard.may_exist('c@example.com', load_since)
+    rows.append((2, 'b@example.com'))
+    assert guard.may_exist('b@example.com', load_since)
+
+def test_bloom_rebuild_drops_stale_emails():
+    """Test that the periodic rebuild forgets emails that are no longer registered"""
+    guard = LoginGuard()
+    guard.bloom_refresh = 0
+    rows = [(1, 'old@example.com')]
+
+    def load_since(last_id):
+        return [row for row in rows if row[0] > last_id]
+
+    assert guard.may_exist('old@example.com', load_since)
+    rows[0] = (1, 'new@example.com')
+    guard.bloom_rebuild = 0
+    assert guard.may_exist('new@example.com', load_since)
+    assert not guard.may_exist('old@example.com', load_since)
@@ -0,0 +1,55 @@
+import pytest
+from app import create_app, db, password_hasher
+from app.models import lookups
+from app.models.user import User
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.app_context():
+        db.create_all()
+        
+        # Create test user
+        user = User(email='Test@Example.com')
+        user.password = 'Password123!'
+        db.session.add(user)
+        db.session.commit()
+        
+        yield app
+        
+        db.session.remove()
+        db.drop_all()
+
+def test_find_login(app):
+    """Test the login lookup returns only the columns login needs"""
+    row = lookups.find_login('test@example.com')
+    
+    assert tuple(row._fields) == ('id', 'email', 'password_hash', 'token_version')
+    assert row.email == 'Test@Example.com'
+    assert password_hasher.verify('Password123!', row.password_hash)
+    assert lookups.find_login('missing@example.com') is None
+
+def test_find_auth(app):
+    """Test lookups by id, singly and in a batch"""
+    user_id = User.find_by_email('test@example.com').id
+    
+    row = lookups.find_auth(user_id)
+    assert tuple(row._fields) == ('id', 'email', 'token_version')
+    assert row.token_version == 0
+    assert lookups.find_auth(user_id + 1) is None
+    
+    assert list(lookups.find_auth_many({user_id, user_id + 1})) == [user_id]
+    assert lookups.find_auth_many(set()) == {}
+
+def test_set_password_hash(app):
+    """Test a rehash is written in the session's transaction"""
+    user_id = User.find_by_email('test@example.com').id
+    new_hash = password_hasher.hash('Password456!')
+    
+    lookups.set_password_hash(user_id, 'test@example.com', new_hash)
+    db.session.commit()
+    
+    assert lookups.find_login('test@example.com').password_hash == new_hash
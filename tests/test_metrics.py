@@ -0,0 +1,86 @@
+import pytest
+import json
+from flask import Flask
+from app import create_app, db, metrics
+from app.models.user import User
+from app.utils.metrics import Histogram, Metrics
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            
+            # Create test user
+            user = User(email='test@example.com')
+            user.password = 'Password123!'
+            db.session.add(user)
+            db.session.commit()
+            
+            yield client
+            
+            db.session.remove()
+            db.drop_all()
+
+def login(client):
+    return client.post(
+        '/auth/login',
+        data=json.dumps({'email': 'test@example.com', 'password': 'Password123!'}),
+        content_type='application/json'
+    )
+
+def test_metrics_endpoint(client):
+    """Test request and phase histograms in Prometheus text format"""
+    assert login(client).status_code == 200
+    
+    response = client.get('/metrics')
+    body = response.data.decode()
+    
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert 'http_requests_total{endpoint="/auth/login",method="POST",status="200"} 1' in body
+    assert 'http_request_duration_seconds_count{endpoint="/auth/login",method="POST"} 1' in body
+    for phase in ('validation', 'db', 'hash', 'jwt'):
+        assert f'http_request_phase_duration_seconds_count{{endpoint="/auth/login",phase="{phase}"}} 1' in body
+    assert 'password_hash_rounds ' in body
+
+def test_metrics_not_rate_limited(client):
+    """Test that frequent scrapes are exempt from the default limits"""
+    for _ in range(60):
+        assert client.get('/metrics').status_code == 200
+
+def test_server_timing_header(client):
+    """Test per-phase Server-Timing when enabled"""
+    assert 'Server-Timing' not in login(client).headers
+    
+    metrics.server_timing = True
+    header = login(client).headers['Server-Timing']
+    
+    phases = [entry.split(';')[0] for entry in header.split(', ')]
+    assert {'hash', 'jwt', 'db', 'total'} <= set(phases)
+
+def test_histogram_buckets():
+    """Test that buckets are cumulative with a +Inf bucket"""
+    histogram = Histogram('latency_seconds', 'Latency', ('endpoint',), (0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(('x',), value)
+    
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{endpoint="x",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{endpoint="x",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{endpoint="x",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{endpoint="x"} 3' in lines
+
+def test_metrics_disabled():
+    """Test that disabled metrics install no hooks and spans do nothing"""
+    app = Flask(__name__)
+    app.config['METRICS_ENABLED'] = False
+    disabled = Metrics(app)
+    
+    assert not app.before_request_funcs and not app.after_request_funcs
+    with disabled.span('db') as span:
+        assert span is None
@@ -0,0 +1,96 @@
+import pytest
+import hashlib
+import json
+from app import create_app, db, password_policy
+from app.utils.password_policy import BreachedPasswords, PasswordPolicy, build_breached_file
+
+@pytest.fixture
+def breached_file(tmp_path):
+    path = tmp_path / 'breached.sha1'
+    lines = [
+        'Password123!\n',
+        # Pwned Passwords style: uppercase hex digest with a count
+        hashlib.sha1(b'Summer2024!').hexdigest().upper() + ':42\n',
+        'Password123!\n',
+    ]
+    lines += [f'filler{i}\n' for i in range(100)]
+    assert build_breached_file(lines, path, chunk_size=7) == 102
+    return path
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.session.remove()
+            db.drop_all()
+
+def test_all_violations_reported():
+    """Test that every failing rule is returned, not just the first"""
+    violations = PasswordPolicy().violations('abc')
+    
+    assert violations == [
+        'Password must be at least 8 characters long',
+        'Password must contain at least one digit',
+        'Password must contain at least one uppercase letter',
+        'Password must contain at least one special character',
+    ]
+    assert PasswordPolicy().violations('Password123!') == []
+
+def test_max_bytes_counts_utf8():
+    """Test the bcrypt input cap is measured in bytes, not characters"""
+    policy = PasswordPolicy()
+    
+    assert PasswordPolicy().violations('Aa1!' + 'é' * 34) == []
+    assert 'Password must be at most 72 bytes long' in policy.violations('Aa1!' + 'é' * 35)
+
+def test_breached_lookup(breached_file):
+    """Test binary search over the memory-mapped digest file"""
+    breached = BreachedPasswords(str(breached_file))
+    
+    assert 'Password123!' in breached
+    assert 'Summer2024!' in breached
+    assert all(f'filler{i}' in breached for i in range(100))
+    assert 'Unbreached#2024' not in breached
+    assert breached_file.stat().st_size == 102 * 20
+    breached.close()
+
+def test_register_reports_policy_violations(client, breached_file):
+    """Test that registration returns all violations and rejects breached passwords"""
+    response = client.post(
+        '/auth/register',
+        data=json.dumps({'email': 'new@example.com', 'password': 'short'}),
+        content_type='application/json'
+    )
+    data = json.loads(response.data)
+    assert response.status_code == 400
+    assert data['message'] == data['errors'][0]
+    assert len(data['errors']) == 4
+    
+    client.application.config['PASSWORD_BREACHED_FILE'] = str(breached_file)
+    password_policy.init_app(client.application)
+    response = client.post(
+        '/auth/register',
+        data=json.dumps({'email': 'new@example.com', 'password': 'Password123!'}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+    assert json.loads(response.data)['errors'] == ['Password has appeared in a data breach; choose another']
+
+def test_build_breached_cli(tmp_path):
+    """Test building the digest file from the command line"""
+    source = tmp_path / 'passwords.txt'
+    source.write_text('hunter2\nletmein\n')
+    dest = tmp_path / 'breached.sha1'
+    
+    app = create_app()
+    result = app.test_cli_runner().invoke(args=['passwords', 'build-breached', str(source), str(dest)])
+    
+    assert result.exit_code == 0
+    assert 'Wrote 2 digests' in result.output
+    assert 'letmein' in BreachedPasswords(str(dest))
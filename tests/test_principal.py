@@ -0,0 +1,40 @@
+from app.utils.principal import TokenRevocations
+
+def make_revocations(lifetime=900):
+    revocations = TokenRevocations()
+    revocations.lifetime = lifetime
+    return revocations
+
+def test_revoke_rejects_older_versions():
+    """Test that a revocation rejects lower token versions only"""
+    revocations = make_revocations()
+    revocations.revoke(1, 2)
+    
+    assert revocations.is_revoked(1, 1)
+    assert not revocations.is_revoked(1, 2)
+    assert not revocations.is_revoked(2, 0)
+
+def test_revoke_all_rejects_every_version():
+    """Test that a deleted user's tokens are rejected whatever their version"""
+    revocations = make_revocations()
+    revocations.revoke(1, 3)
+    revocations.revoke_all(1)
+    
+    assert revocations.is_revoked(1, 0)
+    assert revocations.is_revoked(1, 3)
+    
+    # A later version bump seen for the same id doesn't undo the deletion
+    revocations.revoke(1, 5)
+    assert revocations.is_revoked(1, 5)
+
+def test_entries_expire_with_token_lifetime():
+    """Test that entries are dropped once every token they reject has expired"""
+    revocations = make_revocations(lifetime=0)
+    revocations.revoke(1, 2)
+    revocations.revoke_all(2)
+    
+    assert not revocations.is_revoked(1, 1)
+    assert not revocations.is_revoked(2, 0)
+    
+    revocations.revoke(3, 1)
+    assert len(revocations) == 1
@@ -2,9 +2,13 @@ import pytest
 import json
 import jwt
 import datetime
-from app import create_app, db
+from app import create_app, db, token_cache
 from app.models.user import User
 from app.config import Config
+from app.utils.auth_utils import auth_engine
+from app.utils.decorators import token_required
+from app.utils.principal import Principal
+from app.utils.token_cache import UserSnapshot
 
 @pytest.fixture
 def client():
@@ -68,4 +72,128 @@ def test_profile_with_invalid_token(client):
         headers={'Authorization': 'Bearer invalid.token.here'}
     )
     assert response.status_code == 401
-    assert b'Invalid token' in response.data
\ No newline at end of file
+    assert b'Invalid token' in response.data
+
+def test_token_required_uses_token_cache(client, auth_token):
+    """Test that repeat requests with the same token are served from cache"""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    view = token_required(lambda current_user: current_user)
+    token_cache.clear()
+    
+    with client.application.test_request_context(headers=headers):
+        view()
+        current_user = view()
+    
+    assert isinstance(current_user, UserSnapshot)
+    assert current_user.email == 'test@example.com'
+    assert token_cache.stats()['hits'] == 1
+
+def test_token_required_without_user_load(client, auth_token):
+    """Test that load_user=False builds the principal from claims alone"""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    view = token_required(load_user=False)(lambda current_user: current_user)
+    
+    with client.application.test_request_context(headers=headers):
+        current_user = view()
+    
+    assert isinstance(current_user, Principal)
+    assert current_user.email == 'test@example.com'
+    assert not hasattr(current_user, '__dict__')
+
+def test_profile_after_tokens_revoked(client, auth_token):
+    """Test that revoking a user's tokens rejects tokens issued before"""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    assert client.get('/profile/profile', headers=headers).status_code == 200
+    
+    with client.application.app_context():
+        User.query.filter_by(email='test@example.com').first().revoke_tokens()
+        db.session.commit()
+    
+    response = client.get('/profile/profile', headers=headers)
+    assert response.status_code == 401
+    assert b'Token has been revoked' in response.data
+
+def test_profile_after_user_deleted(client, auth_token):
+    """Test that a cached token stops working once its user is deleted"""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    client.get('/profile/profile', headers=headers)
+    
+    with client.application.app_context():
+        db.session.delete(User.query.filter_by(email='test@example.com').first())
+        db.session.commit()
+    
+    response = client.get('/profile/profile', headers=headers)
+    assert response.status_code == 401
+
+def test_cache_invalidated_on_commit_not_flush(client, auth_token):
+    """Test that cached tokens survive a flush that is rolled back and drop on commit"""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    view = token_required(lambda current_user: current_user)
+    token_cache.clear()
+    
+    with client.application.test_request_context(headers=headers):
+        view()
+        user = User.query.filter_by(email='test@example.com').first()
+        user.revoke_tokens()
+        db.session.flush()
+        assert token_cache.stats()['size'] == 1
+        
+        db.session.rollback()
+        assert token_cache.stats()['size'] == 1
+        
+        user.revoke_tokens()
+        db.session.commit()
+        assert token_cache.stats()['size'] == 0
+
+def test_token_required_fresh_skips_cache(client, auth_token):
+    """Test that fresh=True checks the database even when the token is cached"""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    cached_view = token_required(lambda current_user: current_user)
+    fresh_view = token_required(fresh=True)(lambda current_user: current_user)
+    
+    with client.application.test_request_context(headers=headers):
+        cached_view()
+        # Revoked by another worker: this process's cache never hears about it
+        db.session.execute(User.__table__.update().values(token_version=1))
+        db.session.commit()
+        
+        assert isinstance(cached_view(), UserSnapshot)
+        assert fresh_view()[1] == 401
+
+def test_deleted_user_id_is_not_reused(client, auth_token):
+    """Test that a deleted user's token is rejected on every path and their id goes to nobody else"""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    principal_view = token_required(load_user=False)(lambda current_user: current_user)
+    user_view = token_required(lambda current_user: current_user)
+    
+    with client.application.test_request_context(headers=headers):
+        user = User.query.filter_by(email='test@example.com').first()
+        user_id = user.id
+        db.session.delete(user)
+        db.session.commit()
+        
+        user = User(email='next@example.com')
+        user.password = 'Password123!'
+        db.session.add(user)
+        db.session.commit()
+        assert user.id != user_id
+        
+        assert principal_view()[1] == 401
+        assert user_view()[1] == 401
+        token, _ = auth_engine.issue_token(user)
+    
+    with client.application.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+        assert isinstance(principal_view(), Principal)
+        assert isinstance(user_view(), UserSnapshot)
+
+def test_rolled_back_revocation_is_ignored(client, auth_token):
+    """Test that a revocation flushed and then rolled back rejects nothing"""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    view = token_required(load_user=False)(lambda current_user: current_user)
+    
+    with client.application.test_request_context(headers=headers):
+        User.query.filter_by(email='test@example.com').first().revoke_tokens()
+        db.session.flush()
+        db.session.rollback()
+        
+        assert isinstance(view(), Principal)
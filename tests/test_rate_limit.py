@@ -0,0 +1,125 @@
+import pytest
+import json
+import sqlite3
+import time
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import MovingWindowRateLimiter, FixedWindowRateLimiter
+from app import create_app, db
+from app.models.user import User
+from app.utils import rate_limit
+
+@pytest.fixture
+def storage_uri(tmp_path):
+    return f"sqlite:///{tmp_path / 'ratelimit.db'}"
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['LOGIN_ACCOUNT_RATE_LIMIT'] = '3 per minute'
+    
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            
+            # Create test user
+            user = User(email='test@example.com')
+            user.password = 'Password123!'
+            db.session.add(user)
+            db.session.commit()
+            
+            yield client
+            
+            db.session.remove()
+            db.drop_all()
+
+def test_sqlite_storage_fixed_window(storage_uri):
+    """Test fixed-window counting in the SQLite storage"""
+    limiter = FixedWindowRateLimiter(storage_from_string(storage_uri))
+    limit = parse('2 per minute')
+    
+    assert limiter.hit(limit, 'client')
+    assert limiter.hit(limit, 'client')
+    assert not limiter.hit(limit, 'client')
+    assert limiter.hit(limit, 'other-client')
+
+def test_sqlite_storage_moving_window(storage_uri):
+    """Test sliding-window acquisition and window stats"""
+    limiter = MovingWindowRateLimiter(storage_from_string(storage_uri))
+    limit = parse('3 per minute')
+    
+    for _ in range(3):
+        assert limiter.hit(limit, 'client')
+    assert not limiter.hit(limit, 'client')
+    assert limiter.get_window_stats(limit, 'client')[1] == 0
+
+def test_sqlite_storage_shared_between_workers(storage_uri):
+    """Test that separate storage instances on one file share counts"""
+    limit = parse('2 per minute')
+    first = MovingWindowRateLimiter(storage_from_string(storage_uri))
+    second = MovingWindowRateLimiter(storage_from_string(storage_uri))
+    
+    assert first.hit(limit, 'client')
+    assert second.hit(limit, 'client')
+    assert not first.hit(limit, 'client')
+
+def test_sqlite_storage_sweeps_idle_window_keys(storage_uri, monkeypatch):
+    """Test that window entries of keys that are never hit again are purged"""
+    monkeypatch.setattr(rate_limit, 'PURGE_EVERY', 1)
+    storage = storage_from_string(storage_uri)
+    limiter = MovingWindowRateLimiter(storage)
+    
+    for i in range(50):
+        assert limiter.hit(parse('1 per second'), f'account:user{i}@example.com')
+    time.sleep(1.1)
+    assert limiter.hit(parse('1 per second'), 'client')
+    
+    conn = storage._connection()
+    assert conn.execute('SELECT COUNT(*) FROM window_entries').fetchone()[0] == 1
+
+def test_sqlite_storage_sweep_keeps_other_workers_windows(storage_uri, monkeypatch):
+    """Test that a sweep never drops entries of a longer window another worker enforces"""
+    monkeypatch.setattr(rate_limit, 'PURGE_EVERY', 1)
+    daily = MovingWindowRateLimiter(storage_from_string(storage_uri))
+    logins = MovingWindowRateLimiter(storage_from_string(storage_uri))
+    
+    assert daily.hit(parse('2 per day'), 'client')
+    assert daily.hit(parse('2 per day'), 'client')
+    time.sleep(1.1)
+    # This worker has only seen a one-second window when it sweeps
+    assert logins.hit(parse('1 per second'), 'account:test@example.com')
+    
+    assert not daily.hit(parse('2 per day'), 'client')
+
+def test_sqlite_storage_upgrades_older_file(tmp_path):
+    """Test that window entries from a file without per-entry expiry are kept and still counted"""
+    path = tmp_path / 'ratelimit.db'
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE window_entries (key TEXT NOT NULL, ts REAL NOT NULL)')
+    conn.execute('CREATE INDEX ix_window_entries_ts ON window_entries (ts)')
+    conn.execute('INSERT INTO window_entries (key, ts) VALUES (?, ?)', (parse('2 per day').key_for('client'), time.time()))
+    conn.commit()
+    conn.close()
+    
+    limiter = MovingWindowRateLimiter(storage_from_string(f'sqlite:///{path}'))
+    assert limiter.hit(parse('2 per day'), 'client')
+    assert not limiter.hit(parse('2 per day'), 'client')
+
+def test_login_limited_per_account_across_ips(client):
+    """Test that the per-account limit holds when each attempt uses a new IP"""
+    codes = []
+    for i in range(4):
+        response = client.post(
+            '/auth/login',
+            data=json.dumps({
+                'email': 'TEST@example.com',
+                'password': 'WrongPassword!'
+            }),
+            content_type='application/json',
+            environ_base={'REMOTE_ADDR': f'10.0.0.{i}'}
+        )
+        codes.append(response.status_code)
+    
+    assert codes == [401, 401, 401, 429]
@@ -0,0 +1,87 @@
+import pytest
+import json
+from app import create_app, db
+from app.models.user import User
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            
+            # Create test user
+            user = User(email='test@example.com')
+            user.password = 'Password123!'
+            db.session.add(user)
+            db.session.commit()
+            
+            yield client
+            
+            db.session.remove()
+            db.drop_all()
+
+def login(client):
+    response = client.post(
+        '/auth/login',
+        data=json.dumps({
+            'email': 'test@example.com',
+            'password': 'Password123!'
+        }),
+        content_type='application/json'
+    )
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+def refresh(client, refresh_token):
+    return client.post(
+        '/auth/refresh',
+        data=json.dumps({'refresh_token': refresh_token}),
+        content_type='application/json'
+    )
+
+def test_refresh_rotates_tokens(client):
+    """Test that a refresh returns a new access token and a new refresh token"""
+    tokens = login(client)
+    
+    response = refresh(client, tokens['refresh_token'])
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['refresh_token'] != tokens['refresh_token']
+    
+    profile = client.get('/profile/profile', headers={'Authorization': f"Bearer {data['token']}"})
+    assert profile.status_code == 200
+
+def test_refresh_reuse_revokes_family(client):
+    """Test that replaying a rotated refresh token kills the whole family"""
+    tokens = login(client)
+    rotated = json.loads(refresh(client, tokens['refresh_token']).data)
+    
+    assert refresh(client, tokens['refresh_token']).status_code == 401
+    assert refresh(client, rotated['refresh_token']).status_code == 401
+
+def test_refresh_after_tokens_revoked(client):
+    """Test that revoking a user's tokens also invalidates refresh tokens"""
+    tokens = login(client)
+    
+    with client.application.app_context():
+        User.query.filter_by(email='test@example.com').first().revoke_tokens()
+        db.session.commit()
+    
+    assert refresh(client, tokens['refresh_token']).status_code == 401
+
+def test_refresh_with_unknown_token(client):
+    """Test refresh with a token that was never issued"""
+    response = refresh(client, 'not-a-real-token')
+    assert response.status_code == 401
+    assert b'Invalid refresh token' in response.data
+
+def test_refresh_with_non_string_token(client):
+    """Test that a refresh token that isn't a string is a validation error, not a server error"""
+    for refresh_token in (1, ['a'], {'a': 1}, None):
+        response = refresh(client, refresh_token)
+        assert response.status_code == 400
+        assert b'Refresh token is required' in response.data
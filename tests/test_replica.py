@@ -0,0 +1,119 @@
+import pytest
+import json
+from base64 import b64encode
+from sqlalchemy import insert
+from app import auth_events, create_app, db, password_hasher, replica_router, token_cache
+from app.models.user import User
+from app.utils.auth_utils import auth_engine
+
+GATEWAY_AUTH = {'Authorization': 'Basic ' + b64encode(b'gateway:gateway-secret').decode()}
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app()
+    app.config['TESTING'] = True
+    # Two SQLite files stand in for the primary and its replica
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'primary.db'}"
+    app.config['SQLALCHEMY_BINDS'] = {'replica': f"sqlite:///{tmp_path / 'replica.db'}"}
+    app.config['INTROSPECT_CLIENTS'] = 'gateway:gateway-secret'
+    replica_router.init_app(app)
+    
+    with app.app_context():
+        db.create_all()
+        db.Model.metadata.create_all(bind=db.get_engine(bind='replica'))
+        
+        # Create test user on the primary only, as if replication hadn't caught up
+        user = User(email='test@example.com')
+        user.password = 'Password123!'
+        db.session.add(user)
+        db.session.commit()
+        
+        yield app
+        
+        auth_events.shutdown()
+        db.session.remove()
+        db.drop_all(bind=None)
+
+def replicate():
+    """Copy the users table from the primary to the replica"""
+    rows = [dict(row) for row in db.session.execute(User.__table__.select()).mappings()]
+    with db.get_engine(bind='replica').begin() as connection:
+        connection.execute(User.__table__.delete())
+        connection.execute(insert(User.__table__), rows)
+
+def login(client):
+    return client.post(
+        '/auth/login',
+        data=json.dumps({'email': 'test@example.com', 'password': 'Password123!'}),
+        content_type='application/json'
+    )
+
+def test_read_your_writes(app):
+    """Test a user just written is read from the primary until the window closes"""
+    client = app.test_client()
+    
+    assert login(client).status_code == 200
+    assert replica_router.stats()['primary_reads'] == 1
+    
+    # Once the window has passed the login lookup goes to the lagging replica
+    replica_router.reset()
+    assert login(client).status_code == 401
+    assert replica_router.stats()['replica_reads'] == 1
+    
+    replicate()
+    assert login(client).status_code == 200
+    assert replica_router.stats()['replica_reads'] == 2
+
+def test_rehash_reads_login_from_primary(app):
+    """Test a login after a rehash sees the new hash instead of rehashing again from the replica"""
+    client = app.test_client()
+    replicate()
+    replica_router.reset()
+    
+    password_hasher.rounds = 4
+    try:
+        password_hasher.reset_stats()
+        assert login(client).status_code == 200
+        assert login(client).status_code == 200
+        assert password_hasher.stats()['operations']['hash']['count'] == 1
+        assert replica_router.stats()['primary_reads'] == 1
+    finally:
+        password_hasher.rounds = app.config['BCRYPT_ROUNDS']
+
+def test_token_reads_use_replica(app):
+    """Test token auth reads the replica and sees revocations through the window"""
+    client = app.test_client()
+    replicate()
+    replica_router.reset()
+    
+    user = User.find_by_email('test@example.com')
+    token, _ = auth_engine.issue_token(user)
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/profile/profile', headers=headers).status_code == 200
+    
+    response = client.post('/auth/introspect', json={'tokens': [token]}, headers=GATEWAY_AUTH)
+    assert json.loads(response.data)['results'][0]['active'] is True
+    assert replica_router.stats()['replica_reads'] == 1  # the profile view reads no user; introspection does
+    
+    # The replica still has the old token_version, but the revoking user is read from the primary
+    user.revoke_tokens()
+    db.session.commit()
+    token_cache.clear()
+    response = client.post('/auth/introspect', json={'tokens': [token]}, headers=GATEWAY_AUTH)
+    assert json.loads(response.data)['results'][0] == {'active': False, 'reason': 'revoked_token'}
+
+def test_replica_failure_falls_back(app):
+    """Test a broken replica doesn't break reads"""
+    app.config['SQLALCHEMY_BINDS'] = {'replica': 'sqlite:////nonexistent/dir/replica.db'}
+    replica_router.reset()
+    
+    assert login(app.test_client()).status_code == 200
+    assert replica_router.stats()['fallbacks'] == 1
+
+def test_no_replica(app):
+    """Test every read uses the primary when no replica is configured"""
+    app.config['SQLALCHEMY_BINDS'] = None
+    replica_router.reset()
+    
+    assert login(app.test_client()).status_code == 200
+    assert replica_router.stats() == {'replica_reads': 0, 'primary_reads': 1, 'fallbacks': 0, 'tracked_writes': 0}
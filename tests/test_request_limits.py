@@ -0,0 +1,99 @@
+import pytest
+import io
+import json
+from base64 import b64encode
+from app import create_app, db, request_limits
+from app.models.user import User
+from app.utils.json_codec import json_codec, orjson
+
+GATEWAY_AUTH = {'Authorization': 'Basic ' + b64encode(b'gateway:gateway-secret').decode()}
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['INTROSPECT_CLIENTS'] = 'gateway:gateway-secret'
+    
+    with app.app_context():
+        db.create_all()
+        
+        # Create test user
+        user = User(email='test@example.com')
+        user.password = 'Password123!'
+        db.session.add(user)
+        db.session.commit()
+        
+        yield app
+        
+        db.session.remove()
+        db.drop_all()
+
+def login_body(padding=''):
+    return json.dumps({'email': 'test@example.com', 'password': 'Password123!', 'padding': padding})
+
+def test_oversized_auth_body(app):
+    """Test auth bodies over AUTH_MAX_BODY_BYTES are refused without being read"""
+    client = app.test_client()
+    
+    response = client.post('/auth/login', data=login_body('x' * 5000), content_type='application/json')
+    assert response.status_code == 413
+    assert json.loads(response.data) == {'message': 'Request body too large'}
+    
+    response = client.post('/auth/login', data=login_body(), content_type='application/json')
+    assert response.status_code == 200
+
+def test_introspect_uses_global_limit(app):
+    """Test token batches may exceed the auth limit but not MAX_CONTENT_LENGTH"""
+    client = app.test_client()
+    tokens = ['x' * 100] * 100
+    
+    response = client.post('/auth/introspect', json={'tokens': tokens}, headers=GATEWAY_AUTH)
+    assert response.status_code == 200
+    
+    app.config['MAX_CONTENT_LENGTH'] = 1024
+    request_limits.init_app(app)
+    response = client.post('/auth/introspect', json={'tokens': tokens}, headers=GATEWAY_AUTH)
+    assert response.status_code == 413
+
+def test_non_json_body(app):
+    """Test auth endpoints refuse bodies that aren't JSON"""
+    client = app.test_client()
+    
+    response = client.post('/auth/login', data=login_body(), content_type='text/plain')
+    assert response.status_code == 415
+    response = client.post('/auth/register', data={'email': 'a@example.com'})
+    assert response.status_code == 415
+
+def test_chunked_body(app):
+    """Test a body without Content-Length is read only up to the limit"""
+    client = app.test_client()
+    
+    def post_chunked(body):
+        stream = io.BytesIO(body.encode())
+        return client.post('/auth/login', input_stream=stream, content_type='application/json',
+                           environ_overrides={'wsgi.input_terminated': True})
+    
+    response = post_chunked(login_body())
+    assert response.status_code == 200
+    
+    response = post_chunked(login_body('x' * 100000))
+    assert response.status_code == 413
+
+def test_codec(app):
+    """Test the configured codec parses requests and encodes responses"""
+    assert json_codec.name == ('orjson' if orjson else 'json')
+    assert json_codec.loads(b'{"a": [1, "\\u00e9"]}') == {'a': [1, 'é']}
+    with pytest.raises(ValueError):
+        json_codec.loads(b'{bad')
+    
+    app.config['JSON_CODEC'] = 'json'
+    json_codec.init_app(app)
+    assert json_codec.encode({'a': 1}) == b'{"a":1}'
+    response = app.test_client().post('/auth/login', data=login_body(), content_type='application/json')
+    assert response.status_code == 200
+    assert 'token' in json.loads(response.data)
+    
+    app.config['JSON_CODEC'] = 'yaml'
+    with pytest.raises(ValueError):
+        json_codec.init_app(app)
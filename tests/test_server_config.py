@@ -0,0 +1,46 @@
+import pytest
+import os
+import runpy
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gunicorn.conf.py')
+
+# Settings gunicorn.conf.py reads or fills in for the app
+CONFIG_ENV = ('WEB_CONCURRENCY', 'GUNICORN_THREADS', 'RATELIMIT_STORAGE_URI', 'PASSWORD_HASH_WORKERS')
+
+@pytest.fixture
+def load_config(monkeypatch):
+    # Run against a copy of the environment so nothing the config file sets
+    # reaches later tests (or the subprocesses they start)
+    def load(**env):
+        environ = {name: value for name, value in os.environ.items() if name not in CONFIG_ENV}
+        environ.update(env)
+        monkeypatch.setattr(os, 'environ', environ)
+        return runpy.run_path(CONFIG_PATH), environ
+    return load
+
+def test_server_config_defaults(load_config):
+    """Test preforked, preloaded gthread workers with recycling"""
+    config, _ = load_config(WEB_CONCURRENCY='3')
+    
+    assert config['workers'] == 3
+    assert config['worker_class'] == 'gthread'
+    assert config['preload_app'] is True
+    assert config['max_requests'] > 0 and config['max_requests_jitter'] > 0
+    assert callable(config['when_ready'])
+
+def test_server_config_shares_rate_limits(load_config):
+    """Test that workers share rate limit counters unless told otherwise"""
+    _, environ = load_config()
+    assert environ['RATELIMIT_STORAGE_URI'].startswith('sqlite:///')
+    assert int(environ['PASSWORD_HASH_WORKERS']) >= 1
+    
+    _, environ = load_config(RATELIMIT_STORAGE_URI='memory://')
+    assert environ['RATELIMIT_STORAGE_URI'] == 'memory://'
+
+def test_server_config_leaves_environment_alone(load_config):
+    """Test that loading the config doesn't leak its defaults into the process environment"""
+    real_environ = os.environ
+    before = {name: real_environ.get(name) for name in CONFIG_ENV}
+    load_config()
+    
+    assert {name: real_environ.get(name) for name in CONFIG_ENV} == before
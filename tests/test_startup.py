@@ -0,0 +1,35 @@
+import os
+from benchmarks.bench_startup import measure_startup
+
+# Generous ceiling so slow CI machines pass; tighten with STARTUP_BUDGET_SECONDS
+STARTUP_BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', 5))
+
+def test_cold_start_within_budget():
+    """Test import, create_app and first request from a fresh interpreter"""
+    result = measure_startup()
+    total = result['import_s'] + result['create_app_s'] + result['first_request_s']
+    
+    assert total < STARTUP_BUDGET_SECONDS, result
+
+def test_heavy_work_deferred():
+    """Test that DNS/email validation, key handling and the Swagger spec wait until needed"""
+    result = measure_startup()
+    
+    assert result['deferred_loaded'] == []
+    assert result['swagger_built'] is False
+
+def test_create_app_runs_no_ddl(tmp_path):
+    """Test that booting leaves the schema to `flask init-db`"""
+    from sqlalchemy import inspect
+    from app import create_app, db
+    
+    app = create_app()
+    # No engine has been created, so no connection was opened either
+    assert not app.extensions['sqlalchemy'].connectors
+    
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'fresh.db'}"
+    # Invoked like `flask init-db`: the command has to push its own app context
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert 'users' in inspect(db.engine).get_table_names()
@@ -0,0 +1,82 @@
+import pytest
+import gzip
+from app import create_app, security_headers
+from app.utils.static_pages import StaticPage
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    
+    with app.test_client() as client:
+        yield client
+
+def test_home_page(client):
+    """Test the home page is served with caching headers"""
+    response = client.get('/')
+    
+    assert response.status_code == 200
+    assert b'Authentication API' in response.data
+    assert response.headers['Cache-Control'] == 'public, max-age=300'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert 'Content-Encoding' not in response.headers
+
+def test_gzip_variant(client):
+    """Test clients accepting gzip get the precompressed page"""
+    plain = client.get('/api/redoc')
+    response = client.get('/api/redoc', headers={'Accept-Encoding': 'gzip, deflate'})
+    
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == plain.data
+    assert response.headers['ETag'] != plain.headers['ETag']
+
+def test_conditional_request(client):
+    """Test a matching If-None-Match gets a 304 without a body"""
+    etag = client.get('/').headers['ETag']
+    
+    response = client.get('/', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    
+    # Proxies may weaken the validator
+    response = client.get('/', headers={'If-None-Match': f'W/{etag}'})
+    assert response.status_code == 304
+    
+    response = client.get('/', headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+
+def test_incompressible_page():
+    """Test pages too small to compress are only served as identity"""
+    page = StaticPage('<p>', max_age=60)
+    
+    assert page.variants == []
+    assert page.select({'gzip': 1}) is page.identity
+
+def test_header_policies(client):
+    """Test JSON routes and documentation pages get different CSPs"""
+    api_headers = client.get('/.well-known/jwks.json').headers
+    docs_headers = client.get('/api/redoc').headers
+    
+    for headers in (api_headers, docs_headers):
+        assert headers['X-Content-Type-Options'] == 'nosniff'
+        assert headers['X-Frame-Options'] == 'DENY'
+        assert headers['Strict-Transport-Security'] == 'max-age=31536000; includeSubDomains'
+    assert api_headers['Content-Security-Policy'] == "default-src 'none'; frame-ancestors 'none'"
+    assert 'https://cdn.redoc.ly' in docs_headers['Content-Security-Policy']
+    assert 'https://cdn.redoc.ly' in client.get('/api/docs').headers['Content-Security-Policy']
+
+def test_header_policy_config():
+    """Test headers can be changed or dropped from config"""
+    app = create_app()
+    app.config['SECURITY_HSTS'] = ''
+    app.config['SECURITY_CSP_API'] = "default-src 'self'"
+    security_headers.init_app(app)
+    security_headers.use_policy('docs', 'index', 'redoc')
+    
+    headers = app.test_client().get('/.well-known/jwks.json').headers
+    assert 'Strict-Transport-Security' not in headers
+    assert headers['Content-Security-Policy'] == "default-src 'self'"
+    
+    with pytest.raises(ValueError):
+        security_headers.use_policy('strict', 'index')
@@ -0,0 +1,68 @@
+import time
+from app.utils.token_cache import TokenCache, UserSnapshot
+
+def make_cache(max_size=2, ttl=300):
+    cache = TokenCache()
+    cache.max_size = max_size
+    cache.ttl = ttl
+    return cache
+
+def test_hit_and_miss():
+    """Test that cached tokens are returned and counted"""
+    cache = make_cache()
+    user = UserSnapshot(1, 'test@example.com')
+    claims = {'sub': 1, 'exp': time.time() + 60}
+    
+    assert cache.get('token-a') is None
+    cache.put('token-a', claims, user)
+    assert cache.get('token-a') == (claims, user)
+    
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+def test_entry_expires_with_token():
+    """Test that an entry never outlives the token's exp"""
+    cache = make_cache()
+    cache.put('token-a', {'sub': 1, 'exp': time.time() - 1}, UserSnapshot(1, 'test@example.com'))
+    
+    assert cache.get('token-a') is None
+    assert cache.stats()['evictions'] == 1
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    cache = make_cache(max_size=2)
+    exp = time.time() + 60
+    for i, token in enumerate(['token-a', 'token-b', 'token-c']):
+        cache.put(token, {'sub': i, 'exp': exp}, UserSnapshot(i, f'user{i}@example.com'))
+    
+    assert cache.get('token-a') is None
+    assert cache.get('token-c') is not None
+    assert cache.stats()['evictions'] == 1
+
+def test_invalidate_user():
+    """Test that invalidating a user drops all of their tokens"""
+    cache = make_cache(max_size=10)
+    exp = time.time() + 60
+    cache.put('token-a', {'sub': 1, 'exp': exp}, UserSnapshot(1, 'one@example.com'))
+    cache.put('token-b', {'sub': 1, 'exp': exp}, UserSnapshot(1, 'one@example.com'))
+    cache.put('token-c', {'sub': 2, 'exp': exp}, UserSnapshot(2, 'two@example.com'))
+    
+    cache.invalidate_user(1)
+    
+    assert cache.get('token-a') is None
+    assert cache.get('token-b') is None
+    assert cache.get('token-c') is not None
+
+def test_put_skipped_after_invalidation():
+    """Test that a row loaded before an invalidation is not cached"""
+    cache = make_cache(max_size=10)
+    exp = time.time() + 60
+    generation = cache.generation
+    cache.invalidate_user(1)
+    cache.put('token-a', {'sub': 1, 'exp': exp}, UserSnapshot(1, 'one@example.com'), generation)
+    
+    assert cache.get('token-a') is None
+    
+    cache.put('token-a', {'sub': 1, 'exp': exp}, UserSnapshot(1, 'one@example.com'), cache.generation)
+    assert cache.get('token-a') is not None
@@ -0,0 +1,6 @@
+# wsgi.py
+"""WSGI entry point for production servers, e.g. ``gunicorn -c gunicorn.conf.py wsgi:app``"""
+
+from app import create_app
+
+app = create_app()